@@ -3,8 +3,8 @@ import subprocess
 
 @asset
 def produce_live_events():
-    subprocess.run(["python", "-m", "src.kafka.produce_live_events"], check=True)
+    subprocess.run(["python", "-m", "src.kafka.produce_live_events", "--max-seconds", "50"], check=True)
 
 @asset(deps=[produce_live_events])
 def consume_live_events():
-    subprocess.run(["python", "-m", "src.kafka.consume_live_events"], check=True)
\ No newline at end of file
+    subprocess.run(["python", "-m", "src.kafka.consume_live_events", "--until-caught-up", "--max-seconds", "50"], check=True)
\ No newline at end of file
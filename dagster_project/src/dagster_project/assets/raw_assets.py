@@ -0,0 +1,99 @@
+from dagster import (
+    AssetExecutionContext,
+    AssetKey,
+    AssetSpec,
+    Backoff,
+    MaterializeResult,
+    MultiPartitionsDefinition,
+    RetryPolicy,
+    StaticPartitionsDefinition,
+    define_asset_job,
+    multi_asset,
+)
+from src.load.load_fixture_history import LEAGUE_IDS, SEASONS, backfill_shard
+from src.load.load_football import load_football_shard
+
+# one partition per (league, season): 5 leagues x 8 seasons
+league_season_partitions = MultiPartitionsDefinition({
+    "league": StaticPartitionsDefinition([str(lg) for lg in LEAGUE_IDS]),
+    "season": StaticPartitionsDefinition([str(ss) for ss in SEASONS]),
+})
+
+# every partition calls api-sports: cap how many run at once with the pool limit
+# (dagster instance: concurrency.pools.default_limit / `dagster instance concurrency set api_sports N`)
+API_POOL = "api_sports"
+
+# API hiccups and quota resets: retry the partition, not the matrix
+RAW_RETRY_POLICY = RetryPolicy(max_retries=2, delay=60, backoff=Backoff.EXPONENTIAL)
+
+# keys match the dbt sources (football_capstone.<table>) so lineage connects to staging
+def raw_spec(table: str) -> AssetSpec:
+    return AssetSpec(key=AssetKey(["football_capstone", table]), group_name="raw")
+
+
+FIXTURE_HISTORY_TABLES = [
+    "RAW_FIXTURE_INFO",
+    "RAW_FIXTURE_EVENT",
+    "RAW_FIXTURE_LINE_UP",
+    "RAW_FIXTURE_PREDICTIONS",
+    "RAW_FIXTURE_ODDS",
+    "RAW_FIXTURE_STATISTICS",
+    "RAW_FIXTURE_PLAYERS_STATISTIC",
+]
+
+FOOTBALL_TABLES = [
+    "RAW_TEAMS_STATISTICS",
+    "RAW_PLAYERS_STATISTICS",
+    "RAW_TEAMS_TRANSFER",
+    "RAW_TEAMS_SQUADS",
+    "RAW_PLAYER_TROPHIES",
+]
+
+
+def partition_league_season(context: AssetExecutionContext):
+    keys = context.partition_key.keys_by_dimension
+    return int(keys["league"]), int(keys["season"])
+
+
+def materialize_results(tables, league_id: int, season: int, stats):
+    # one load covers every table: same run stats on each of them
+    metadata = {"league_id": league_id, "season": season, **stats}
+    for table in tables:
+        yield MaterializeResult(asset_key=AssetKey(["football_capstone", table]), metadata=metadata)
+
+
+@multi_asset(
+    specs=[raw_spec(t) for t in FIXTURE_HISTORY_TABLES],
+    partitions_def=league_season_partitions,
+    retry_policy=RAW_RETRY_POLICY,
+    pool=API_POOL,
+)
+def raw_fixture_history(context: AssetExecutionContext):
+    lg, ss = partition_league_season(context)
+    stats = backfill_shard(lg, ss)
+    yield from materialize_results(FIXTURE_HISTORY_TABLES, lg, ss, stats)
+
+
+@multi_asset(
+    specs=[raw_spec(t) for t in FOOTBALL_TABLES],
+    partitions_def=league_season_partitions,
+    retry_policy=RAW_RETRY_POLICY,
+    pool=API_POOL,
+)
+def raw_football(context: AssetExecutionContext):
+    lg, ss = partition_league_season(context)
+    stats = load_football_shard(lg, ss)
+    yield from materialize_results(FOOTBALL_TABLES, lg, ss, stats)
+
+
+raw_fixture_history_job = define_asset_job(
+    name="raw_fixture_history_job",
+    selection=[raw_fixture_history],
+    partitions_def=league_season_partitions,
+)
+
+raw_football_job = define_asset_job(
+    name="raw_football_job",
+    selection=[raw_football],
+    partitions_def=league_season_partitions,
+)
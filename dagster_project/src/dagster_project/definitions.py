@@ -1,5 +1,11 @@
 from dagster import Definitions
 from dagster_project.assets.dbt_assets import dbt_assets, dbt
+from dagster_project.assets.raw_assets import (
+    raw_fixture_history,
+    raw_football,
+    raw_fixture_history_job,
+    raw_football_job,
+)
 from dagster_project.schedules import (
     live_job,
     history_job,
@@ -22,13 +28,16 @@ from dagster_project.schedules import (
 )
 
 defs = Definitions(
-    assets=[dbt_assets],          # dbt assets show in Catalog/Lineage
+    assets=[dbt_assets, raw_fixture_history, raw_football],   # RAW partitions (league x season) feed the dbt sources
     resources={"dbt": dbt},       # dbt resource needed by dbt assets
     jobs=[
         load_fixture_league_job,
         load_fixture_live_job,
         load_football_job,
         consume_fixture_live_job,
+        # partitioned RAW ingestion: backfill / retry one league-season at a time
+        raw_fixture_history_job,
+        raw_football_job,
         # optional: if you have a dbt job defined elsewhere (not required if using assets)
         live_job, 
         history_job
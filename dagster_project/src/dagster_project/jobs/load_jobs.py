@@ -1,11 +1,31 @@
-from dagster import op, job
+from typing import Optional
+from dagster import op, job, Config, Output
 from dagster_project.jobs import __init__
 from src.load.load_football import main as load_football_run
 from src.kafka.produce_live_events import main as load_fixture_live_run
 from src.kafka.consume_live_events import main as consume_fixture_live_run
 from src.load.load_fixture_history import main as load_fixture_league_run
+from src.kafka.run_budget import RunBudget
 
 
+# the live jobs are scheduled every minute: each run stops before the next one starts
+class LiveRunConfig(Config):
+    max_seconds: float = 50.0
+    max_messages: Optional[int] = None
+    until_caught_up: bool = False
+
+
+class ConsumeRunConfig(LiveRunConfig):
+    until_caught_up: bool = True
+
+
+def run_budget(config: LiveRunConfig) -> RunBudget:
+    return RunBudget(
+        max_seconds=config.max_seconds,
+        max_messages=config.max_messages,
+        until_caught_up=config.until_caught_up,
+    )
+
 
 @op
 def load_fixture_league_op():
@@ -13,8 +33,9 @@ def load_fixture_league_op():
 
 
 @op
-def load_fixture_live_op():
-    load_fixture_live_run()
+def load_fixture_live_op(config: LiveRunConfig):
+    stats = load_fixture_live_run(budget=run_budget(config))
+    return Output(None, metadata=stats)
 
 
 @op
@@ -22,8 +43,9 @@ def load_football_op():
     load_football_run()
 
 @op
-def consume_fixture_live_op():
-    consume_fixture_live_run()
+def consume_fixture_live_op(config: ConsumeRunConfig):
+    stats = consume_fixture_live_run(budget=run_budget(config))
+    return Output(None, metadata=stats)
 
 @job
 def load_fixture_league_job():
@@ -1,16 +1,23 @@
 # src/extract/base/api_limits.py
+import os
+from src.extract.base.rate_limiter import SharedRateLimiter
 
-from src.extract.base.rate_limiter import RateLimiter
+# Both buckets live in one SQLite file so every job / process shares the same quota
+# (set API_SPORTS_LIMITER_DB to move it, e.g. onto a volume shared by the containers)
+LIMITER_DB = os.getenv("API_SPORTS_LIMITER_DB", "state/rate_limits.sqlite")
 
 # Short-term (burst)
-API_SPORTS_MINUTE_LIMITER = RateLimiter(
+API_SPORTS_MINUTE_LIMITER = SharedRateLimiter(
+    name="api_sports_minute",
     calls=100,
-    period_seconds=10
+    period_seconds=10,
+    db_path=LIMITER_DB
 )
 
 # Long-term (daily quota)
-API_SPORTS_DAILY_LIMITER = RateLimiter(
+API_SPORTS_DAILY_LIMITER = SharedRateLimiter(
+    name="api_sports_daily",
     calls=5000,              # เผื่อ buffer
-    period_seconds=86400     # 24 hours
+    period_seconds=86400,    # 24 hours
+    db_path=LIMITER_DB
 )
-
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+
+SOURCE = "https://www.api-football.com/"
+
+
+def now_extracted() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def api_errors(payload: Optional[Dict[str, Any]]) -> Any:
+    # the client returns None after a non-200 (already printed)
+    if payload is None:
+        return {"request": "no response"}
+    return payload.get("errors", []) or payload.get("error", []) or []
+
+
+def response_items(payload: Optional[Dict[str, Any]], limit: Optional[int] = None) -> List[Any]:
+    data = (payload or {}).get("response", []) or []
+    return data if limit is None else data[:limit]
+
+
+def collect_items(payload: Optional[Dict[str, Any]], limit: Optional[int], errors: Optional[List[Any]]) -> List[Any]:
+    """
+    response items of one payload for the iter_* extractors;
+    API errors are appended to `errors` when a list is passed in
+    """
+    err = api_errors(payload)
+    if err and errors is not None:
+        errors.append(err)
+    return response_items(payload, limit)
@@ -1,6 +1,73 @@
+import asyncio
+import sqlite3
+import threading
 import time
-from dataclasses import dataclass
-from functools import wraps
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+from src.extract.base.sqlite_local import ThreadLocalSqlite
+
+# below this share of the server-side budget we stop bursting and start pacing
+LOW_WATER = 0.2
+
+
+def _refill(tokens: float, last: float, now: float, capacity: float, rate: float) -> float:
+    """
+    Bucket level at `now`, given the level at `last`. rate is tokens per second.
+    """
+    elapsed = max(0.0, now - last)
+    return min(capacity, tokens + elapsed * rate)
+
+
+def _take_token(tokens: float, last: float, now: float, capacity: float, rate: float):
+    """
+    Refill the bucket up to `now`, take one token and return (tokens, sleep_s).
+    Tokens may go negative so concurrent callers queue up behind each other
+    instead of all waking at the same moment.
+    """
+    tokens = _refill(tokens, last, now, capacity, rate) - 1
+    if tokens >= 0:
+        return tokens, 0.0
+    # need to wait until our token has been refilled
+    return tokens, -tokens / rate
+
+
+def _adapt_to_server(
+    remaining: float,
+    limit: float,
+    period_seconds: float,
+    reset_in: float,
+) -> Tuple[float, float]:
+    """
+    Turn the server's view of a quota window into (capacity, rate).
+
+    Plenty of headroom -> full burst of `limit` at the nominal rate.
+    Under LOW_WATER -> burst shrinks and the rate slides towards spreading
+    what is left evenly over the rest of the window, so we slow down
+    gradually instead of hitting the wall.
+    """
+    remaining = max(0.0, float(remaining))
+    limit = max(1.0, float(limit))
+    nominal_rate = limit / period_seconds
+    fraction = remaining / limit
+
+    if fraction >= LOW_WATER:
+        return limit, nominal_rate
+
+    blend = fraction / LOW_WATER                 # 1 at the low-water mark, 0 when empty
+    even_rate = max(remaining, 1.0) / max(reset_in, 1.0)
+    rate = blend * nominal_rate + (1 - blend) * even_rate
+    capacity = max(1.0, remaining * blend)
+    return capacity, rate
+
+
+def _sync_tokens(tokens: float, capacity: float, remaining: float) -> float:
+    """
+    Clamp the local bucket to the server's view without ever refilling it.
+    Negative tokens are debt owed by callers already queued behind us, so
+    they are kept as-is; the headers only ever lower the level.
+    """
+    return min(tokens, capacity, max(0.0, float(remaining)))
+
 
 @dataclass
 class RateLimiter:
@@ -8,34 +75,148 @@ class RateLimiter:
     period_seconds: float
     _tokens: float = 0.0
     _last: float = 0.0
+    _capacity: float = 0.0
+    _rate: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
 
     def __post_init__(self):
         self._tokens = self.calls
         self._last = time.monotonic()
+        self._capacity = self.calls
+        self._rate = self.calls / self.period_seconds
+
+    def _reserve(self) -> float:
+        """
+        Take one token and return how long the caller must sleep before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, sleep_s = _take_token(self._tokens, self._last, now, self._capacity, self._rate)
+            self._last = now
+            return sleep_s
 
     def wait(self):
-        now = time.monotonic()
-        elapsed = now - self._last
-        self._last = now
-
-        # refill tokens
-        refill = elapsed * (self.calls / self.period_seconds)
-        self._tokens = min(self.calls, self._tokens + refill)
-
-        if self._tokens < 1:
-            # need to wait until we have 1 token
-            needed = 1 - self._tokens
-            sleep_s = needed * (self.period_seconds / self.calls)
+        sleep_s = self._reserve()
+        if sleep_s > 0:
             time.sleep(sleep_s)
-            self._tokens = 0  # will become ~1 after sleep and next refill
-        else:
-            self._tokens -= 1
-
-def rate_limited(limiter):
-    def deco(fn):
-        @wraps(fn)
-        def wrapper(*args, **kwargs):
-            limiter.wait()
-            return fn(*args, **kwargs)
-        return wrapper
-    return deco
\ No newline at end of file
+
+    async def wait_async(self):
+        # same reservation, but the wait yields to the event loop instead of blocking it
+        sleep_s = self._reserve()
+        if sleep_s > 0:
+            await asyncio.sleep(sleep_s)
+
+    def observe(
+        self,
+        remaining: float,
+        limit: Optional[float] = None,
+        period_seconds: Optional[float] = None,
+        reset_in: Optional[float] = None,
+    ):
+        """
+        Sync the bucket with quota numbers reported by the server.
+        limit / period_seconds describe the server-side window (default: ours),
+        reset_in is how long until that window resets (default: period_seconds).
+        """
+        period_seconds = period_seconds or self.period_seconds
+        capacity, rate = _adapt_to_server(
+            remaining,
+            limit or self.calls,
+            period_seconds,
+            reset_in or period_seconds,
+        )
+        with self._lock:
+            now = time.monotonic()
+            tokens = _refill(self._tokens, self._last, now, self._capacity, self._rate)
+            self._tokens = _sync_tokens(tokens, capacity, remaining)
+            self._capacity, self._rate = capacity, rate
+            self._last = now
+
+
+@dataclass
+class SharedRateLimiter:
+    """
+    Token bucket whose state lives in a SQLite file instead of process memory.
+    Every thread, process and Dagster run that uses the same db_path + name
+    draws from one budget, and the budget survives restarts.
+
+    Uses wall-clock time (time.time) because monotonic clocks are not
+    comparable across processes.
+    """
+    name: str
+    calls: int
+    period_seconds: float
+    db_path: str = "state/rate_limits.sqlite"
+    _db: ThreadLocalSqlite = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._db = ThreadLocalSqlite(self.db_path, """
+            CREATE TABLE IF NOT EXISTS rate_limiter (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                last REAL NOT NULL,
+                capacity REAL NOT NULL,
+                rate REAL NOT NULL
+            );
+        """)
+
+    def _write(self, conn: sqlite3.Connection, tokens: float, last: float, capacity: float, rate: float):
+        conn.execute(
+            """
+            INSERT INTO rate_limiter (name, tokens, last, capacity, rate) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                tokens = excluded.tokens,
+                last = excluded.last,
+                capacity = excluded.capacity,
+                rate = excluded.rate
+            """,
+            (self.name, tokens, last, capacity, rate),
+        )
+
+    def _reserve(self) -> float:
+        with self._db.transaction() as conn:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, last, capacity, rate FROM rate_limiter WHERE name = ?", (self.name,)
+            ).fetchone()
+            tokens, last, capacity, rate = row if row else (self.calls, now, self.calls, self.calls / self.period_seconds)
+            tokens, sleep_s = _take_token(tokens, last, now, capacity, rate)
+            self._write(conn, tokens, now, capacity, rate)
+        return sleep_s
+
+    def wait(self):
+        sleep_s = self._reserve()
+        if sleep_s > 0:
+            time.sleep(sleep_s)
+
+    async def wait_async(self):
+        # same reservation, but the wait yields to the event loop instead of blocking it
+        sleep_s = self._reserve()
+        if sleep_s > 0:
+            await asyncio.sleep(sleep_s)
+
+    def observe(
+        self,
+        remaining: float,
+        limit: Optional[float] = None,
+        period_seconds: Optional[float] = None,
+        reset_in: Optional[float] = None,
+    ):
+        """
+        Same as RateLimiter.observe, written through to the shared store.
+        """
+        period_seconds = period_seconds or self.period_seconds
+        capacity, rate = _adapt_to_server(
+            remaining,
+            limit or self.calls,
+            period_seconds,
+            reset_in or period_seconds,
+        )
+        with self._db.transaction() as conn:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, last, capacity, rate FROM rate_limiter WHERE name = ?", (self.name,)
+            ).fetchone()
+            tokens, last, old_capacity, old_rate = row if row else (self.calls, now, self.calls, self.calls / self.period_seconds)
+            tokens = _refill(tokens, last, now, old_capacity, old_rate)
+            self._write(conn, _sync_tokens(tokens, capacity, remaining), now, capacity, rate)
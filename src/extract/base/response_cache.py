@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from src.extract.base.sqlite_local import ThreadLocalSqlite
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+FOREVER = None          # expires_at NULL -> never expires
+
+# a fixture in one of these states will never change again
+FINAL_STATUSES = {"FT", "AET", "PEN"}
+# a fixture in one of these states changes every few seconds -> never served from cache
+IN_PLAY_STATUSES = {"1H", "HT", "2H", "ET", "BT", "P", "SUSP", "INT", "LIVE"}
+
+# per-fixture sub-resources: kept forever once the fixture is final
+FIXTURE_SUB_RESOURCES = {
+    "/fixtures/events",
+    "/fixtures/lineups",
+    "/fixtures/statistics",
+    "/fixtures/players",
+}
+UNFINISHED_FIXTURE_TTL = MINUTE
+
+# seconds to keep a response per endpoint (missing -> not cached)
+ENDPOINT_TTLS: Dict[str, Optional[float]] = {
+    "/leagues": DAY,
+    "/teams": DAY,
+    "/teams/statistics": 6 * HOUR,
+    "/players/squads": DAY,
+    "/players": DAY,
+    "/trophies": 7 * DAY,
+    "/transfers": DAY,
+    "/predictions": HOUR,
+    "/odds": 5 * MINUTE,
+    "/fixtures": HOUR,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_response_cache_last_access ON response_cache (last_access);
+
+CREATE TABLE IF NOT EXISTS fixture_status (
+    fixture_id INTEGER PRIMARY KEY,
+    status_short TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    # None values are dropped by requests too, so they must not change the key
+    return json.dumps(
+        sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None),
+        separators=(",", ":"),
+    )
+
+
+def cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+    return hashlib.sha1(f"{endpoint}?{normalize_params(params)}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for API-Sports json responses.
+      - memory: small LRU of encoded bodies, so repeats inside one run are free
+      - disk: SQLite file shared by every run/process, size-bounded LRU eviction
+
+    How long a response is kept depends on the endpoint (ENDPOINT_TTLS), and for
+    fixture sub-resources on whether the fixture is final. Statuses are learned
+    from every /fixtures response that goes through put().
+    """
+
+    def __init__(
+        self,
+        db_path: str = "state/api_cache.sqlite",
+        max_bytes: int = 512 * 1024 * 1024,
+        memory_entries: int = 1024,
+        evict_every: int = 100,
+    ):
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.evict_every = evict_every
+        self._db = ThreadLocalSqlite(db_path, SCHEMA)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (body, expires_at)
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    # ========================
+    # ttl policy
+    # ========================
+    def fixture_status(self, fixture_id: Any) -> Optional[str]:
+        row = self._db.conn().execute(
+            "SELECT status_short FROM fixture_status WHERE fixture_id = ?", (int(fixture_id),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def fixtures_ttl(self, fixture_ids) -> Optional[float]:
+        """
+        FOREVER once every fixture is final, 0 while any of them is in play
+        (the live producer polls those faster than any TTL), else UNFINISHED_FIXTURE_TTL.
+        """
+        statuses = [self.fixture_status(f) for f in fixture_ids]
+        if all(s in FINAL_STATUSES for s in statuses):
+            return FOREVER
+        if any(s in IN_PLAY_STATUSES for s in statuses):
+            return 0
+        return UNFINISHED_FIXTURE_TTL
+
+    def ttl_for(self, endpoint: str, params: Dict[str, Any]) -> Optional[float]:
+        """
+        Seconds to keep this response, FOREVER (None), or 0 for "don't cache".
+        """
+        params = params or {}
+        if endpoint in FIXTURE_SUB_RESOURCES:
+            fixture_id = params.get("fixture")
+            if fixture_id is None:
+                return UNFINISHED_FIXTURE_TTL
+            return self.fixtures_ttl([fixture_id])
+        if endpoint == "/fixtures" and params.get("live"):
+            return 0
+        if endpoint == "/fixtures" and (params.get("id") or params.get("ids")):
+            return self.fixtures_ttl(str(params.get("ids") or params.get("id")).split("-"))
+        return ENDPOINT_TTLS.get(endpoint, 0)
+
+    def record_fixture_statuses(self, payload: Dict[str, Any]):
+        now = time.time()
+        rows = []
+        for item in payload.get("response", []) or []:
+            fixture = (item or {}).get("fixture", {}) or {}
+            if fixture.get("id"):
+                rows.append((fixture["id"], (fixture.get("status", {}) or {}).get("short"), now))
+        if rows:
+            with self._db.transaction() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO fixture_status (fixture_id, status_short, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(fixture_id) DO UPDATE SET
+                        status_short = excluded.status_short,
+                        updated_at = excluded.updated_at
+                    """,
+                    rows,
+                )
+
+    # ========================
+    # memory tier
+    # ========================
+    def _memory_get(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is None:
+                return None
+            body, expires_at = hit
+            if expires_at is not None and expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return body
+
+    def _memory_put(self, key: str, body: bytes, expires_at: Optional[float]):
+        with self._lock:
+            self._memory[key] = (body, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # ========================
+    # public api
+    # ========================
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # an entry stored before kick-off must not be served once the fixture is in play
+        if self.ttl_for(endpoint, params) == 0:
+            return None
+
+        key = cache_key(endpoint, params)
+        now = time.time()
+
+        body = self._memory_get(key, now)
+        if body is not None:
+            return json.loads(body)
+
+        conn = self._db.conn()
+        row = conn.execute(
+            "SELECT body, expires_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        blob, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            return None
+
+        conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+        body = zlib.decompress(blob)
+        self._memory_put(key, body, expires_at)
+        return json.loads(body)
+
+    def put(self, endpoint: str, params: Dict[str, Any], payload: Dict[str, Any]):
+        # API-Sports answers 200 with an "errors" object on quota/param problems -> never cache those
+        if not isinstance(payload, dict) or payload.get("errors"):
+            return
+
+        if endpoint == "/fixtures":
+            self.record_fixture_statuses(payload)
+
+        ttl = self.ttl_for(endpoint, params)
+        if ttl == 0:
+            return
+
+        key = cache_key(endpoint, params)
+        now = time.time()
+        expires_at = None if ttl is FOREVER else now + ttl
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        blob = zlib.compress(body)
+
+        self._memory_put(key, body, expires_at)
+        self._db.conn().execute(
+            """
+            INSERT OR REPLACE INTO response_cache (key, endpoint, body, size, created_at, expires_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (key, endpoint, blob, len(blob), now, expires_at, now),
+        )
+
+        self._puts += 1
+        if self._puts % self.evict_every == 0:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop expired rows, then least-recently-used rows until the file is under max_bytes.
+        """
+        with self._db.transaction() as conn:
+            conn.execute("DELETE FROM response_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            # evict down to 90% so we don't do this on every put
+            target = int(self.max_bytes * 0.9)
+            freed = 0
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM response_cache ORDER BY last_access"):
+                if total - freed <= target:
+                    break
+                doomed.append((key,))
+                freed += size
+            conn.executemany("DELETE FROM response_cache WHERE key = ?", doomed)
+
+
+def default_response_cache() -> Optional[ResponseCache]:
+    """
+    Cache used by the shared client (API_SPORTS_CACHE=0 turns it off).
+    """
+    if os.getenv("API_SPORTS_CACHE", "1") == "0":
+        return None
+    return ResponseCache(
+        db_path=os.getenv("API_SPORTS_CACHE_DB", "state/api_cache.sqlite"),
+        max_bytes=int(os.getenv("API_SPORTS_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    )
@@ -0,0 +1,333 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Iterator
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from src.extract.base.api_limits import API_SPORTS_MINUTE_LIMITER, API_SPORTS_DAILY_LIMITER
+from src.extract.base.response_cache import ResponseCache, default_response_cache
+
+BASE_URL = "https://v3.football.api-sports.io"
+POOL_SIZE = 16
+TIMEOUT = 30
+# concurrent page requests per paged endpoint (still capped by the limiters)
+PAGE_WORKERS = 8
+
+# quota headers sent back by API-Sports on every response
+DAILY_REMAINING_HEADER = "x-ratelimit-requests-remaining"
+DAILY_LIMIT_HEADER = "x-ratelimit-requests-limit"
+MINUTE_REMAINING_HEADER = "X-RateLimit-Remaining"
+MINUTE_LIMIT_HEADER = "X-RateLimit-Limit"
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def seconds_until_utc_midnight() -> float:
+    # API-Sports daily quota resets at 00:00 UTC
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class ApiSportsClient:
+    """
+    One client for every API-Sports call.
+    env file, api key and headers are resolved once, and all requests share
+    a keep-alive session so TCP/TLS setup is paid once per pooled connection.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = BASE_URL,
+        pool_size: int = POOL_SIZE,
+        timeout: float = TIMEOUT,
+        daily_limiter: Any = API_SPORTS_DAILY_LIMITER,
+        minute_limiter: Any = API_SPORTS_MINUTE_LIMITER,
+        adaptive: bool = True,
+        cache: Optional[ResponseCache] = None,
+    ):
+        if api_key is None:
+            load_dotenv("env.sv")
+            api_key = os.getenv("FOOTBALL_API_KEY")
+        if not api_key:
+            raise ValueError("API key not found. Please set FOOTBALL_API_KEY in your environment variables.")
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.daily_limiter = daily_limiter
+        self.minute_limiter = minute_limiter
+        # daily first, then minute (same order as the old decorators)
+        self.limiters = [limiter for limiter in (daily_limiter, minute_limiter) if limiter is not None]
+        # feed the quota headers of every response back into the limiters
+        self.adaptive = adaptive
+        # optional ResponseCache in front of every call
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update({"x-apisports-key": api_key})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def get_json(self, endpoint: str, params: Dict[str, Any], error_label: str) -> Optional[Dict[str, Any]]:
+        """
+        GET {base_url}{endpoint} under the shared limiters.
+        Returns the decoded json, or None (after printing) on non-200.
+        A cache hit returns before touching the limiters, so it costs no quota.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+
+        for limiter in self.limiters:
+            limiter.wait()
+
+        response = self.session.get(f"{self.base_url}{endpoint}", params=params, timeout=self.timeout)
+        if self.adaptive:
+            self.observe_quota(response.headers)
+        if response.status_code == 200:
+            payload = response.json()
+            if self.cache is not None:
+                self.cache.put(endpoint, params, payload)
+            return payload
+        print(f"Error fetching {error_label}: {response.status_code} - {response.text}")
+        return None
+
+    def observe_quota(self, headers):
+        """
+        Sync the limiters with the server-side budget reported in the response headers.
+        """
+        daily_remaining = _header_number(headers, DAILY_REMAINING_HEADER)
+        if daily_remaining is not None and self.daily_limiter is not None:
+            self.daily_limiter.observe(
+                daily_remaining,
+                limit=_header_number(headers, DAILY_LIMIT_HEADER),
+                period_seconds=86400,
+                reset_in=seconds_until_utc_midnight(),
+            )
+
+        minute_remaining = _header_number(headers, MINUTE_REMAINING_HEADER)
+        if minute_remaining is not None and self.minute_limiter is not None:
+            self.minute_limiter.observe(
+                minute_remaining,
+                limit=_header_number(headers, MINUTE_LIMIT_HEADER),
+                period_seconds=60,
+            )
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        error_label: str,
+        max_workers: int = PAGE_WORKERS,
+        errors: Optional[List[Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pagination engine for paged endpoints (/players, /odds, ...).
+        Fetches page 1, reads paging.total, then requests pages 2..total
+        concurrently. Each page goes through get_json (limiters + cache) and
+        is yielded as soon as it arrives, so pages may come out of order.
+        A page without a response is skipped and, when a list is passed in,
+        recorded in `errors` so the caller can tell a partial result apart.
+        """
+        first = self.get_json(endpoint, {**params, "page": 1}, f"{error_label} page=1")
+        if first is None:
+            if errors is not None:
+                errors.append({"page": 1, "request": "no response"})
+            return
+        yield first
+
+        total = (first.get("paging", {}) or {}).get("total") or 1
+        if total <= 1 or not first.get("response"):
+            return
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, total - 1))
+        try:
+            futures = {
+                pool.submit(self.get_json, endpoint, {**params, "page": page}, f"{error_label} page={page}"): page
+                for page in range(2, total + 1)
+            }
+            for future in as_completed(futures):
+                payload = future.result()
+                if payload is not None:
+                    yield payload
+                elif errors is not None:
+                    errors.append({"page": futures[future], "request": "no response"})
+        finally:
+            # consumer stopped early -> drop pages that haven't started
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # ========================
+    # league
+    # ========================
+    def fetch_league_data(self, league_id: int, season: int) -> Optional[Dict[str, Any]]:
+        return self.get_json(
+            "/leagues",
+            {"id": league_id, "season": season},
+            f"data for league {league_id}",
+        )
+
+    # ========================
+    # fixtures
+    # ========================
+    def fetch_fixture_data(self, season: int, league_id: int, date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        params = {"season": season, "league": league_id}
+        if date:
+            params["date"] = date
+        return self.get_json(
+            "/fixtures",
+            params,
+            f"historical data for season {season}, league {league_id}",
+        )
+
+    def fetch_fixtures_by_ids(self, fixture_ids: List[int]) -> Optional[Dict[str, Any]]:
+        # up to 20 ids per call; each fixture comes back with events, lineups, statistics and players embedded
+        return self.get_json(
+            "/fixtures",
+            {"ids": "-".join(map(str, fixture_ids))},
+            f"fixtures {fixture_ids[:3]}... ({len(fixture_ids)} ids)",
+        )
+
+    def fetch_live_fixtures(self, league_ids: List[int]) -> Optional[Dict[str, Any]]:
+        # every in-play fixture of these leagues, events embedded, in one call
+        return self.get_json(
+            "/fixtures",
+            {"live": "-".join(map(str, league_ids))},
+            f"live fixtures for leagues {league_ids}",
+        )
+
+    def fetch_fixture_events(self, fixture_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json("/fixtures/events", {"fixture": fixture_id}, f"events for fixture {fixture_id}")
+
+    def fetch_fixture_lineups(self, fixture_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json("/fixtures/lineups", {"fixture": fixture_id}, f"lineups for fixture {fixture_id}")
+
+    def fetch_fixture_statistic(self, fixture_id: int, team_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json(
+            "/fixtures/statistics",
+            {"fixture": fixture_id, "team": team_id},
+            f"team statistic for fixture {fixture_id}",
+        )
+
+    def fetch_players_statistic(self, fixture_id: int, team_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json(
+            "/fixtures/players",
+            {"fixture": fixture_id, "team": team_id},
+            f"players statistic for fixture {fixture_id}",
+        )
+
+    def fetch_match_prediction(self, fixture_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json("/predictions", {"fixture": fixture_id}, f"match prediction {fixture_id}")
+
+    def fetch_match_odd(self, fixture_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json("/odds", {"fixture": fixture_id}, f"odd betting {fixture_id}")
+
+    # ========================
+    # teams
+    # ========================
+    def fetch_team_ID_from_League(self, league_id: int, season: int) -> Optional[Dict[str, Any]]:
+        data = self.get_json("/teams", {"league": league_id, "season": season}, f"data for league {league_id}")
+        if data is not None:
+            print(f'Beginning fetched data for league {league_id}{season}')
+        return data
+
+    def fetch_team_statistics(
+        self, team_id: int, season: int, league_id: int, date: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        params = {"season": season, "team": team_id, "league": league_id}
+        if date:
+            params["date"] = date
+        return self.get_json("/teams/statistics", params, f"statistics for team {team_id}")
+
+    # ========================
+    # players
+    # ========================
+    def fetch_team_squad(self, team_id: int, date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self.get_json("/players/squads", {"team": team_id}, f"squad for team {team_id}")
+
+    def fetch_player_trophies_bulk(self, player_ids: List[int]) -> Optional[Dict[str, Any]]:
+        return self.get_json(
+            "/trophies",
+            {"players": "-".join(map(str, player_ids))},
+            "trophies for player ",
+        )
+
+    def iter_player_statistics_by_season(
+        self, team_id: int, season: int, league_id: int, errors: Optional[List[Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        return self.iter_pages(
+            "/players",
+            {"team": team_id, "league": league_id, "season": season},
+            f"players stats (team={team_id})",
+            errors=errors,
+        )
+
+    def fetch_player_statistics_by_season(self, team_id: int, season: int, league_id: int) -> Optional[Dict[str, Any]]:
+        pages = sorted(
+            self.iter_player_statistics_by_season(team_id=team_id, season=season, league_id=league_id),
+            key=lambda p: (p.get("paging", {}) or {}).get("current") or 0,
+        )
+        all_response = [item for page in pages for item in (page.get("response", []) or [])]
+
+        return {
+            "team_id": team_id,
+            "league_id": league_id,
+            "season": season,
+            "results": len(all_response),
+            "response": all_response
+        }
+
+    # ========================
+    # odds (paged)
+    # ========================
+    def iter_odds(
+        self,
+        league_id: Optional[int] = None,
+        season: Optional[int] = None,
+        date: Optional[str] = None,
+        fixture_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        params = {"league": league_id, "season": season, "date": date, "fixture": fixture_id}
+        return self.iter_pages(
+            "/odds",
+            {k: v for k, v in params.items() if v is not None},
+            f"odds (league={league_id}, season={season}, date={date}, fixture={fixture_id})",
+        )
+
+    # ========================
+    # transfers
+    # ========================
+    def fetch_team_transfer(self, team_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json("/transfers", {"team": team_id}, f"transfers for team {team_id}")
+
+    def fetch_player_transfer(self, player_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_json("/transfers", {"player": player_id}, f"transfers for player {player_id}")
+
+
+_CLIENT: Optional[ApiSportsClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_api_client() -> ApiSportsClient:
+    """
+    Shared client for the whole package (built on first use).
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = ApiSportsClient(cache=default_response_cache())
+    return _CLIENT
@@ -1,9 +1,10 @@
-from src.extract.football_api.api_fixture import fetch_fixture_data,fetch_fixture_events,fetch_fixture_lineups,fetch_match_odd,fetch_match_prediction,fetch_players_statistic, fetch_fixture_statistic
-from typing import Optional, Tuple, List, Dict, Any
+from src.extract.football_api.api_fixture import fetch_fixtures_by_ids, fetch_fixture_data,fetch_fixture_events,fetch_fixture_lineups,fetch_match_odd,fetch_match_prediction,fetch_players_statistic, fetch_fixture_statistic
+from typing import Optional, Tuple, List, Dict, Any, Iterator
 import json
 from datetime import datetime, timezone
 from pathlib import Path
 from zoneinfo import ZoneInfo
+from src.extract.base.api_rows import SOURCE, now_extracted, api_errors, response_items, collect_items
 
 def export_json(data: dict, prefix: str):
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -20,25 +21,12 @@ def chunked(items, size):
 
 
 
-def extract_league_fixture(
-    season: int,
-    league_id: int,
-    date: Optional[str] = None,
-    limit: Optional[int] = None
-) -> Tuple[List[int], List[Dict[str, Any]], List[Any]]:
-
-    fixture_data = fetch_fixture_data(league_id=league_id, season=season, date=date)
-
-    data = fixture_data.get("response", []) or []
-    errors = fixture_data.get("errors", []) or fixture_data.get("error", []) or []
-
-    if limit is not None:
-        data = data[:limit]
-
-    fixture_ids: List[int] = []
-    fixture_rows: List[Dict[str, Any]] = []
-
-    for item in data:
+# ========================
+# row builders: one API payload -> RAW row dicts (lazy)
+# ========================
+def fixture_rows_from(season: int, league_id: int, items: List[Any]) -> Iterator[Dict[str, Any]]:
+    extracted_at = now_extracted()
+    for item in items:
         fixture = item.get("fixture", {}) or {}
         teams = item.get("teams", {}) or {}
         home = teams.get("home", {}) or {}
@@ -48,176 +36,193 @@ def extract_league_fixture(
         if not fixture_id:
             continue
 
-        fixture_ids.append(fixture_id)
-
-        fixture_rows.append({
+        yield {
             "league_id": league_id,
             "season": season,
             "fixture_id": fixture_id,
             "fixture_date": fixture.get("date"),
             "home_team_id": home.get("id"),
             "away_team_id": away.get("id"),
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
-
-    return fixture_ids, fixture_rows, errors
-        
-
-def extract_fixture_events(
-    fixture_id: int,
-    limit: Optional[int] = None
-) -> Tuple[List[Dict[str, Any]], List[Any]]:
-
-    fixture_events = fetch_fixture_events(fixture_id=fixture_id)
-
-    data = fixture_events.get("response", []) or []
-    errors = fixture_events.get("errors", []) or fixture_events.get("error", []) or []
-
-    if limit is not None:
-        data = data[:limit]
+        }
 
-    event_rows: List[Dict[str, Any]] = []
 
-    for item in data:
-        event_rows.append({
+def event_rows_from(fixture_id: int, items: List[Any]) -> Iterator[Dict[str, Any]]:
+    extracted_at = now_extracted()
+    for item in items:
+        yield {
             "fixture_id": fixture_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
-
-    return event_rows, errors
-
-
-def extract_fixture_lineups(fixture_id: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
-
-    fixture_lineup = fetch_fixture_lineups(fixture_id=fixture_id)
-
-    data= fixture_lineup.get("response",[]) or []
-    errors= fixture_lineup.get("errors", []) or fixture_lineup.get("error", []) or []
-
+        }
 
-    if limit is not None:
-        data = data[:limit]
-    
-    lineup_rows: List[Dict[str, Any]] = []
 
-    for idx, item in enumerate(data):
+def lineup_rows_from(fixture_id: int, items: List[Any]) -> Iterator[Dict[str, Any]]:
+    extracted_at = now_extracted()
+    for idx, item in enumerate(items):
         team = item.get("team", {}) or {}
 
         side = "home" if idx == 0 else "away" if idx == 1 else f"unknown_{idx}"
 
-        lineup_rows.append({
+        yield {
             "fixture_id": fixture_id,
             "side": side,  # home/away
             "team_id": team.get("id"),
             "team_name": team.get("name"),
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
-
-    return lineup_rows, errors
-
-def extract_fixture_statistic(fixture_id: int, team_id: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
-
-    fixture_statistic = fetch_fixture_statistic(fixture_id=fixture_id, team_id=team_id)
-    data = fixture_statistic.get("response",[]) or []
-    errors = fixture_statistic.get("errors", []) or fixture_statistic.get("error", []) or []
+        }
 
 
-    if limit is not None:
-        data = data[:limit]
-          
-    raw_rows = []
-    for item in data:
-        raw_rows.append({
+def players_statistic_rows_from(fixture_id: int, team_id: int, side: str, items: List[Any]) -> Iterator[Dict[str, Any]]:
+    extracted_at = now_extracted()
+    for item in items:
+        yield {
             'fixture_id' :fixture_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            'team_id' : team_id,
+            "side": side,  # home/away
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload" : item
-
         }
 
-    )    
-    
-    return raw_rows, errors
 
-def extract_fixture_players_statistic(fixture_id: int, team_id: int, side: str, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
+# statistics / predictions / odds rows share the event row shape
+statistic_rows_from = event_rows_from
+prediction_rows_from = event_rows_from
+odd_rows_from = event_rows_from
 
-    fixture_players_statistic = fetch_players_statistic(fixture_id=fixture_id, team_id=team_id)
-    data = fixture_players_statistic.get("response",[]) or []
-    errors = fixture_players_statistic.get("errors", []) or fixture_players_statistic.get("error", []) or []
-
-    if limit is not None:
-        data = data[:limit]
-          
-    raw_rows = []
-    for item in data:
-        raw_rows.append({
-            'fixture_id' :fixture_id,
-            'team_id' : team_id,
-            "side": side,  # home/away
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
-            "payload" : item
 
-        }
+# ========================
+# extract_*: materialized (rows, errors)
+# ========================
+def extract_league_fixture(
+    season: int,
+    league_id: int,
+    date: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[int], List[Dict[str, Any]], List[Any]]:
 
-    )        
-    return raw_rows , errors    
+    fixture_data = fetch_fixture_data(league_id=league_id, season=season, date=date)
 
+    fixture_rows = list(fixture_rows_from(season, league_id, response_items(fixture_data, limit)))
+    fixture_ids = [row["fixture_id"] for row in fixture_rows]
 
-def extract_fixture_predictions(fixture_id: int,limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
+    return fixture_ids, fixture_rows, api_errors(fixture_data)
+        
 
-    fixture_predictions = fetch_match_prediction(fixture_id=fixture_id)
-    data = fixture_predictions.get("response",[]) or []
-    errors = fixture_predictions.get("errors", []) or fixture_predictions.get("error", []) or []
+def extract_fixture_events(
+    fixture_id: int,
+    limit: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Any]]:
 
+    fixture_events = fetch_fixture_events(fixture_id=fixture_id)
+    return list(event_rows_from(fixture_id, response_items(fixture_events, limit))), api_errors(fixture_events)
 
-    if limit is not None:
-        data = data[:limit]
-          
-    raw_rows = []
-    for item in data:
-        raw_rows.append({
-            'fixture_id' :fixture_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
-            "payload" : item
 
-        }
+def extract_fixture_lineups(fixture_id: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
 
-    )    
-    
-    return raw_rows, errors
+    fixture_lineup = fetch_fixture_lineups(fixture_id=fixture_id)
+    return list(lineup_rows_from(fixture_id, response_items(fixture_lineup, limit))), api_errors(fixture_lineup)
 
+def extract_fixture_statistic(fixture_id: int, team_id: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
 
-def extract_fixture_odds(fixture_id: int,limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
+    fixture_statistic = fetch_fixture_statistic(fixture_id=fixture_id, team_id=team_id)
+    return list(statistic_rows_from(fixture_id, response_items(fixture_statistic, limit))), api_errors(fixture_statistic)
 
-    fixture_odds = fetch_match_odd(fixture_id=fixture_id)
-    data = fixture_odds.get("response",[]) or []
-    errors = fixture_odds.get("errors", []) or fixture_odds.get("error", []) or []
+def extract_fixture_players_statistic(fixture_id: int, team_id: int, side: str, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
 
+    fixture_players_statistic = fetch_players_statistic(fixture_id=fixture_id, team_id=team_id)
+    return (
+        list(players_statistic_rows_from(fixture_id, team_id, side, response_items(fixture_players_statistic, limit))),
+        api_errors(fixture_players_statistic)
+    )
 
-    if limit is not None:
-        data = data[:limit]
-          
-    raw_rows = []
-    for item in data:
-        raw_rows.append({
-            'fixture_id' :fixture_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
-            "payload" : item
 
-        }
+def extract_fixture_predictions(fixture_id: int,limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
 
-    )    
-    
-    return raw_rows, errors
+    fixture_predictions = fetch_match_prediction(fixture_id=fixture_id)
+    return list(prediction_rows_from(fixture_id, response_items(fixture_predictions, limit))), api_errors(fixture_predictions)
+
+
+def extract_fixture_odds(fixture_id: int,limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]],List[Any]]:
+
+    fixture_odds = fetch_match_odd(fixture_id=fixture_id)
+    return list(odd_rows_from(fixture_id, response_items(fixture_odds, limit))), api_errors(fixture_odds)
+
+
+# ========================
+# hydration: /fixtures?ids=a-b-c (up to 20 per call) with sub-resources embedded
+# ========================
+HYDRATE_BATCH_SIZE = 20
+
+
+def _team_section(items: List[Any], team_id: Any) -> List[Any]:
+    return [x for x in items or [] if ((x or {}).get("team", {}) or {}).get("id") == team_id]
+
+
+def split_fixture_sections(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One hydrated /fixtures item -> bundle in the extract_fixture_bundle shape, with
+    rows matching RAW_FIXTURE_EVENT / RAW_FIXTURE_LINE_UP / RAW_FIXTURE_STATISTICS /
+    RAW_FIXTURE_PLAYERS_STATISTIC (predictions / odds are not embedded).
+    """
+    fixture_id = (item.get("fixture", {}) or {}).get("id")
+    teams = item.get("teams", {}) or {}
+    team_ids = {
+        "home": (teams.get("home", {}) or {}).get("id"),
+        "away": (teams.get("away", {}) or {}).get("id"),
+    }
+
+    bundle = {
+        "teams": team_ids,
+        "events": (list(event_rows_from(fixture_id, item.get("events") or [])), []),
+        "lineups": (list(lineup_rows_from(fixture_id, item.get("lineups") or [])), []),
+        "statistics": {},
+        "players": {},
+    }
+    for side, team_id in team_ids.items():
+        if not team_id:
+            continue
+        bundle["statistics"][side] = (
+            list(statistic_rows_from(fixture_id, _team_section(item.get("statistics"), team_id))),
+            []
+        )
+        bundle["players"][side] = (
+            list(players_statistic_rows_from(fixture_id, team_id, side, _team_section(item.get("players"), team_id))),
+            []
+        )
+    return bundle
+
+
+def iter_hydrated_fixtures(
+    fixture_ids: List[int],
+    batch_size: int = HYDRATE_BATCH_SIZE,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    yield (fixture_id, bundle) for every fixture the API returned,
+    one /fixtures?ids= call per batch_size fixtures
+    """
+    for batch in chunked(list(fixture_ids), batch_size):
+        payload = fetch_fixtures_by_ids(batch)
+        for item in collect_items(payload, None, errors):
+            fixture_id = (item.get("fixture", {}) or {}).get("id")
+            if fixture_id:
+                yield fixture_id, split_fixture_sections(item)
+
+
+def hydrate_fixture_bundles(
+    fixture_ids: List[int],
+    batch_size: int = HYDRATE_BATCH_SIZE
+) -> Tuple[Dict[int, Dict[str, Any]], List[Any]]:
+    errors: List[Any] = []
+    bundles = dict(iter_hydrated_fixtures(fixture_ids, batch_size=batch_size, errors=errors))
+    return bundles, errors
 
 
 LIVE_CODES = {"1H", "2H", "HT", "ET", "BT", "P", "INT"}
@@ -0,0 +1,117 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Tuple, List, Dict, Any
+from src.extract.football_api.api_client import POOL_SIZE
+from src.extract.football_extract.extract_fixture import (
+    extract_fixture_events,
+    extract_fixture_lineups,
+    extract_fixture_predictions,
+    extract_fixture_odds,
+    extract_fixture_statistic,
+    extract_fixture_players_statistic,
+)
+
+# how many fixtures the loaders fan out together
+FIXTURE_WINDOW = 20
+
+ALL_RESOURCES = ("events", "lineups", "predictions", "odds", "statistics", "players")
+
+
+async def _run_extract(loop, pool, fn, **kwargs) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """
+    Run one blocking extract_fixture_* call on the pool.
+    A failed call becomes ([], [error]) so one bad fixture doesn't sink the window.
+    """
+    try:
+        return await loop.run_in_executor(pool, partial(fn, **kwargs))
+    except Exception as e:
+        return [], [{"function": fn.__name__, **kwargs, "error": str(e)}]
+
+
+async def extract_fixture_bundle_async(
+    fixture_rows: List[Dict[str, Any]],
+    max_concurrency: int = POOL_SIZE,
+    resources: Tuple[str, ...] = ALL_RESOURCES,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Fetch every sub-resource for a window of fixtures concurrently.
+    resources: subset of ALL_RESOURCES to fetch (missing keys are left out of the bundle)
+
+    fixture_rows: rows from extract_league_fixture (needs fixture_id, home_team_id, away_team_id)
+
+    Returns {fixture_id: bundle} where each value is the (rows, errors) tuple of the
+    matching extract_fixture_* function:
+        {
+            "teams": {"home": team_id, "away": team_id},
+            "events": (rows, errors),
+            "lineups": (rows, errors),
+            "predictions": (rows, errors),
+            "odds": (rows, errors),
+            "statistics": {"home": (rows, errors), "away": (rows, errors)},
+            "players": {"home": (rows, errors), "away": (rows, errors)},
+        }
+
+    Every request still goes through the shared client, so the whole window
+    stays under API_SPORTS_MINUTE_LIMITER / API_SPORTS_DAILY_LIMITER.
+    """
+    loop = asyncio.get_running_loop()
+    bundles: Dict[int, Dict[str, Any]] = {}
+    keys: List[Tuple[Any, ...]] = []
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for row in fixture_rows:
+            fixture_id = row.get("fixture_id")
+            if not fixture_id:
+                continue
+
+            teams = {"home": row.get("home_team_id"), "away": row.get("away_team_id")}
+            bundles[fixture_id] = {"teams": teams, "statistics": {}, "players": {}}
+
+            for name, fn in (
+                ("events", extract_fixture_events),
+                ("lineups", extract_fixture_lineups),
+                ("predictions", extract_fixture_predictions),
+                ("odds", extract_fixture_odds),
+            ):
+                if name not in resources:
+                    continue
+                keys.append((fixture_id, name))
+                calls.append(_run_extract(loop, pool, fn, fixture_id=fixture_id))
+
+            for side, team_id in teams.items():
+                if not team_id:
+                    continue
+                if "statistics" in resources:
+                    keys.append((fixture_id, "statistics", side))
+                    calls.append(_run_extract(loop, pool, extract_fixture_statistic, fixture_id=fixture_id, team_id=team_id))
+                if "players" in resources:
+                    keys.append((fixture_id, "players", side))
+                    calls.append(_run_extract(
+                        loop, pool, extract_fixture_players_statistic,
+                        fixture_id=fixture_id, team_id=team_id, side=side
+                    ))
+
+        results = await asyncio.gather(*calls)
+
+    for key, result in zip(keys, results):
+        if len(key) == 2:
+            fixture_id, name = key
+            bundles[fixture_id][name] = result
+        else:
+            fixture_id, name, side = key
+            bundles[fixture_id][name][side] = result
+
+    return bundles
+
+
+def extract_fixture_bundle(
+    fixture_rows: List[Dict[str, Any]],
+    max_concurrency: int = POOL_SIZE,
+    resources: Tuple[str, ...] = ALL_RESOURCES,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Sync entry point for extract_fixture_bundle_async (for the loaders).
+    """
+    return asyncio.run(extract_fixture_bundle_async(fixture_rows, max_concurrency=max_concurrency, resources=resources))
@@ -2,7 +2,10 @@ import kagglehub
 import pandas as pd
 from pathlib import Path
 from datetime import datetime, timezone
-import json
+import gzip
+from typing import Iterator, List, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 RAW_DIR = Path("data/raw/football_manager")
 RAW_DIR.mkdir(parents=True, exist_ok=True)
@@ -19,33 +22,91 @@ def fetch_fm_data():
     return Path(path)
 
 
-def extract_and_export():
+# rows held in memory at once per file
+CHUNK_ROWS = 50_000
+OUTPUT_FORMATS = ("parquet", "ndjson")
+
+
+def iter_frames(file: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    read a CSV / Parquet file chunk_rows at a time.
+    CSV columns are read as strings so every chunk has the same schema
+    (and the same values the csv loader sends as payload).
+    """
+    if file.suffix.lower() == ".csv":
+        yield from pd.read_csv(file, chunksize=chunk_rows, dtype=str)
+        return
+
+    parquet = pq.ParquetFile(file)
+    for batch in parquet.iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def export_file(
+    file: Path,
+    extracted_at: str,
+    output_format: str = "parquet",
+    chunk_rows: int = CHUNK_ROWS,
+    out_dir: Path = RAW_DIR,
+) -> Tuple[Path, int]:
+    """
+    convert one dataset file to {stem}.parquet or {stem}.ndjson.gz,
+    with source_file and extracted_at added as columns.
+    returns (out_file, rows)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+
+    suffix = ".parquet" if output_format == "parquet" else ".ndjson.gz"
+    out_file = out_dir / f"{file.stem}{suffix}"
+    rows = 0
+    writer = None
+    ndjson = gzip.open(out_file, "wt", encoding="utf-8") if output_format == "ndjson" else None
+    try:
+        for df in iter_frames(file, chunk_rows):
+            df["source_file"] = file.name
+            df["extracted_at"] = extracted_at
+            rows += len(df)
+
+            if ndjson is not None:
+                ndjson.write(df.to_json(orient="records", lines=True, force_ascii=False, date_format="iso"))
+                continue
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_file, table.schema, compression="zstd")
+            else:
+                # all-null chunks come back as a different type, cast to the first chunk's schema
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+        if ndjson is not None:
+            ndjson.close()
+
+    return out_file, rows
+
+
+def extract_and_export(output_format: str = "parquet", chunk_rows: int = CHUNK_ROWS) -> List[Path]:
     dataset_path = fetch_fm_data()
     extracted_at = datetime.now(timezone.utc).isoformat()
 
     print(f"Dataset downloaded to: {dataset_path}")
 
+    out_files = []
     for file in dataset_path.glob("**/*"):
         if file.suffix.lower() not in [".csv", ".parquet"]:
             continue
 
         print(f"Processing {file.name}")
 
-        df = pd.read_csv(file) if file.suffix == ".csv" else pd.read_parquet(file)
-
-        rows = []
-        for _, row in df.iterrows():
-            rows.append({
-                "source_file": file.name,
-                "extracted_at": extracted_at,
-                "payload": row.to_dict()
-            })
+        out_file, rows = export_file(file, extracted_at, output_format=output_format, chunk_rows=chunk_rows)
+        out_files.append(out_file)
 
-        out_file = RAW_DIR / f"{file.stem}.json"
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"Exported {rows} rows → {out_file}")
 
-        print(f"Exported {len(rows)} rows → {out_file}")
+    return out_files
 
 
 if __name__ == "__main__":
@@ -1,8 +1,9 @@
 from src.extract.football_api.api_league import fetch_league_data
 from src.extract.football_api.api_team import fetch_team_ID_from_League,fetch_team_statistics
-from src.extract.football_api.api_player import fetch_team_squad, fetch_player_trophies_bulk,fetch_player_statistics_by_season
+from src.extract.football_api.api_player import fetch_team_squad, fetch_player_trophies_bulk,fetch_player_statistics_by_season, iter_player_statistics_by_season
 from src.extract.football_api.api_transfer import fetch_player_transfer, fetch_team_transfer
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Iterator
+from src.extract.base.api_rows import SOURCE, now_extracted, api_errors, response_items, collect_items
 import json
 from datetime import datetime, timezone
 from pathlib import Path
@@ -21,52 +22,42 @@ def chunked(items, size):
         yield items[i:i + size]
 
 
+# ========================
+# iter_*: fetch + yield rows lazily (one extracted_at per response)
+# API errors are appended to `errors` when a list is passed in
+# ========================
+
 # Fetch league_data - only interest in league name and season date
-def extract_league_data(
+def iter_league_data(
         league_id: int,
         season: int,
-        limit: Optional[int] = None
-
-) -> List[Dict[str, Any]]:
+        limit: Optional[int] = None,
+        errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
 
     league_data = fetch_league_data(league_id=league_id,season=season)
-    data = league_data.get("response",[]) or []
-    
-    if limit is not None:
-        data = data[:limit]
+    extracted_at = now_extracted()
 
-    raw_rows = []
-    for item in data: 
-    
-        raw_rows.append(
-        {
+    for item in collect_items(league_data, limit, errors):
+        yield {
             "league_id" : league_id,
             "season": season,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload" : item 
-          }
-
-    )
-    return raw_rows
+        }
 
-def extract_team_ids(
+def iter_team_rows(
     league_id: int,
     season: int,
-    limit: Optional[int] = None
-) -> Tuple[List[int], List[Dict[str, Any]], List[Any]]:
+    limit: Optional[int] = None,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
 
     team_data = fetch_team_ID_from_League(league_id=league_id, season=season)
+    extracted_at = now_extracted()
 
-    data = team_data.get("response", []) or []
-    if limit is not None:
-        data = data[:limit]
-
-    team_ids: List[int] = []
-    team_rows: List[Dict[str, Any]] = []
-    errors = team_data.get("errors", []) or team_data.get("error", []) or []
-
-    for item in data:
+    for item in collect_items(team_data, limit, errors):
         team = item.get("team", {}) or {}
         team_id = team.get("id")
 
@@ -74,69 +65,62 @@ def extract_team_ids(
         if not team_id:
             continue
 
-        team_ids.append(team_id)
-        team_rows.append({
+        yield {
             "league_id": league_id,
             "season": season,
             "team_id": team_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
-
-    return team_ids, team_rows, errors
+        }
 
-def extract_team_statistics(
+def iter_team_statistics(
         league_id: int,
         season: int,
-        team_id: int,
-        limit: Optional[int] = None
-) ->  Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-
-    stats_rows: List[Dict[str, Any]] = []
-    api_errors: List[Dict[str, Any]] = []
-
-    team_ids, team_rows, errors = extract_team_ids(
-        league_id=league_id,
-        season=season,
-        limit=limit
-    )
+        team_ids: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+        errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    /teams/statistics for every team of a league-season in one pass.
+    team_ids: an already-fetched team list; if None the league-season team
+    catalog is fetched once (and served from the response cache after that).
+    """
+    if team_ids is None:
+        team_ids = [r["team_id"] for r in iter_team_rows(league_id=league_id, season=season, limit=limit, errors=errors)]
+    elif limit is not None:
+        team_ids = team_ids[:limit]
 
     for team_id in team_ids:
         data = fetch_team_statistics(league_id=league_id,season=season,team_id=team_id)
 
-        if data.get('errors') or data.get('error'):
-            api_errors.append({"team_id": team_id, "errors": data["errors"]})
+        err = api_errors(data)
+        if err:
+            if errors is not None:
+                errors.append({"team_id": team_id, "errors": err})
             continue
-  
-        stats_rows.append({
+
+        yield {
             "league_id": league_id,
             "season": season,
             "team_id": team_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": now_extracted(),
+            "source": SOURCE,
             "payload": data.get("response", {})
-        })
-
-    all_errors = (errors or []) + api_errors
-    return stats_rows, all_errors
+        }
 
-def extract_team_squad_player_ids(
+def iter_team_squad(
     team_id: int,
-    limit: Optional[int] = None
-) -> Tuple[List[int], List[Dict[str, Any]], List[Any]]:
-
+    limit: Optional[int] = None,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    one row per squad player (row["player_id"] is set for convenience)
+    """
     player_data = fetch_team_squad(team_id=team_id)
+    extracted_at = now_extracted()
 
-    errors = player_data.get("errors", []) or player_data.get("error", []) or []
-    response = player_data.get("response", []) or []
-
-    player_ids: List[int] = []
-    squad_rows: List[Dict[str, Any]] = []
-
-    source = "https://www.api-football.com/"
-
-    for item in response:
+    for item in collect_items(player_data, None, errors):
         players = item.get("players", []) or []
 
         if limit is not None:
@@ -148,137 +132,216 @@ def extract_team_squad_player_ids(
             if not player_id:
                 continue
 
-            player_ids.append(player_id)
-            squad_rows.append({
+            yield {
                 "team_id": team_id,
-                "extracted_at": datetime.now(timezone.utc).isoformat(),
-                "source": source,
+                "player_id": player_id,
+                "extracted_at": extracted_at,
+                "source": SOURCE,
                 "payload": players,
-            })
-    
-    return player_ids, squad_rows, errors
-
-# Fetch Player Trophy
-def extract_player_trophies_batch(
-    team_id: int,
-    player_ids: List[int]
-) -> List[Dict[str, Any]]:
-
-    data = fetch_player_trophies_bulk(player_ids)
-    response = data.get("response", []) or []
-
-    rows: List[Dict[str, Any]] = []
-
-    for item in response:
-        rows.append({
-            "team_id": team_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
-            "payload": item
-        })
-
-    return rows
+            }
 
-
-def extract_player_trophies_batched(
+def iter_player_trophies(
     player_ids: List[int],
     team_id: int,
     batch_size: int = 20,
-    max_players: Optional[int] = None
-) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    max_players: Optional[int] = None,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
 
     ids = player_ids[:max_players] if max_players is not None else player_ids
 
-    all_rows: List[Dict[str, Any]] = []
-    errors: List[Dict[str, Any]] = []
-
     for batch_idx, batch in enumerate(chunked(ids, batch_size), start=1):
         print(f"[trophy] batch {batch_idx} | players={len(batch)}")
 
         try:
             batch_rows = extract_player_trophies_batch(team_id,batch)
-            all_rows.extend(batch_rows)
-
         except Exception as e:
-            errors.append({
-                "batch": batch_idx,
-                "player_ids": batch,
-                "error": str(e)
-            })
+            if errors is not None:
+                errors.append({
+                    "batch": batch_idx,
+                    "player_ids": batch,
+                    "error": str(e)
+                })
+            continue
 
-    return all_rows, errors
+        yield from batch_rows
 
-
-def extract_player_transfer(player_id: int,
-    limit: Optional[int] = None
-) -> List[Dict[str, Any]]:
+def iter_player_transfer(player_id: int,
+    limit: Optional[int] = None,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
 
     player_record = fetch_player_transfer(player_id=player_id)
-    data = player_record.get("response", []) or []
-
-    if limit is not None:
-        data = data[:limit]
-
-    raw_rows: List[Dict[str, Any]] = []
+    extracted_at = now_extracted()
 
-    for item in data:
-        raw_rows.append({
+    for item in collect_items(player_record, limit, errors):
+        yield {
             "player_id": player_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
+        }
 
-    return raw_rows
-
-def extract_team_transfer(team_id: int,
-    limit: Optional[int] = None
-) -> List[Dict[str, Any]]:
+def iter_team_transfer(team_id: int,
+    limit: Optional[int] = None,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
 
     team_record = fetch_team_transfer(team_id = team_id)
-    data = team_record.get("response", []) or []
-
-    if limit is not None:
-        data = data[:limit]
+    extracted_at = now_extracted()
 
-    raw_rows: List[Dict[str, Any]] = []
-
-    for item in data:
-        raw_rows.append({
+    for item in collect_items(team_record, limit, errors):
+        yield {
             "team_id": team_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
-
-    return raw_rows
+        }
 
-def extract_players_statistics_byseason(team_id: int,
+def iter_players_statistics_byseason(team_id: int,
     season: int,
     league_id: int,
-     limit: Optional[int] = None
+    limit: Optional[int] = None,
+    errors: Optional[List[Any]] = None
+) -> Iterator[Dict[str, Any]]:
+
+    produced = 0
+
+    # pages are fetched concurrently and handled as they arrive
+    for page in iter_player_statistics_by_season(team_id = team_id,season=season,league_id=league_id, errors=errors):
+        extracted_at = now_extracted()
+        for item in collect_items(page, None, errors):
+            if limit is not None and produced >= limit:
+                return
+            produced += 1
+
+            yield {
+                "team_id": team_id,
+                "extracted_at": extracted_at,
+                "source": SOURCE,
+                "payload": item
+            }
+
+
+# ========================
+# extract_*: materialized lists (same shapes as before)
+# ========================
+
+# Fetch league_data - only interest in league name and season date
+def extract_league_data(
+        league_id: int,
+        season: int,
+        limit: Optional[int] = None
+
 ) -> List[Dict[str, Any]]:
+    return list(iter_league_data(league_id=league_id, season=season, limit=limit))
 
-    team_record = fetch_player_statistics_by_season(team_id = team_id,season=season,league_id=league_id)
-    if not team_record:
-        return []
-    
-    data = team_record.get("response", []) or []
+def extract_team_ids(
+    league_id: int,
+    season: int,
+    limit: Optional[int] = None
+) -> Tuple[List[int], List[Dict[str, Any]], List[Any]]:
+
+    errors: List[Any] = []
+    team_rows = list(iter_team_rows(league_id=league_id, season=season, limit=limit, errors=errors))
+    team_ids = [r["team_id"] for r in team_rows]
+    return team_ids, team_rows, (errors[0] if errors else [])
+
+def extract_team_statistics_batch(
+        league_id: int,
+        season: int,
+        team_ids: Optional[List[int]] = None,
+        limit: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    list version of iter_team_statistics: (stats_rows, errors)
+    """
+    errors: List[Any] = []
+    stats_rows = list(iter_team_statistics(league_id=league_id, season=season, team_ids=team_ids, limit=limit, errors=errors))
+    return stats_rows, errors
+
+def extract_team_statistics(
+        league_id: int,
+        season: int,
+        team_id: Optional[int] = None,
+        limit: Optional[int] = None
+) ->  Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Stats for one team (team_id), or for the whole league-season when team_id is None.
+    """
+    return extract_team_statistics_batch(
+        league_id=league_id,
+        season=season,
+        team_ids=[team_id] if team_id is not None else None,
+        limit=limit
+    )
+
+def extract_team_squad_player_ids(
+    team_id: int,
+    limit: Optional[int] = None
+) -> Tuple[List[int], List[Dict[str, Any]], List[Any]]:
+
+    errors: List[Any] = []
+    squad_rows = list(iter_team_squad(team_id=team_id, limit=limit, errors=errors))
+    player_ids = [r.pop("player_id") for r in squad_rows]
+    return player_ids, squad_rows, (errors[0] if errors else [])
 
-    if limit is not None:
-        data = data[:limit]
+# Fetch Player Trophy
+def extract_player_trophies_batch(
+    team_id: int,
+    player_ids: List[int]
+) -> List[Dict[str, Any]]:
 
-    raw_rows: List[Dict[str, Any]] = []
+    data = fetch_player_trophies_bulk(player_ids)
+    extracted_at = now_extracted()
 
-    for item in data:
-        raw_rows.append({
+    return [
+        {
             "team_id": team_id,
-            "extracted_at": datetime.now(timezone.utc).isoformat(),
-            "source": "https://www.api-football.com/",
+            "extracted_at": extracted_at,
+            "source": SOURCE,
             "payload": item
-        })
+        }
+        for item in response_items(data)
+    ]
+
+
+def extract_player_trophies_batched(
+    player_ids: List[int],
+    team_id: int,
+    batch_size: int = 20,
+    max_players: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+
+    errors: List[Dict[str, Any]] = []
+    all_rows = list(iter_player_trophies(
+        player_ids=player_ids,
+        team_id=team_id,
+        batch_size=batch_size,
+        max_players=max_players,
+        errors=errors
+    ))
+    return all_rows, errors
+
+
+def extract_player_transfer(player_id: int,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    return list(iter_player_transfer(player_id=player_id, limit=limit))
 
-    return raw_rows
+def extract_team_transfer(team_id: int,
+    limit: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    errors: List[Any] = []
+    transfer_rows = list(iter_team_transfer(team_id=team_id, limit=limit, errors=errors))
+    return transfer_rows, errors
+
+def extract_players_statistics_byseason(team_id: int,
+    season: int,
+    league_id: int,
+     limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    return list(iter_players_statistics_byseason(team_id=team_id, season=season, league_id=league_id, limit=limit))
 
 # if __name__ == "__main__":
 #     league_id = 39  # Premier League
@@ -1,11 +1,21 @@
+import argparse
 import os
 import json
 import time
 from datetime import datetime, timezone
 
 from dotenv import load_dotenv
-from confluent_kafka import Consumer, KafkaException
+from confluent_kafka import Consumer
 import snowflake.connector
+from src.kafka.consumer_engine import ConsumerEngine
+from src.kafka.run_budget import RunBudget, add_budget_args, budget_from_args
+from src.kafka.spool import SpoolSink
+from src.load.bulk_insert import bulk_insert
+
+try:
+    import orjson   # same parse as json.loads, several times faster
+except ImportError:
+    orjson = None
 
 
 TOPIC = "fixture.live.events"
@@ -14,6 +24,15 @@ GROUP_ID = "snowflake-live-events-consumer"
 KAFKA_BOOTSTRAP = os.getenv("KAFKA_BOOTSTRAP", "localhost:9092")
 
 SF_TABLE = "FOOTBALL_CAPSTONE.RAW.KAFKA_FIXTURE_LIVE_EVENTS"
+SF_COLUMNS = ["topic", "partition", "offset", "message_key", "message_value", "kafka_timestamp"]
+SF_CASTS = {"message_value": "PARSE_JSON({})", "kafka_timestamp": "{}::timestamp_ntz"}
+
+# "warehouse": insert batches per partition (ConsumerEngine)
+# "spool": append to local compressed segments, upload them in the background (SpoolSink)
+SINK_MODE = os.getenv("KAFKA_SINK_MODE", "warehouse")
+
+# our producer only ever sends json.dumps output: KAFKA_TRUSTED_PRODUCER=1 skips validation
+TRUSTED_PRODUCER = os.getenv("KAFKA_TRUSTED_PRODUCER", "0") == "1"
 
 
 def get_snowflake_connection():
@@ -28,7 +47,7 @@ def get_snowflake_connection():
     )
 
 
-def build_consumer():
+def build_consumer(on_revoke=None):
     conf = {
         "bootstrap.servers": KAFKA_BOOTSTRAP,
         "group.id": GROUP_ID,
@@ -36,34 +55,62 @@ def build_consumer():
         "enable.auto.commit": False,       # commit only after Snowflake insert
     }
     c = Consumer(conf)
-    c.subscribe([TOPIC])
+    if on_revoke is not None:
+        c.subscribe([TOPIC], on_revoke=on_revoke)
+    else:
+        c.subscribe([TOPIC])
     return c
 
 
-def insert_batch(cur, rows):
+def insert_batch(conn, rows):
     """
     rows: list of tuples
-      (topic, partition, offset, key, value_json_str, kafka_ts_ntz_str)
+      (topic, partition, offset, key, value_json_bytes, kafka_ts_ntz_str)
     We'll parse JSON in Snowflake using PARSE_JSON.
+    Large batches are split into statements that fit Snowflake's limits.
     """
-    sql = f"""
-        INSERT INTO {SF_TABLE}
-            (topic, partition, offset, message_key, message_value, kafka_timestamp)
-        SELECT
-            column1, column2, column3, column4, PARSE_JSON(column5), column6::timestamp_ntz
-        FROM VALUES
+    # the connector binds str, values are decoded only here (lazily, chunk by chunk)
+    decoded = (
+        (topic, partition, offset, key, value.decode("utf-8") if value is not None else None, ts)
+        for topic, partition, offset, key, value, ts in rows
+    )
+    return bulk_insert(conn, SF_TABLE, SF_COLUMNS, decoded, casts=SF_CASTS)
+
+
+def is_json(value: bytes) -> bool:
+    """
+    True when value is valid JSON. Not a validate-only check: it runs a full
+    parse, builds the Python object and throws it away. orjson only makes
+    that parse faster than json.loads. KAFKA_TRUSTED_PRODUCER=1 is the only
+    path that skips the per-message parse.
     """
+    try:
+        if orjson is not None:
+            orjson.loads(value)
+        else:
+            json.loads(value)
+        return True
+    except ValueError:   # orjson.JSONDecodeError / json.JSONDecodeError
+        return False
 
-    # Build VALUES placeholders
-    placeholders = ",".join(["(%s,%s,%s,%s,%s,%s)"] * len(rows))
-    sql = sql + " " + placeholders
 
-    # Flatten parameters
-    params = []
-    for r in rows:
-        params.extend(list(r))
+def message_to_row(msg):
+    """
+    kafka message -> (row for the sink, size in bytes).
+    The value is passed through as the original bytes: the spool writes it
+    as-is and Snowflake parses it with PARSE_JSON. Unless the producer is
+    trusted, is_json still parses every value once to validate it.
+    """
+    key = msg.key().decode("utf-8") if msg.key() else None
+    value = msg.value()
+
+    if value is not None and not TRUSTED_PRODUCER and not is_json(value):
+        # store as a JSON string wrapper instead of failing
+        value = json.dumps({"_raw": value.decode("utf-8", errors="replace")}).encode("utf-8")
 
-    cur.execute(sql, params)
+    kafka_ts = kafka_ts_to_ntz(msg.timestamp()[1])
+    row = (msg.topic(), msg.partition(), msg.offset(), key, value, kafka_ts)
+    return row, len(value) if value is not None else 0
 
 
 def kafka_ts_to_ntz(ms):
@@ -75,76 +122,46 @@ def kafka_ts_to_ntz(ms):
     return dt.replace(tzinfo=None).isoformat(sep=" ")
 
 
-def main():
-    load_dotenv(".env.sv")  # adjust if your env file name differs
+def build_sink(mode=SINK_MODE):
+    if mode == "warehouse":
+        return ConsumerEngine(get_snowflake_connection, insert_batch, message_to_row)
+    if mode == "spool":
+        return SpoolSink(get_snowflake_connection, SF_TABLE, SF_COLUMNS, message_to_row)
+    raise ValueError(f"KAFKA_SINK_MODE must be 'warehouse' or 'spool', got {mode!r}")
+
 
-    consumer = build_consumer()
-    conn = get_snowflake_connection()
-    cur = conn.cursor()
+def main(mode=SINK_MODE, budget=None):
+    """
+    budget (RunBudget): stop after max wall time / messages / once caught up;
+    without one the consumer runs until interrupted. returns throughput stats
+    """
+    load_dotenv(".env.sv")  # adjust if your env file name differs
 
-    batch = []
-    BATCH_SIZE = 100
-    POLL_SECONDS = 1.0
+    budget = budget or RunBudget()
+    sink = build_sink(mode)
+    consumer = build_consumer(on_revoke=sink.on_revoke)
 
-    print("Consumer started. Reading Kafka and writing to Snowflake...")
+    print(f"Consumer started. Reading Kafka and writing to Snowflake (sink={mode})...")
 
+    stats = None
     try:
-        while True:
-            msg = consumer.poll(POLL_SECONDS)
-
-            if msg is None:
-                # flush small batches if idle
-                if batch:
-                    insert_batch(cur, batch)
-                    conn.commit()
-                    consumer.commit(asynchronous=False)
-                    print(f"Inserted {len(batch)} rows → Snowflake (idle flush)")
-                    batch.clear()
-                continue
-
-            if msg.error():
-                raise KafkaException(msg.error())
-
-            topic = msg.topic()
-            partition = msg.partition()
-            offset = msg.offset()
-
-            key = msg.key().decode("utf-8") if msg.key() else None
-            value_raw = msg.value().decode("utf-8") if msg.value() else None
-
-            # Validate JSON (optional but helpful)
-            try:
-                json.loads(value_raw) if value_raw else None
-            except json.JSONDecodeError:
-                # store as a JSON string wrapper instead of failing
-                value_raw = json.dumps({"_raw": value_raw})
-
-            kafka_ts = kafka_ts_to_ntz(msg.timestamp()[1])
-
-            batch.append((topic, partition, offset, key, value_raw, kafka_ts))
-
-            if len(batch) >= BATCH_SIZE:
-                insert_batch(cur, batch)
-                conn.commit()
-                consumer.commit(asynchronous=False)  # commit offsets only after DB commit
-                print(f"Inserted {len(batch)} rows → Snowflake")
-                batch.clear()
+        stats = sink.run(consumer, budget)
 
     except KeyboardInterrupt:
         print("Stopping consumer...")
 
     finally:
-        # final flush
-        if batch:
-            insert_batch(cur, batch)
-            conn.commit()
-            consumer.commit(asynchronous=False)
-            print(f"Inserted {len(batch)} rows → Snowflake (final flush)")
-
-        cur.close()
-        conn.close()
+        # sink.run already flushed what it held and committed the matching offsets
         consumer.close()
+        stats = stats or budget.throughput(sink.stats)
+        print(f"Consumer stopped: {stats}")
+
+    return stats
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load fixture.live.events into Snowflake")
+    parser.add_argument("--sink", default=SINK_MODE, choices=["warehouse", "spool"])
+    add_budget_args(parser)
+    args = parser.parse_args()
+    main(mode=args.sink, budget=budget_from_args(args))
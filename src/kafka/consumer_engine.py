@@ -0,0 +1,270 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from confluent_kafka import KafkaException, TopicPartition
+from src.kafka.run_budget import RunBudget, caught_up
+
+# flush a partition batch at whichever limit hits first
+MAX_BATCH_BYTES = int(os.getenv("KAFKA_SINK_MAX_BATCH_BYTES", str(4 * 1024 * 1024)))
+MAX_BATCH_LATENCY = float(os.getenv("KAFKA_SINK_MAX_BATCH_LATENCY", "2.0"))
+# batch size (messages) adapts between these bounds to the observed insert latency
+MIN_BATCH_SIZE = int(os.getenv("KAFKA_SINK_MIN_BATCH_SIZE", "100"))
+MAX_BATCH_SIZE = int(os.getenv("KAFKA_SINK_MAX_BATCH_SIZE", "5000"))
+TARGET_FLUSH_SECONDS = float(os.getenv("KAFKA_SINK_TARGET_FLUSH_SECONDS", "1.0"))
+
+# messages buffered per partition before that partition is paused (backpressure)
+MAX_QUEUED_MESSAGES = 10000
+POLL_BATCH = 500
+POLL_SECONDS = 0.5
+COMMIT_INTERVAL = 1.0
+
+_STOP = object()
+
+PartitionKey = Tuple[str, int]
+
+
+class AdaptiveBatchSize:
+    """
+    batch size in messages: grows while flushes are well under the target
+    latency, halves when a flush takes longer than the target
+    """
+
+    def __init__(self, initial: int = MIN_BATCH_SIZE, minimum: int = MIN_BATCH_SIZE,
+                 maximum: int = MAX_BATCH_SIZE, target_seconds: float = TARGET_FLUSH_SECONDS):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.size = max(minimum, min(maximum, initial))
+
+    def observe(self, rows: int, seconds: float):
+        if seconds > self.target_seconds:
+            self.size = max(self.minimum, self.size // 2)
+        elif seconds < self.target_seconds / 2 and rows >= self.size:
+            # only grow when the batch was actually full (count-bound, not latency-bound)
+            self.size = min(self.maximum, int(self.size * 1.5) + 1)
+
+
+class PartitionWorker(threading.Thread):
+    """
+    Writes one partition's messages in order, on its own warehouse connection.
+    After every warehouse commit it reports the next offset to commit.
+    """
+
+    def __init__(
+        self,
+        key: PartitionKey,
+        connect: Callable[[], Any],
+        write_batch: Callable[[Any, List[Tuple]], int],
+        to_row: Callable[[Any], Tuple[Tuple, int]],
+        on_committed: Callable[[PartitionKey, int, int, int], None],
+    ):
+        super().__init__(name=f"sink-{key[0]}-{key[1]}", daemon=True)
+        self.key = key
+        self.connect = connect
+        self.write_batch = write_batch
+        self.to_row = to_row
+        self.on_committed = on_committed
+        self.queue: "queue.Queue" = queue.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self.sizer = AdaptiveBatchSize()
+        self.error: Optional[BaseException] = None
+        self.batch: List[Tuple] = []
+        self.batch_bytes = 0
+        self.batch_started = 0.0
+        self.last_offset = -1
+
+    def stop(self):
+        # queued messages are still written, then the last batch is flushed
+        if self.is_alive():
+            self.queue.put(_STOP)
+
+    def _flush(self, conn):
+        if not self.batch:
+            return
+        started = time.monotonic()
+        rows = self.write_batch(conn, self.batch)
+        conn.commit()
+        elapsed = time.monotonic() - started
+        self.sizer.observe(len(self.batch), elapsed)
+        # ✅ offset is released only after the warehouse commit
+        self.on_committed(self.key, self.last_offset + 1, rows, self.batch_bytes)
+        self.batch = []
+        self.batch_bytes = 0
+
+    def run(self):
+        conn = None
+        try:
+            conn = self.connect()
+            while True:
+                timeout = None
+                if self.batch:
+                    timeout = max(0.0, self.batch_started + MAX_BATCH_LATENCY - time.monotonic())
+                try:
+                    msg = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    self._flush(conn)   # latency limit
+                    continue
+                if msg is _STOP:
+                    self._flush(conn)
+                    return
+
+                row, nbytes = self.to_row(msg)
+                if not self.batch:
+                    self.batch_started = time.monotonic()
+                self.batch.append(row)
+                self.batch_bytes += nbytes
+                self.last_offset = msg.offset()
+                if len(self.batch) >= self.sizer.size or self.batch_bytes >= MAX_BATCH_BYTES:
+                    self._flush(conn)
+        except BaseException as e:
+            self.error = e
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+class ConsumerEngine:
+    """
+    Poll loop + one PartitionWorker per assigned partition.
+
+    Messages of a partition (= of a fixture, the producer keys by fixture_id)
+    are written in order by that partition's worker, so partitions load in
+    parallel. Offsets are committed per partition, only up to what the worker
+    has committed to the warehouse. A partition whose worker falls behind is
+    paused instead of buffering without limit. On revoke the worker flushes
+    and its offset is committed before the partition moves.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        write_batch: Callable[[Any, List[Tuple]], int],
+        to_row: Callable[[Any], Tuple[Tuple, int]],
+    ):
+        self.connect = connect
+        self.write_batch = write_batch
+        self.to_row = to_row
+        self.workers: Dict[PartitionKey, PartitionWorker] = {}
+        self.held: Dict[PartitionKey, deque] = {}
+        self._lock = threading.Lock()
+        self._ready: Dict[PartitionKey, int] = {}
+        self.stats = {"messages": 0, "rows": 0, "bytes": 0, "flushes": 0, "commits": 0, "paused": 0}
+
+    # ----- called from worker threads -----
+    def _on_committed(self, key: PartitionKey, next_offset: int, rows: int, nbytes: int):
+        with self._lock:
+            self._ready[key] = next_offset
+            self.stats["rows"] += rows
+            self.stats["bytes"] += nbytes
+            self.stats["flushes"] += 1
+
+    # ----- poll thread -----
+    def _worker(self, key: PartitionKey) -> PartitionWorker:
+        worker = self.workers.get(key)
+        if worker is None:
+            worker = PartitionWorker(key, self.connect, self.write_batch, self.to_row, self._on_committed)
+            worker.start()
+            self.workers[key] = worker
+        return worker
+
+    def commit_offsets(self, consumer, keys: Optional[List[PartitionKey]] = None):
+        with self._lock:
+            ready = {k: v for k, v in self._ready.items() if keys is None or k in keys}
+            for k in ready:
+                del self._ready[k]
+        if not ready:
+            return
+        consumer.commit(
+            offsets=[TopicPartition(topic, partition, offset) for (topic, partition), offset in ready.items()],
+            asynchronous=False,
+        )
+        self.stats["commits"] += 1
+
+    def _dispatch(self, consumer, key: PartitionKey, msg) -> bool:
+        try:
+            self._worker(key).queue.put_nowait(msg)
+            return True
+        except queue.Full:
+            # keep it (and everything after it) until the worker catches up
+            self.held.setdefault(key, deque()).append(msg)
+            consumer.pause([TopicPartition(key[0], key[1])])
+            self.stats["paused"] += 1
+            return False
+
+    def _drain_held(self, consumer):
+        for key, pending in list(self.held.items()):
+            worker = self.workers.get(key)
+            while pending and worker is not None:
+                try:
+                    worker.queue.put_nowait(pending[0])
+                except queue.Full:
+                    break
+                pending.popleft()
+            if not pending:
+                del self.held[key]
+                consumer.resume([TopicPartition(key[0], key[1])])
+
+    def _check_workers(self):
+        for worker in self.workers.values():
+            if worker.error is not None:
+                raise worker.error
+
+    def on_revoke(self, consumer, partitions):
+        keys = [(tp.topic, tp.partition) for tp in partitions]
+        for key in keys:
+            self.held.pop(key, None)
+            worker = self.workers.pop(key, None)
+            if worker is not None:
+                worker.stop()
+                worker.join()
+        self.commit_offsets(consumer, keys)
+
+    def poll_once(self, consumer) -> int:
+        """
+        one poll round: dispatch, unpause, commit what is ready. returns messages polled
+        """
+        self._check_workers()
+        self._drain_held(consumer)
+
+        msgs = consumer.consume(num_messages=POLL_BATCH, timeout=POLL_SECONDS)
+        for msg in msgs:
+            if msg.error():
+                raise KafkaException(msg.error())
+            key = (msg.topic(), msg.partition())
+            if key in self.held:
+                self.held[key].append(msg)
+            else:
+                self._dispatch(consumer, key, msg)
+            self.stats["messages"] += 1
+        return len(msgs)
+
+    def run(self, consumer, budget: Optional[RunBudget] = None) -> Dict[str, Any]:
+        """
+        poll until the budget is used up (forever without one), then flush
+        every partition and commit. returns stats with throughput
+        """
+        budget = budget or RunBudget()
+        last_commit = time.monotonic()
+        try:
+            while not budget.exhausted(self.stats["messages"]):
+                polled = self.poll_once(consumer)
+                if time.monotonic() - last_commit >= COMMIT_INTERVAL:
+                    self.commit_offsets(consumer)
+                    last_commit = time.monotonic()
+                if budget.until_caught_up and polled == 0 and not self.held and caught_up(consumer):
+                    break
+        finally:
+            self.shutdown(consumer)
+        return budget.throughput(self.stats)
+
+    def shutdown(self, consumer):
+        # final flush of every partition, then commit what made it to the warehouse
+        for worker in self.workers.values():
+            worker.stop()
+        for worker in self.workers.values():
+            worker.join()
+        self.workers.clear()
+        self.held.clear()
+        self.commit_offsets(consumer)
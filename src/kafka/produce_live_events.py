@@ -1,21 +1,35 @@
+import argparse
+import hashlib
 import json
 from dotenv import load_dotenv
 import os
 import time
-import requests
 import snowflake.connector
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from confluent_kafka import Producer
+from src.extract.football_api.api_client import get_api_client
+from src.kafka.producer import LiveEventProducer
+from src.kafka.run_budget import RunBudget, add_budget_args, budget_from_args
 
 # CONFIG
 
 BASE_URL = "https://v3.football.api-sports.io"
-BOOTSTRAP_SERVERS = "localhost:9092"
+BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP", "localhost:9092")
 TOPIC = "fixture.live.events"
 POLL_INTERVAL = 20
+# upper bound on waiting for delivery reports at the end of a poll cycle
+FLUSH_TIMEOUT = 5.0
+
+# leagues we track (same list as the loaders)
+LIVE_LEAGUE_IDS = [39, 140, 135, 78, 61]
+# "live": one /fixtures?live= call per poll (default)
+# "window": Snowflake fixtures of the last 3 days, one /fixtures?id= call each
+FEED_MODE = os.getenv("LIVE_FEED_MODE", "live")
 
 CURSOR_PATH = Path("state/live_events_cursor.json")
+# fixtures missing from the feed for this long are dropped from the cursor
+CURSOR_TTL_SECONDS = 2 * 24 * 3600
 
 
 def get_snowflake_connection():
@@ -60,73 +74,179 @@ def get_active_fixtures():
 
 
 def load_cursor():
-    if CURSOR_PATH.exists():
-        return json.loads(CURSOR_PATH.read_text())
-    return {}
+    """
+    {fixture_id: {"seen": [event fingerprints], "last_seen": unix ts}}
+    """
+    if not CURSOR_PATH.exists():
+        return {}
+    cursor = json.loads(CURSOR_PATH.read_text())
+    for fixture_id, entry in list(cursor.items()):
+        if not isinstance(entry, dict):
+            # old cursor kept only the max elapsed minute: events up to it were already sent
+            cursor[fixture_id] = {"seen": [], "upto": entry, "last_seen": time.time()}
+    return cursor
 
 
 def save_cursor(cursor):
+    now = time.time()
+    for fixture_id in [f for f, entry in cursor.items() if now - entry.get("last_seen", now) > CURSOR_TTL_SECONDS]:
+        del cursor[fixture_id]
     CURSOR_PATH.parent.mkdir(parents=True, exist_ok=True)
-    CURSOR_PATH.write_text(json.dumps(cursor, indent=2))
-
-
-def get_fixture_events(fixture_id):
-    API_KEY = "dd82933e09e4052c68aafecf1feb4634"
-    headers = {"x-apisports-key": API_KEY}
-    r = requests.get(
-        f"{BASE_URL}/fixtures",
-        headers=headers,
-        params={"id": int(fixture_id)},
-        timeout=30
-    )
-    r.raise_for_status()
-    return r.json().get("response", [])
-
+    CURSOR_PATH.write_text(json.dumps(cursor, separators=(",", ":")))
 
-def main():
-    producer = Producer({"bootstrap.servers": BOOTSTRAP_SERVERS})
-    cursor = load_cursor()
-
-    
-    while True:
-        try:
-            fixtures = get_active_fixtures()
-
-            for fixture_id in fixtures:
-                events = get_fixture_events(fixture_id)
-                print(f'{fixture_id} is successful access')
 
-                last_seen = cursor.get(str(fixture_id), 0)
+def event_fingerprint(event):
+    """
+    short stable id of an event: type, detail, player, team, elapsed, extra
+    """
+    event_time = event.get("time") or {}
+    parts = [
+        event.get("type"),
+        event.get("detail"),
+        (event.get("player") or {}).get("id"),
+        (event.get("team") or {}).get("id"),
+        event_time.get("elapsed"),
+        event_time.get("extra"),
+    ]
+    return hashlib.sha1("|".join("" if p is None else str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
 
-                for event in events:
-                    minute = event.get("time", {}).get("elapsed")
 
-                    if minute and minute > last_seen:
-                        payload = {
-                            "ingested_at_utc": datetime.now(timezone.utc).isoformat(),
-                            "fixture_id": fixture_id,
-                            "event": event
-                        }
+def get_fixture_events(fixture_id):
+    data = get_api_client().fetch_fixtures_by_ids([int(fixture_id)]) or {}
+    items = data.get("response", []) or []
+    return (items[0].get("events") or []) if items else []
+
+
+def get_live_fixtures(league_ids=LIVE_LEAGUE_IDS):
+    """
+    every in-play fixture of league_ids with its events, in one request.
+    returns [(fixture_id, events)]
+    """
+    data = get_api_client().fetch_live_fixtures(league_ids) or {}
+    live = []
+    for item in data.get("response", []) or []:
+        fixture_id = (item.get("fixture", {}) or {}).get("id")
+        if fixture_id:
+            live.append((fixture_id, item.get("events") or []))
+    return live
+
+
+def _mark_seen(cursor, fixture_id, fingerprint):
+    entry = cursor.setdefault(str(fixture_id), {"seen": []})
+    if fingerprint not in entry["seen"]:
+        entry["seen"].append(fingerprint)
+
+
+def produce_fixture_events(producer, cursor, fixture_id, events):
+    """
+    send events whose fingerprint is not in the cursor yet. A fingerprint is
+    stored only when the broker acknowledged the message, so failed deliveries
+    are sent again next poll. returns how many messages were queued
+    """
+    entry = cursor.setdefault(str(fixture_id), {"seen": []})
+    entry["last_seen"] = time.time()
+    seen = set(entry["seen"])
+    upto = entry.pop("upto", None)
+    occurrences = {}
+    sent = 0
+
+    for event in events:
+        fingerprint = event_fingerprint(event)
+        # identical events in one snapshot (rare, but possible) are told apart by position
+        n = occurrences.get(fingerprint, 0)
+        occurrences[fingerprint] = n + 1
+        if n:
+            fingerprint = f"{fingerprint}#{n}"
+
+        if fingerprint in seen:
+            continue
+
+        minute = event.get("time", {}).get("elapsed")
+        if upto is not None and minute is not None and minute <= upto:
+            # already sent under the old max-minute cursor
+            entry["seen"].append(fingerprint)
+            continue
+
+        payload = {
+            "ingested_at_utc": datetime.now(timezone.utc).isoformat(),
+            "fixture_id": fixture_id,
+            "event": event
+        }
+
+        producer.send(
+            TOPIC,
+            key=str(fixture_id),
+            value=json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            on_delivered=partial(_mark_seen, cursor, fixture_id, fingerprint),
+        )
+        sent += 1
 
-                        print("Producing →", json.dumps(payload, indent=2))
-                        producer.produce(
-                            topic=TOPIC,
-                            key=str(fixture_id),
-                            value=json.dumps(payload)
-                        )
+    return sent
 
-                        producer.poll(0)
 
-                        cursor[str(fixture_id)] = minute
+def poll_fixture_events(mode=FEED_MODE):
+    if mode == "live":
+        return get_live_fixtures()
+    return [(fixture_id, get_fixture_events(fixture_id)) for fixture_id in get_active_fixtures()]
 
-            save_cursor(cursor)
-            producer.flush()
 
-        except Exception as e:
-            print("ERROR:", e)
+def main(mode=FEED_MODE, budget=None):
+    """
+    budget (RunBudget): stop after max wall time / messages, or after one poll
+    cycle with until_caught_up; without one the producer polls forever.
+    returns delivery stats with throughput
+    """
+    budget = budget or RunBudget()
+    producer = LiveEventProducer(BOOTSTRAP_SERVERS)
+    cursor = load_cursor()
 
-        time.sleep(POLL_INTERVAL)
+    try:
+        while True:
+            try:
+                fixtures = 0
+                queued = 0
+                for fixture_id, events in poll_fixture_events(mode):
+                    fixtures += 1
+                    queued += produce_fixture_events(producer, cursor, fixture_id, events)
+
+                # bounded wait: a slow broker delays the next poll by at most FLUSH_TIMEOUT
+                pending = producer.flush(FLUSH_TIMEOUT)
+                # ✅ cursor only holds acknowledged events
+                save_cursor(cursor)
+
+                stats = producer.stats()
+                print(
+                    f"poll: fixtures={fixtures} queued={queued} pending={pending} "
+                    f"delivered={stats['delivered']} failed={stats['failed']} buffer_full={stats['buffer_full']}"
+                )
+
+            except Exception as e:
+                print("ERROR:", e)
+
+            if budget.until_caught_up or budget.exhausted(producer.counters["produced"]):
+                break
+            remaining = budget.remaining()
+            if remaining is not None and remaining < POLL_INTERVAL:
+                # the next poll would run past the budget
+                break
+            time.sleep(POLL_INTERVAL)
+
+    except KeyboardInterrupt:
+        print("Stopping producer...")
+
+    finally:
+        # final flush: wait for everything still in flight, then keep what was acknowledged
+        producer.flush(FLUSH_TIMEOUT * 2)
+        save_cursor(cursor)
+
+    stats = budget.throughput(producer.stats())
+    print(f"Producer stopped: {stats}")
+    return stats
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Poll live fixtures and produce their events to Kafka")
+    parser.add_argument("--mode", default=FEED_MODE, choices=["live", "window"])
+    add_budget_args(parser)
+    args = parser.parse_args()
+    main(mode=args.mode, budget=budget_from_args(args))
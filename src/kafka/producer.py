@@ -0,0 +1,93 @@
+import os
+import time
+from typing import Optional, Dict, Any, Callable
+from confluent_kafka import Producer, KafkaError
+
+KAFKA_BOOTSTRAP = os.getenv("KAFKA_BOOTSTRAP", "localhost:9092")
+
+# batching / compression tuned for many small json events:
+# wait up to linger.ms to fill a batch, compress whole batches, and let the
+# idempotent producer retry without creating duplicates or reordering
+PRODUCER_CONFIG: Dict[str, Any] = {
+    "enable.idempotence": True,            # implies acks=all, retries, max.in.flight <= 5
+    "linger.ms": int(os.getenv("KAFKA_LINGER_MS", "20")),
+    "batch.size": int(os.getenv("KAFKA_BATCH_SIZE", str(256 * 1024))),
+    "compression.type": os.getenv("KAFKA_COMPRESSION", "lz4"),   # lz4 | zstd
+    "queue.buffering.max.messages": 100000,
+    "queue.buffering.max.kbytes": 256 * 1024,
+    "delivery.timeout.ms": 120000,
+}
+
+# how long send() keeps retrying while the local queue is full
+BUFFER_FULL_TIMEOUT = 30.0
+
+
+class LiveEventProducer:
+    """
+    confluent_kafka.Producer with tuned batching and delivery tracking.
+
+    Every message gets a delivery report; the counters say how many were
+    delivered / failed, and an optional per-message callback runs on success.
+    When the local queue is full (BufferError) send() serves delivery reports
+    until there is room again instead of dropping or crashing.
+    """
+
+    def __init__(self, bootstrap_servers: str = KAFKA_BOOTSTRAP, **overrides):
+        config = {**PRODUCER_CONFIG, **overrides, "bootstrap.servers": bootstrap_servers}
+        self.producer = Producer(config)
+        self.counters = {"produced": 0, "delivered": 0, "failed": 0, "buffer_full": 0, "bytes": 0}
+        self.last_error: Optional[KafkaError] = None
+
+    def _on_delivery(self, on_delivered: Optional[Callable[[], None]], err, msg):
+        if err is not None:
+            self.counters["failed"] += 1
+            self.last_error = err
+            print(f"delivery failed: topic={msg.topic()} key={msg.key()} error={err}")
+            return
+        self.counters["delivered"] += 1
+        if on_delivered is not None:
+            on_delivered()
+
+    def send(
+        self,
+        topic: str,
+        key: Optional[str],
+        value: bytes,
+        on_delivered: Optional[Callable[[], None]] = None,
+    ):
+        deadline = time.monotonic() + BUFFER_FULL_TIMEOUT
+        while True:
+            try:
+                self.producer.produce(
+                    topic=topic,
+                    key=key,
+                    value=value,
+                    on_delivery=lambda err, msg: self._on_delivery(on_delivered, err, msg),
+                )
+                break
+            except BufferError:
+                # local queue full: let librdkafka ship batches and run callbacks, then retry
+                self.counters["buffer_full"] += 1
+                if time.monotonic() > deadline:
+                    raise
+                self.producer.poll(0.1)
+
+        self.counters["produced"] += 1
+        self.counters["bytes"] += len(value)
+        # serve delivery reports without blocking
+        self.producer.poll(0)
+
+    def poll(self, timeout: float = 0) -> int:
+        return self.producer.poll(timeout)
+
+    def flush(self, timeout: float = 10.0) -> int:
+        """
+        wait for in-flight messages (at most timeout), returns how many are still queued
+        """
+        return self.producer.flush(timeout)
+
+    def pending(self) -> int:
+        return len(self.producer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "pending": self.pending()}
@@ -0,0 +1,84 @@
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+from confluent_kafka import TopicPartition
+
+# position / committed offset not known yet
+OFFSET_INVALID = -1001
+
+
+@dataclass
+class RunBudget:
+    """
+    When a producer / consumer run should stop. Empty budget = run forever.
+      max_seconds: wall time
+      max_messages: messages produced / consumed
+      until_caught_up: consumer: every assigned partition read up to its end
+                       producer: a single poll cycle
+    """
+    max_seconds: Optional[float] = None
+    max_messages: Optional[int] = None
+    until_caught_up: bool = False
+    started: float = field(default_factory=time.monotonic)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> Optional[float]:
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def exhausted(self, messages: int) -> bool:
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return True
+        return self.max_messages is not None and messages >= self.max_messages
+
+    def throughput(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        stats + elapsed_s and messages_per_s, for logs and Dagster metadata
+        """
+        elapsed = self.elapsed()
+        messages = stats.get("messages", stats.get("produced", 0))
+        return {
+            **stats,
+            "elapsed_s": round(elapsed, 3),
+            "messages_per_s": round(messages / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+def caught_up(consumer) -> bool:
+    """
+    True when every assigned partition has been read up to its high watermark
+    """
+    assignment = consumer.assignment()
+    if not assignment:
+        return False
+    positions = consumer.position(assignment)
+    committed = {(tp.topic, tp.partition): tp.offset for tp in consumer.committed(assignment, timeout=5)}
+    for tp in positions:
+        low, high = consumer.get_watermark_offsets(TopicPartition(tp.topic, tp.partition), timeout=5)
+        offset = tp.offset
+        if offset == OFFSET_INVALID:
+            # nothing fetched from this partition yet in this run
+            offset = committed.get((tp.topic, tp.partition), OFFSET_INVALID)
+        if offset == OFFSET_INVALID:
+            offset = low
+        if offset < high:
+            return False
+    return True
+
+
+def add_budget_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--max-seconds", type=float, default=None, help="stop after this much wall time")
+    parser.add_argument("--max-messages", type=int, default=None, help="stop after this many messages")
+    parser.add_argument("--until-caught-up", action="store_true", help="stop once there is nothing left to do")
+
+
+def budget_from_args(args: argparse.Namespace) -> RunBudget:
+    return RunBudget(
+        max_seconds=args.max_seconds,
+        max_messages=args.max_messages,
+        until_caught_up=args.until_caught_up,
+    )
@@ -0,0 +1,295 @@
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+from confluent_kafka import KafkaException, TopicPartition
+from src.kafka.run_budget import RunBudget, caught_up
+from src.load.stage_copy import FILE_FORMATS, JSON_COLUMNS, copy_file, write_parquet
+
+SPOOL_DIR = Path(os.getenv("KAFKA_SPOOL_DIR", "state/spool"))
+SPOOL_FORMAT = os.getenv("KAFKA_SPOOL_FORMAT", "ndjson")   # ndjson | parquet
+# a segment is closed at whichever comes first
+SEGMENT_MAX_BYTES = int(os.getenv("KAFKA_SPOOL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+SEGMENT_MAX_SECONDS = float(os.getenv("KAFKA_SPOOL_SEGMENT_SECONDS", "60"))
+UPLOAD_INTERVAL = float(os.getenv("KAFKA_SPOOL_UPLOAD_INTERVAL", "5"))
+# segments are short-lived: favour cpu over ratio
+GZIP_LEVEL = int(os.getenv("KAFKA_SPOOL_GZIP_LEVEL", "1"))
+
+POLL_BATCH = 500
+POLL_SECONDS = 0.5
+
+PartitionKey = Tuple[str, int]
+
+
+def _try_lock(fh) -> bool:
+    """
+    non-blocking exclusive lock on an open file; released by the OS when the
+    process exits, so a crashed consumer never keeps its slot
+    """
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def claim_writer_dir(spool_dir: Path) -> Tuple[Path, Any]:
+    """
+    the first writers/<n> directory no running consumer holds, plus its open
+    lock file (keep it open for as long as the directory is in use)
+    """
+    n = 0
+    while True:
+        writer_dir = spool_dir / "writers" / str(n)
+        writer_dir.mkdir(parents=True, exist_ok=True)
+        fh = open(writer_dir / ".lock", "a+b")
+        if _try_lock(fh):
+            return writer_dir, fh
+        fh.close()
+        n += 1
+
+
+def _fsync(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Segment:
+    """
+    one local file being appended to. Written as <name>.part and renamed into
+    ready/ only once closed and fsynced, so ready/ never holds a partial file.
+    """
+
+    def __init__(self, spool_dir: Path, cols: Sequence[str], file_format: str):
+        self.cols = cols
+        self.file_format = file_format
+        suffix = ".json.gz" if file_format == "ndjson" else ".parquet"
+        self.name = f"live_events_{time.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}{suffix}"
+        self.part_path = spool_dir / (self.name + ".part")
+        self.opened_at = time.monotonic()
+        self.rows = 0
+        self.bytes = 0
+        self.offsets: Dict[PartitionKey, int] = {}
+        # ndjson streams straight to disk; parquet is written in one go on close
+        self._gz = gzip.open(self.part_path, "wb", compresslevel=GZIP_LEVEL) if file_format == "ndjson" else None
+        self._buffer: List[Sequence[Any]] = []
+        self._keys = [json.dumps(c).encode("utf-8") + b":" for c in cols]
+        self._json = [c in JSON_COLUMNS for c in cols]
+
+    def _line(self, row: Sequence[Any]) -> bytes:
+        # json columns holding bytes are spliced in untouched (no decode, no re-encode)
+        parts = []
+        for k, is_json, v in zip(self._keys, self._json, row):
+            if is_json and isinstance(v, (bytes, bytearray)):
+                parts.append(k + v)
+            elif is_json and isinstance(v, str):
+                parts.append(k + v.encode("utf-8"))
+            else:
+                parts.append(k + json.dumps(v, ensure_ascii=False, default=str).encode("utf-8"))
+        return b"{" + b",".join(parts) + b"}\n"
+
+    def append(self, key: PartitionKey, offset: int, row: Sequence[Any], nbytes: int):
+        if self._gz is not None:
+            self._gz.write(self._line(row))
+        else:
+            self._buffer.append([v.decode("utf-8") if isinstance(v, (bytes, bytearray)) else v for v in row])
+        self.rows += 1
+        self.bytes += nbytes
+        self.offsets[key] = offset
+
+    def full(self) -> bool:
+        return self.bytes >= SEGMENT_MAX_BYTES or time.monotonic() - self.opened_at >= SEGMENT_MAX_SECONDS
+
+    def close(self, ready_dir: Path) -> Optional[Path]:
+        """
+        finish the file, fsync, move it to ready_dir. returns None for an empty segment
+        """
+        if self._gz is not None:
+            self._gz.close()
+        elif self._buffer:
+            write_parquet(self.part_path, self.cols, self._buffer)
+            self._buffer = []
+        if not self.rows:
+            self.part_path.unlink(missing_ok=True)
+            return None
+        _fsync(self.part_path)
+        ready_path = ready_dir / self.name
+        os.replace(self.part_path, ready_path)
+        _fsync(ready_dir)
+        return ready_path
+
+
+class SegmentUploader(threading.Thread):
+    """
+    Background thread: COPY every finished segment into the table (oldest
+    first) and delete it once committed. A failed upload is retried on the
+    next pass; the file stays on disk until then. Re-uploading a file COPY
+    already loaded is a no-op (Snowflake's per-file load history).
+    """
+
+    def __init__(self, ready_dir: Path, connect: Callable[[], Any], table: str, cols: Sequence[str], file_format: str):
+        super().__init__(name="spool-uploader", daemon=True)
+        self.ready_dir = ready_dir
+        self.connect = connect
+        self.table = table
+        self.cols = cols
+        self.file_format = file_format
+        self.stopping = threading.Event()
+        self.stats = {"segments": 0, "rows": 0, "errors": 0}
+        self.last_error: Optional[BaseException] = None
+
+    def pending(self) -> List[Path]:
+        return sorted(p for p in self.ready_dir.iterdir() if not p.name.startswith("."))
+
+    def upload_pending(self, conn):
+        for path in self.pending():
+            # another consumer's uploader may have taken it in the meantime
+            if not path.exists():
+                continue
+            rows = copy_file(conn, self.table, self.cols, path, self.file_format)
+            conn.commit()
+            path.unlink(missing_ok=True)
+            self.stats["segments"] += 1
+            self.stats["rows"] += rows
+            print(f"Uploaded {path.name}: {rows} rows → {self.table}")
+
+    def run(self):
+        conn = None
+        while True:
+            stopping = self.stopping.is_set()
+            try:
+                if conn is None:
+                    conn = self.connect()
+                self.upload_pending(conn)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.last_error = e
+                print(f"Spool upload failed (will retry): {e}")
+                if conn is not None:
+                    conn.close()
+                conn = None
+            if stopping:
+                break
+            self.stopping.wait(UPLOAD_INTERVAL)
+        if conn is not None:
+            conn.close()
+
+    def stop(self):
+        # one last pass over the ready segments, then exit
+        self.stopping.set()
+        self.join()
+
+
+class SpoolSink:
+    """
+    Consumer sink that decouples ingest from the warehouse.
+
+    Messages are appended to a rolling local segment (gzip NDJSON or Parquet),
+    closed by size or age. Kafka offsets are committed as soon as a segment is
+    closed and fsynced, i.e. durable on local disk; SegmentUploader loads the
+    finished segments into the table in the background.
+
+    Open segments live in a writers/<n> directory locked by this sink, so
+    several consumers can share one spool_dir; ready/ is shared by all of
+    them. Leftover .part files in the claimed directory (from a crash) are
+    dropped on start: their offsets were never committed, so Kafka
+    redelivers those messages.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        table: str,
+        cols: Sequence[str],
+        to_row: Callable[[Any], Tuple[Tuple, int]],
+        file_format: str = SPOOL_FORMAT,
+        spool_dir: Path = SPOOL_DIR,
+    ):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"spool format must be one of {FILE_FORMATS}, got {file_format!r}")
+        self.cols = cols
+        self.to_row = to_row
+        self.file_format = file_format
+        self.spool_dir = Path(spool_dir)
+        self.ready_dir = self.spool_dir / "ready"
+        self.ready_dir.mkdir(parents=True, exist_ok=True)
+        self.writer_dir, self._lock = claim_writer_dir(self.spool_dir)
+        for stale in self.writer_dir.glob("*.part"):
+            stale.unlink()
+        self.segment: Optional[Segment] = None
+        self.uploader = SegmentUploader(self.ready_dir, connect, table, cols, file_format)
+        self.stats = {"messages": 0, "bytes": 0, "segments": 0, "commits": 0}
+
+    def append(self, msg):
+        if self.segment is None:
+            self.segment = Segment(self.writer_dir, self.cols, self.file_format)
+        row, nbytes = self.to_row(msg)
+        self.segment.append((msg.topic(), msg.partition()), msg.offset(), row, nbytes)
+        self.stats["messages"] += 1
+        self.stats["bytes"] += nbytes
+
+    def rotate(self, consumer):
+        """
+        close the current segment and commit the offsets it covers
+        """
+        segment, self.segment = self.segment, None
+        if segment is None:
+            return
+        if segment.close(self.ready_dir) is None:
+            return
+        self.stats["segments"] += 1
+        # ✅ offsets committed only once the segment is durable on disk
+        consumer.commit(
+            offsets=[TopicPartition(topic, partition, offset + 1) for (topic, partition), offset in segment.offsets.items()],
+            asynchronous=False,
+        )
+        self.stats["commits"] += 1
+
+    def on_revoke(self, consumer, partitions):
+        self.rotate(consumer)
+
+    def poll_once(self, consumer) -> int:
+        msgs = consumer.consume(num_messages=POLL_BATCH, timeout=POLL_SECONDS)
+        for msg in msgs:
+            if msg.error():
+                raise KafkaException(msg.error())
+            self.append(msg)
+        if self.segment is not None and self.segment.full():
+            self.rotate(consumer)
+        return len(msgs)
+
+    def run(self, consumer, budget: Optional[RunBudget] = None) -> Dict[str, Any]:
+        """
+        poll until the budget is used up (forever without one), then close the
+        segment, commit and upload what is ready. returns stats with throughput
+        """
+        budget = budget or RunBudget()
+        self.uploader.start()
+        try:
+            while not budget.exhausted(self.stats["messages"]):
+                polled = self.poll_once(consumer)
+                if budget.until_caught_up and polled == 0 and caught_up(consumer):
+                    break
+        finally:
+            self.shutdown(consumer)
+        return budget.throughput({**self.stats, "uploaded_segments": self.uploader.stats["segments"],
+                                  "upload_errors": self.uploader.stats["errors"]})
+
+    def shutdown(self, consumer):
+        try:
+            self.rotate(consumer)
+            self.uploader.stop()
+        finally:
+            self._lock.close()
@@ -1,25 +1,45 @@
 import json
 from pathlib import Path
+from typing import Optional
+from src.load.checkpoints import get_checkpoint_store
 
 # ===== CONFIG =====
 STATE_DIR = Path("state")
 STATE_DIR.mkdir(exist_ok=True)
+# legacy cursor files, only read once to migrate into the checkpoint store
 CURSOR_FILE = STATE_DIR / "cursor.json"
 
-def load_cursor():
-    if not CURSOR_FILE.exists():
-        return {
-            "league_id": None,
-            "season": None,
-            "team_id": None,
-            "page": 1
-        }
-    return json.loads(CURSOR_FILE.read_text())
+DEFAULT_NAMESPACE = "default"
 
-def save_cursor(league_i, season_i, team_i, page_i=1):
-    CURSOR_FILE.write_text(json.dumps({
+def cursor_file(namespace: Optional[str] = None) -> Path:
+    return CURSOR_FILE if not namespace else STATE_DIR / f"cursor_{namespace}.json"
+
+def load_cursor(namespace: Optional[str] = None):
+    store = get_checkpoint_store()
+    cursor = store.get_cursor(namespace or DEFAULT_NAMESPACE)
+    if cursor is not None:
+        return cursor
+
+    path = cursor_file(namespace)
+    if path.exists():
+        cursor = json.loads(path.read_text())
+        store.set_cursor(namespace or DEFAULT_NAMESPACE, cursor)
+        return cursor
+
+    return {
+        "league_i": 0,
+        "season_i": 0,
+        "team_i": 0,
+        "page": 1
+    }
+
+def save_cursor(league_i, season_i, team_i, page_i=1, stage=None, namespace: Optional[str] = None):
+    payload = {
         "league_i": league_i,
         "season_i": season_i,
         "team_i": team_i,
         "page": page_i
-    }, indent=2))
\ No newline at end of file
+    }
+    if stage is not None:
+        payload["stage"] = stage
+    get_checkpoint_store().set_cursor(namespace or DEFAULT_NAMESPACE, payload)
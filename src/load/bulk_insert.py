@@ -0,0 +1,101 @@
+import os
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence
+
+# Snowflake caps a statement's bind parameters and its text size; with the
+# connector's default pyformat binding the values are inlined into the text,
+# so the byte budget is what usually bounds a chunk of json payloads
+MAX_BIND_PARAMS = int(os.getenv("SNOWFLAKE_MAX_BIND_PARAMS", "16384"))
+MAX_STATEMENT_BYTES = int(os.getenv("SNOWFLAKE_MAX_STATEMENT_BYTES", str(1024 * 1024)))
+# headroom for the INSERT ... SELECT ... FROM VALUES text around the values
+STATEMENT_OVERHEAD_BYTES = 4096
+
+# how each RAW column is cast in the SELECT (anything else is passed as-is)
+DEFAULT_CASTS = {
+    "ingested_at": "TO_TIMESTAMP_NTZ({})",
+    "payload": "PARSE_JSON({})",
+}
+
+
+def value_bytes(value: Any) -> int:
+    # rough size of one bound value once it is quoted into the statement
+    if value is None:
+        return 4
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) * 2 + 4
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 4
+    return len(str(value)) + 2
+
+
+def build_insert_sql(table: str, cols: Sequence[str], n_rows: int, casts: Optional[Dict[str, str]] = None) -> str:
+    """
+    INSERT INTO table (a, b, payload)
+    SELECT column1, column2, PARSE_JSON(column3) FROM VALUES (%s,%s,%s), ...
+    """
+    casts = DEFAULT_CASTS if casts is None else casts
+    select_parts = [
+        casts.get(c, "{}").format(f"column{i}") for i, c in enumerate(cols, start=1)
+    ]
+    row = "(" + ",".join(["%s"] * len(cols)) + ")"
+    return (
+        f"INSERT INTO {table} ({', '.join(cols)}) "
+        f"SELECT {', '.join(select_parts)} FROM VALUES " + ",".join([row] * n_rows)
+    )
+
+
+def iter_chunks(
+    rows: Iterable[Sequence[Any]],
+    n_cols: int,
+    max_params: int = MAX_BIND_PARAMS,
+    max_bytes: int = MAX_STATEMENT_BYTES,
+    max_rows: Optional[int] = None,
+) -> Iterator[List[Sequence[Any]]]:
+    """
+    group rows into chunks that fit one statement:
+    at most max_params bind values and max_bytes of values (and max_rows rows).
+    A single row bigger than max_bytes still goes out alone.
+    """
+    rows_per_params = max(1, max_params // max(1, n_cols))
+    budget = max(1, max_bytes - STATEMENT_OVERHEAD_BYTES)
+
+    chunk: List[Sequence[Any]] = []
+    size = 0
+    for row in rows:
+        row_size = sum(value_bytes(v) for v in row) + 2 * n_cols + 3
+        if chunk and (
+            size + row_size > budget
+            or len(chunk) >= rows_per_params
+            or (max_rows and len(chunk) >= max_rows)
+        ):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+def bulk_insert(
+    conn,
+    table: str,
+    cols: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    casts: Optional[Dict[str, str]] = None,
+    commit: bool = False,
+    max_rows: Optional[int] = None,
+) -> int:
+    """
+    write rows (any iterable, consumed lazily) with one multi-row
+    INSERT ... SELECT ... FROM VALUES per chunk.
+    commit=True commits after every chunk.
+    returns the number of rows written
+    """
+    written = 0
+    with conn.cursor() as cur:
+        for chunk in iter_chunks(rows, len(cols), max_rows=max_rows):
+            params = [v for row in chunk for v in row]
+            cur.execute(build_insert_sql(table, cols, len(chunk), casts), params)
+            if commit:
+                conn.commit()
+            written += len(chunk)
+    return written
@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+from src.extract.base.sqlite_local import ThreadLocalSqlite
+
+CHECKPOINT_DB = os.getenv("LOAD_CHECKPOINT_DB", "state/checkpoints.sqlite")
+
+# entity used for "the whole stage / season is finished"
+ALL = "*"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    job TEXT NOT NULL,
+    league_id INTEGER NOT NULL,
+    season INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    rows INTEGER,
+    done_at REAL NOT NULL,
+    PRIMARY KEY (job, league_id, season, stage, entity)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_checkpoint_stage ON checkpoint (job, stage, entity);
+
+CREATE TABLE IF NOT EXISTS cursor (
+    namespace TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# (job, league_id, season, stage, entity)
+Mark = Tuple[str, int, int, str, str]
+
+
+def mark(job: str, league_id: int, season: int, stage: str, entity: Any = ALL) -> Mark:
+    return (job, int(league_id), int(season), stage, str(entity))
+
+
+class CheckpointStore:
+    """
+    Completion records for the loaders, in a local SQLite file (WAL).
+
+    One row per finished (job, league, season, stage, entity); entity is a
+    fixture / team id, or ALL for a whole stage or season. Rows are written
+    in batches, after the warehouse commit that made them true, so a restart
+    skips exactly what is already in RAW and never re-fetches it.
+    """
+
+    def __init__(self, db_path: str = CHECKPOINT_DB):
+        self._db = ThreadLocalSqlite(db_path, SCHEMA)
+
+    # ========================
+    # completion records
+    # ========================
+    def mark_done(self, marks: Iterable[Mark], rows: Optional[int] = None):
+        """
+        record a batch of finished units in one transaction
+        """
+        now = time.time()
+        values = [(*m, rows, now) for m in marks]
+        if not values:
+            return
+        with self._db.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO checkpoint (job, league_id, season, stage, entity, rows, done_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job, league_id, season, stage, entity) DO UPDATE SET
+                    rows = excluded.rows,
+                    done_at = excluded.done_at
+                """,
+                values,
+            )
+
+    def is_done(self, job: str, league_id: int, season: int, stage: str, entity: Any = ALL) -> bool:
+        row = self._db.conn().execute(
+            "SELECT 1 FROM checkpoint WHERE job = ? AND league_id = ? AND season = ? AND stage = ? AND entity = ?",
+            mark(job, league_id, season, stage, entity),
+        ).fetchone()
+        return row is not None
+
+    def done_entities(self, job: str, league_id: int, season: int, stage: str) -> Set[str]:
+        """
+        every finished entity of one stage (one indexed range scan)
+        """
+        rows = self._db.conn().execute(
+            "SELECT entity FROM checkpoint WHERE job = ? AND league_id = ? AND season = ? AND stage = ?",
+            (job, int(league_id), int(season), stage),
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def remaining(
+        self,
+        job: str,
+        league_ids: List[int],
+        seasons: List[int],
+        stage: str,
+        entity: Any = ALL,
+    ) -> List[Tuple[int, int]]:
+        """
+        (league_id, season) pairs whose stage/entity is not finished yet, in input order
+        """
+        rows = self._db.conn().execute(
+            "SELECT league_id, season FROM checkpoint WHERE job = ? AND stage = ? AND entity = ?",
+            (job, stage, str(entity)),
+        ).fetchall()
+        done = set(rows)
+        return [(lg, ss) for lg in league_ids for ss in seasons if (lg, ss) not in done]
+
+    def summary(self, job: str) -> List[Dict[str, Any]]:
+        rows = self._db.conn().execute(
+            """
+            SELECT league_id, season, stage, COUNT(*), MAX(done_at)
+            FROM checkpoint WHERE job = ?
+            GROUP BY league_id, season, stage
+            ORDER BY league_id, season, stage
+            """,
+            (job,),
+        ).fetchall()
+        return [
+            {"league_id": lg, "season": ss, "stage": stage, "done": n, "last_done_at": last}
+            for lg, ss, stage, n, last in rows
+        ]
+
+    def reset(self, job: str, league_id: Optional[int] = None, season: Optional[int] = None):
+        sql = "DELETE FROM checkpoint WHERE job = ?"
+        params: List[Any] = [job]
+        if league_id is not None:
+            sql += " AND league_id = ?"
+            params.append(int(league_id))
+        if season is not None:
+            sql += " AND season = ?"
+            params.append(int(season))
+        with self._db.transaction() as conn:
+            conn.execute(sql, params)
+
+    # ========================
+    # position cursors (what state/cursor*.json used to hold)
+    # ========================
+    def get_cursor(self, namespace: str) -> Optional[Dict[str, Any]]:
+        row = self._db.conn().execute("SELECT body FROM cursor WHERE namespace = ?", (namespace,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_cursor(self, namespace: str, body: Dict[str, Any]):
+        self._db.conn().execute(
+            """
+            INSERT INTO cursor (namespace, body, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(namespace) DO UPDATE SET body = excluded.body, updated_at = excluded.updated_at
+            """,
+            (namespace, json.dumps(body), time.time()),
+        )
+
+
+_STORE: Optional[CheckpointStore] = None
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """
+    Shared store for the package (built on first use, per process).
+    """
+    global _STORE
+    if _STORE is None:
+        _STORE = CheckpointStore()
+    return _STORE
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import time
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from src.extract.base.sqlite_local import ThreadLocalSqlite
+from src.load.checkpoints import CHECKPOINT_DB
+
+# RAW_DEDUPE=0 writes every row again (e.g. after a RAW table was rebuilt)
+DEDUPE_ENABLED = os.getenv("RAW_DEDUPE", "1") == "1"
+
+# natural key per RAW table: column names, or "payload:a.b" for a value inside the payload.
+# All rows of one key are compared as a group (a fixture has many events, a team many players).
+NATURAL_KEYS: Dict[str, Tuple[str, ...]] = {
+    "RAW_FIXTURE_INFO": ("fixture_id",),
+    "RAW_FIXTURE_EVENT": ("fixture_id",),
+    "RAW_FIXTURE_LINE_UP": ("fixture_id", "team_id"),
+    "RAW_FIXTURE_PREDICTIONS": ("fixture_id",),
+    "RAW_FIXTURE_ODDS": ("fixture_id",),
+    "RAW_FIXTURE_STATISTICS": ("fixture_id", "team_id"),
+    "RAW_FIXTURE_PLAYERS_STATISTIC": ("fixture_id", "team_id"),
+    "RAW_TEAMS_STATISTICS": ("league_id", "season", "payload:team.id"),
+    "RAW_PLAYERS_STATISTICS": ("league_id", "season", "team_id"),
+    "RAW_TEAMS_TRANSFER": ("league_id", "season", "team_id"),
+    "RAW_TEAMS_SQUADS": ("league_id", "season", "team_id"),
+    "RAW_PLAYER_TROPHIES": ("league_id", "season", "team_id"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payload_index (
+    table_name TEXT NOT NULL,
+    natural_key TEXT NOT NULL,
+    payload_hash TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    written_at REAL NOT NULL,
+    PRIMARY KEY (table_name, natural_key)
+) WITHOUT ROWID;
+"""
+
+
+def payload_hash(payload: Any) -> str:
+    # canonical json (sorted keys, no whitespace) so key order never changes the hash
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def _payload_path(payload: Any, path: str) -> Any:
+    for part in path.split("."):
+        payload = (payload or {}).get(part) if isinstance(payload, dict) else None
+    return payload
+
+
+class PayloadDedupe:
+    """
+    Skip RAW rows whose payload is already in the warehouse unchanged.
+
+    For every (table, natural key) we keep the hash of the canonicalized
+    payloads last written. filter() drops groups whose hash matches and
+    remembers the new hashes as pending; commit() stores them and must only
+    be called after the warehouse commit (rollback() forgets them), so a
+    failed load is never treated as written.
+    """
+
+    def __init__(self, db_path: str = CHECKPOINT_DB, enabled: bool = DEDUPE_ENABLED):
+        self.enabled = enabled
+        self._db = ThreadLocalSqlite(db_path, SCHEMA)
+        self._pending: Dict[Tuple[str, str], Tuple[str, int]] = {}
+        self.skipped = 0
+
+    def _known(self, table_name: str, keys: List[str]) -> Dict[str, str]:
+        conn = self._db.conn()
+        known = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT natural_key, payload_hash FROM payload_index "
+                f"WHERE table_name = ? AND natural_key IN ({','.join('?' * len(chunk))})",
+                [table_name, *chunk],
+            ).fetchall()
+            known.update(rows)
+        return known
+
+    def filter(self, table: str, cols: Sequence[str], rows: List[Sequence[Any]]) -> List[Sequence[Any]]:
+        """
+        rows of table that changed since the last committed write of their natural key
+        """
+        table_name = table.split(".")[-1].upper()
+        spec = NATURAL_KEYS.get(table_name)
+        if not self.enabled or not spec or "payload" not in cols or not rows:
+            return rows
+
+        payload_i = list(cols).index("payload")
+        groups: Dict[str, List[Sequence[Any]]] = {}
+        hashes: Dict[str, List[str]] = {}
+        for row in rows:
+            raw = row[payload_i]
+            payload = json.loads(raw) if isinstance(raw, str) else raw
+            key = json.dumps([
+                _payload_path(payload, part[len("payload:"):]) if part.startswith("payload:") else row[list(cols).index(part)]
+                for part in spec
+            ], default=str)
+            groups.setdefault(key, []).append(row)
+            hashes.setdefault(key, []).append(payload_hash(payload))
+
+        known = self._known(table_name, list(groups))
+        keep = []
+        for key, group in groups.items():
+            # order-insensitive: the API doesn't promise a stable order inside a response
+            digest = hashlib.sha1("".join(sorted(hashes[key])).encode("ascii")).hexdigest()
+            last = self._pending.get((table_name, key), (known.get(key), 0))[0]
+            if last == digest:
+                self.skipped += len(group)
+                continue
+            self._pending[(table_name, key)] = (digest, len(group))
+            keep.extend(group)
+        return keep
+
+    def commit(self):
+        values = [
+            (table_name, key, digest, n, time.time())
+            for (table_name, key), (digest, n) in self._pending.items()
+        ]
+        self._pending.clear()
+        if not values:
+            return
+        with self._db.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO payload_index (table_name, natural_key, payload_hash, rows, written_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(table_name, natural_key) DO UPDATE SET
+                    payload_hash = excluded.payload_hash,
+                    rows = excluded.rows,
+                    written_at = excluded.written_at
+                """,
+                values,
+            )
+
+    def rollback(self):
+        self._pending.clear()
+
+    def reset(self, table: Optional[str] = None):
+        with self._db.transaction() as conn:
+            if table is None:
+                conn.execute("DELETE FROM payload_index")
+            else:
+                conn.execute("DELETE FROM payload_index WHERE table_name = ?", (table.split(".")[-1].upper(),))
@@ -0,0 +1,91 @@
+import time
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from src.extract.base.response_cache import FINAL_STATUSES
+from src.extract.base.sqlite_local import ThreadLocalSqlite
+from src.load.checkpoints import CHECKPOINT_DB
+from src.load.dedupe import payload_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixture_index (
+    fixture_id INTEGER PRIMARY KEY,
+    league_id INTEGER NOT NULL,
+    season INTEGER NOT NULL,
+    status_short TEXT,
+    payload_hash TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_fixture_index_league_season ON fixture_index (league_id, season);
+"""
+
+
+def fixture_status(payload: Dict[str, Any]) -> Optional[str]:
+    return (((payload or {}).get("fixture") or {}).get("status") or {}).get("short")
+
+
+class FixtureIndex:
+    """
+    Local index of fixture_id -> last synced status.short and payload hash
+    (same SQLite file as the checkpoint store).
+
+    A fixture needs its sub-resources (re)fetched when it is new, when its
+    /fixtures payload changed since the last sync (status, score, kick-off...),
+    or - with refresh_open - when it was not final (FT / AET / PEN) at the
+    last sync, so predictions and odds of upcoming fixtures stay fresh.
+    A fixture that is final and unchanged is never touched again.
+    """
+
+    def __init__(self, db_path: str = CHECKPOINT_DB, refresh_open: bool = True):
+        self._db = ThreadLocalSqlite(db_path, SCHEMA)
+        self.refresh_open = refresh_open
+
+    def known(self, league_id: int, season: int) -> Dict[int, Tuple[Optional[str], str]]:
+        rows = self._db.conn().execute(
+            "SELECT fixture_id, status_short, payload_hash FROM fixture_index WHERE league_id = ? AND season = ?",
+            (int(league_id), int(season)),
+        ).fetchall()
+        return {fixture_id: (status, digest) for fixture_id, status, digest in rows}
+
+    def changed(
+        self,
+        league_id: int,
+        season: int,
+        fixture_rows: List[Dict[str, Any]],
+    ) -> List[Tuple[Dict[str, Any], Optional[str], str]]:
+        """
+        fixture rows (from extract_league_fixture) that need a sync,
+        as (row, status_short, payload_hash)
+        """
+        known = self.known(league_id, season)
+        out = []
+        for row in fixture_rows:
+            status = fixture_status(row.get("payload"))
+            digest = payload_hash(row.get("payload"))
+            last = known.get(row["fixture_id"])
+            if (
+                last is None
+                or last[1] != digest
+                or (self.refresh_open and last[0] not in FINAL_STATUSES)
+            ):
+                out.append((row, status, digest))
+        return out
+
+    def record(self, league_id: int, season: int, synced: Iterable[Tuple[int, Optional[str], str]]):
+        """
+        store (fixture_id, status_short, payload_hash) for fixtures whose load was committed
+        """
+        now = time.time()
+        values = [(fixture_id, int(league_id), int(season), status, digest, now) for fixture_id, status, digest in synced]
+        if not values:
+            return
+        with self._db.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT INTO fixture_index (fixture_id, league_id, season, status_short, payload_hash, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(fixture_id) DO UPDATE SET
+                    status_short = excluded.status_short,
+                    payload_hash = excluded.payload_hash,
+                    synced_at = excluded.synced_at
+                """,
+                values,
+            )
@@ -3,12 +3,22 @@ import json
 from datetime import datetime, timezone
 from pathlib import Path
 import time
-from typing import List, Dict, Any, Optional
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import requests
 import snowflake.connector
 from dotenv import load_dotenv
-from src.extract.football_extract.extract_fixture import extract_league_fixture, extract_fixture_events, extract_fixture_lineups, extract_fixture_statistic, extract_fixture_predictions,extract_fixture_odds, extract_fixture_players_statistic
-from src.load.base import save_cursor,load_cursor
+from src.extract.football_extract.extract_fixture import extract_league_fixture, hydrate_fixture_bundles
+from src.extract.football_extract.extract_fixture_async import extract_fixture_bundle, FIXTURE_WINDOW
+from src.extract.base.response_cache import FINAL_STATUSES
+from src.load.checkpoints import CheckpointStore, get_checkpoint_store, mark
+from src.load.dedupe import PayloadDedupe
+from src.load.fixture_index import FixtureIndex, fixture_status, payload_hash
+from src.load.stage_copy import unit_writer
+from src.load.pipeline import LoadUnit, run_pipeline, run_sequential
 
 
 def load_env():
@@ -27,6 +37,8 @@ def snowflake_conn():
         database=os.getenv("SNOWFLAKE_DATABASE"),
         schema=os.getenv("SNOWFLAKE_SCHEMA"),
         role=os.getenv("SNOWFLAKE_ROLE"),
+        # the pipeline runner commits each batch of units (and its checkpoints) as one transaction
+        autocommit=False,
     )
 
 
@@ -52,458 +64,336 @@ def insert_raw(conn, table: str, cols: List[str], values: List[Any]):
     with conn.cursor() as cur:
         cur.execute(sql, values)
 
-def insert_many(conn, table, columns, rows):
-    if not rows:
-        return
-
-    cols = ", ".join(columns)
-    placeholders = ", ".join(["%s"] * len(columns))
-
-    sql = f"""
-        INSERT INTO {table} ({cols})
-        VALUES ({placeholders})
+FIXTURE_INFO_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_INFO"
+FIXTURE_EVENT_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_EVENT"
+FIXTURE_LINE_UP_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_LINE_UP"
+FIXTURE_PREDICTIONS_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PREDICTIONS"
+FIXTURE_ODDS_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_ODDS"
+FIXTURE_STATISTICS_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_STATISTICS"
+FIXTURE_PLAYERS_STATISTIC_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PLAYERS_STATISTIC"
+
+BATCH_SIZE = 1000
+# "insert" (multi-row INSERT) or "copy" (stage files + COPY INTO, for big backfills)
+LOAD_MODE = os.getenv("FIXTURE_HISTORY_LOAD_MODE", "insert")
+# "0": extract and load strictly one after the other (old behaviour)
+PIPELINED = os.getenv("FIXTURE_HISTORY_PIPELINED", "1") == "1"
+
+# League_ID 39 = Premier League, 140 = La Liga, 135 = Serie A, 78 = Bundesliga, 61 = Ligue 1
+LEAGUE_IDS = [39, 140, 135, 78, 61]
+SEASONS = [2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
+# checkpoint-store job name
+JOB = "fixture_history"
+# "0": re-sync every fixture of the seasons that are not done (ignore the fixture index)
+INCREMENTAL = os.getenv("FIXTURE_HISTORY_INCREMENTAL", "1") == "1"
+# "0": an unchanged fixture that is not final yet is skipped too (predictions / odds go stale)
+REFRESH_OPEN = os.getenv("FIXTURE_HISTORY_REFRESH_OPEN", "1") == "1"
+# worker processes for the sharded backfill (every worker shares the API quota limiter)
+BACKFILL_WORKERS = int(os.getenv("FIXTURE_HISTORY_WORKERS", "4"))
+STAGE_FILE_FORMAT = os.getenv("FIXTURE_HISTORY_STAGE_FORMAT", "ndjson")
+
+
+def fixture_bundle_writes(lg, ss, fixture_id, bundle) -> Tuple[List[Tuple[str, List[str], List[List[Any]]]], List[Any]]:
     """
+    one fixture's sub-resources (from extract_fixture_bundle) as ([(table, cols, rows)], errors).
+    A sub-resource whose call failed is left out of the writes and reported in errors,
+    so the caller can keep the fixture out of the index and fetch it again next run.
+    """
+    writes = []
+    errors: List[Any] = []
 
-    cur = conn.cursor()
-    try:
-        cur.executemany(sql, rows)
-    finally:
-        cur.close()
-
-
-def insert_raw_many(conn, table, cols, rows, batch_size=200):
-    if not rows:
-        return
+    def add(resource, table, cols, result, to_row):
+        rows, err = result
+        if err:
+            errors.append({"fixture_id": fixture_id, "resource": resource, "errors": err})
+            return
+        writes.append((table, cols, [to_row(r) for r in rows]))
 
-    select_parts = []
-    for c in cols:
-        if c == "ingested_at":
-            select_parts.append("TO_TIMESTAMP_NTZ(%s)")
-        elif c == "payload":
-            select_parts.append("PARSE_JSON(%s)")
-        else:
-            select_parts.append("%s")
+    # ========================
+    # 2) fixture event
+    # ========================
+    add(
+        "events", FIXTURE_EVENT_TABLE,
+        ["ingested_at", "league_id", "season", "fixture_id", "payload"],
+        bundle.get("events", ([], [])),
+        lambda r: [now_ingested(), lg, ss, fixture_id, json.dumps(r["payload"])],
+    )
 
-    sql = f"""
-        INSERT INTO {table} ({", ".join(cols)})
-        SELECT {", ".join(select_parts)}
-    """
+    # ========================
+    # 3) fixture line up
+    # ========================
+    add(
+        "lineups", FIXTURE_LINE_UP_TABLE,
+        ["ingested_at", "league_id", "season", "fixture_id", "team_id", "payload"],
+        bundle.get("lineups", ([], [])),
+        lambda r: [now_ingested(), lg, ss, fixture_id, r["team_id"], json.dumps(r["payload"])],
+    )
 
-    with conn.cursor() as cur:
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
+    # ========================
+    # 4) fixture match prediction
+    # ========================
+    add(
+        "predictions", FIXTURE_PREDICTIONS_TABLE,
+        ["ingested_at", "league_id", "season", "fixture_id", "payload"],
+        bundle.get("predictions", ([], [])),
+        lambda r: [now_ingested(), lg, ss, fixture_id, json.dumps(r["payload"])],
+    )
 
-            # run each row individually (NO rewrite possible)
-            for r in batch:
-                cur.execute(sql, r)
+    # ========================
+    # 5) fixture odds
+    # ========================
+    add(
+        "odds", FIXTURE_ODDS_TABLE,
+        ["ingested_at", "league_id", "season", "fixture_id", "payload"],
+        bundle.get("odds", ([], [])),
+        lambda r: [now_ingested(), lg, ss, fixture_id, json.dumps(r["payload"])],
+    )
 
+    # ========================
+    # 6) fixture team statistics & player statistics
+    # ========================
+    for side, team_id in (bundle.get("teams") or {}).items():
+        if not team_id:
+            continue
+
+        add(
+            f"statistics.{side}", FIXTURE_STATISTICS_TABLE,
+            ["ingested_at", "league_id", "season", "fixture_id", "team_id", "side", "payload"],
+            bundle.get("statistics", {}).get(side, ([], [])),
+            lambda r: [now_ingested(), lg, ss, fixture_id, team_id, side, json.dumps(r["payload"])],
+        )
+        add(
+            f"players.{side}", FIXTURE_PLAYERS_STATISTIC_TABLE,
+            ["ingested_at", "league_id", "season", "fixture_id", "team_id", "payload"],
+            bundle.get("players", {}).get(side, ([], [])),
+            lambda r: [now_ingested(), lg, ss, fixture_id, team_id, json.dumps(r["payload"])],
+        )
+
+    return writes, errors
+
+
+def fetch_window_bundles(window_rows, hydrate=True):
+    """
+    sub-resources for one window of fixtures.
+
+    hydrate=True: one /fixtures?ids= call brings events, lineups, statistics and
+    players for the whole window; only predictions (and odds for fixtures that
+    are not final yet - the API drops odds a few days after kick-off) are
+    fanned out per fixture. Fixtures missing from the hydrated response fall
+    back to the full per-fixture fan-out.
+    hydrate=False: full per-fixture fan-out (extract_fixture_bundle).
+    """
+    if not hydrate:
+        return extract_fixture_bundle(window_rows)
+
+    bundles, errors = hydrate_fixture_bundles([r["fixture_id"] for r in window_rows])
+    if errors:
+        print("fixture hydrate errors:", errors[:3])
+
+    hydrated = [r for r in window_rows if r["fixture_id"] in bundles]
+    missing = [r for r in window_rows if r["fixture_id"] not in bundles]
+    if missing:
+        bundles.update(extract_fixture_bundle(missing))
+
+    open_rows = [r for r in hydrated if fixture_status(r["payload"]) not in FINAL_STATUSES]
+    extras = extract_fixture_bundle(hydrated, resources=("predictions",))
+    extras_odds = extract_fixture_bundle(open_rows, resources=("odds",)) if open_rows else {}
+
+    for fixture_id, extra in extras.items():
+        bundles[fixture_id]["predictions"] = extra["predictions"]
+    for fixture_id, extra in extras_odds.items():
+        bundles[fixture_id]["odds"] = extra["odds"]
+    return bundles
+
+
+def iter_history_units(
+    hydrate: bool = True,
+    league_ids: List[int] = LEAGUE_IDS,
+    seasons: List[int] = SEASONS,
+    store: Optional[CheckpointStore] = None,
+    incremental: bool = INCREMENTAL,
+    refresh_open: bool = REFRESH_OPEN,
+    index: Optional[FixtureIndex] = None,
+) -> Iterator[LoadUnit]:
+    """
+    extract stage of the backfill: one LoadUnit per window of fixtures
+    (fixture info + every sub-resource), recorded in the fixture index once committed.
 
-def main():
-    load_env()
-    conn = snowflake_conn()
+    Seasons where every fixture is final are marked done and skipped without
+    any API call. Otherwise the fixture list is fetched (one call) and only
+    fixtures that are new, whose payload changed since the last sync or that
+    are not final yet (refresh_open) get their sub-resources fetched
+    (incremental=False re-syncs every fixture).
 
-    with conn.cursor() as cur:
-        cur.execute("select current_account(), current_user(), current_role(), current_database(), current_schema()")
-        print("SESSION =", cur.fetchone())
+    A fixture enters the index only when every sub-resource came back without
+    errors; a failed one stays "new" for the next run and keeps its season open.
+    """
+    store = store or get_checkpoint_store()
+    index = index or FixtureIndex(refresh_open=refresh_open)
 
-    # League_ID 39 = Premier League, 140 = La Liga, 135 = Serie A, 78 = Bundesliga, 61 = Ligue 1
-    league_ids = [39,140,135,78,61]  # Premier League, La Liga   
-    seasons = [2018,2019,2020,2021,2022,2023,2024,2025]
-
-    cursor = load_cursor()
-    start_lg_i = cursor.get("league_i", 0)
-    start_ss_i = cursor.get("season_i", 0)
-    start_team_i = cursor.get("team_i", 0)
-    start_fixture_i = cursor.get('fixture_i',0)
-    start_page_i = cursor.get("page",1)
-    stage = cursor.get("stage", "fixture_info")  # if missing, start at league_info
-   
     # ========================
     # 1) extract fixture information
     # ========================
-    try:
-        for lg_i in range(start_lg_i, len(league_ids)):
-            lg = league_ids[lg_i]
-
-            for ss_i in range(start_ss_i if lg_i == start_lg_i else 0, len(seasons)):
-                ss = seasons[ss_i]
+    for lg in league_ids:
+        for ss in seasons:
+            if store.is_done(JOB, lg, ss, "season"):
+                print(f'skip fixture history {lg}{ss} (done)')
+                continue
+
+            # ========================
+            # 1) fixture information
+            # ========================
+            print(f'beginning fetch data for fixture event {lg}{ss}')
+            fixture_ids, fixture_rows, errors = extract_league_fixture(league_id=lg,season=ss)
+            if errors:
+                # don't mark a season done from a partial fixture list
+                print(f'fixture list errors {lg}{ss}:', errors[:3])
+                continue
+
+            # figure out what is left: new, changed and not-yet-final fixtures
+            if incremental:
+                todo = index.changed(lg, ss, fixture_rows)
+            else:
+                todo = [(r, fixture_status(r["payload"]), payload_hash(r["payload"])) for r in fixture_rows]
+            print(f'fixtures {lg}{ss}: {len(todo)} of {len(fixture_ids)} to sync')
+            failed = 0
+
+            # fan out a window of fixtures at once, then load them in order
+            for window_start in range(0, len(todo), FIXTURE_WINDOW):
+                window = todo[window_start:window_start + FIXTURE_WINDOW]
+                window_rows = [r for r, _, _ in window]
+                window_ids = [r["fixture_id"] for r in window_rows]
+
+                writes = [(
+                    FIXTURE_INFO_TABLE,
+                    ["ingested_at", "league_id", "season", "fixture_id", "home_team_id", "away_team_id", "payload"],
+                    [
+                        [now_ingested(), lg, ss, r["fixture_id"], r["home_team_id"], r["away_team_id"], json.dumps(r["payload"])]
+                        for r in window_rows
+                    ]
+                )]
+
+                print(f'beginning fetch fixture bundle {lg}{ss} fixtures {window_start}..{window_start + len(window_ids) - 1} of {len(todo)}')
+                bundles = fetch_window_bundles(window_rows, hydrate=hydrate)
+
+                synced = []
+                for r, status, digest in window:
+                    fixture_id = r["fixture_id"]
+                    bundle = bundles.get(fixture_id)
+                    if not bundle:
+                        print(f"fixture {fixture_id}: no bundle, retried next run")
+                        failed += 1
+                        continue
+                    bundle_writes, bundle_errors = fixture_bundle_writes(lg, ss, fixture_id, bundle)
+                    writes.extend(bundle_writes)
+                    if bundle_errors:
+                        print(f"fixture {fixture_id} errors, retried next run:", bundle_errors[:3])
+                        failed += 1
+                        continue
+                    synced.append((fixture_id, status, digest))
 
-                # ========================
-                # 1) fixture information
-                # ========================
-                stage = "fixture_info"
-                print(f'beginning fetch data for fixture event {lg}{ss}')
-                fixture_ids, fixture_rows, errors = extract_league_fixture(league_id=lg,season=ss)
+                # ✅ fixtures enter the index only once the window is committed
+                yield LoadUnit(
+                    writes=writes,
+                    checkpoint=partial(index.record, lg, ss, synced),
+                    label=f"{lg}/{ss} {len(window_ids)} fixtures",
+                )
 
-                # figure out where to start (fixture id)
-                start_fixture = start_fixture_i if (lg_i == start_lg_i and ss_i == start_ss_i) else 0
+            # every fixture final -> nothing can change any more, next run skips the season
+            # (postponed / cancelled fixtures keep the season open, it costs one list call per run;
+            # so does any fixture that failed to sync)
+            if failed:
+                print(f'fixture history {lg}{ss}: {failed} fixtures failed, season stays open')
+            elif fixture_rows and all(fixture_status(r["payload"]) in FINAL_STATUSES for r in fixture_rows):
+                yield LoadUnit(marks=[mark(JOB, lg, ss, "season")])
 
-                # Make a lookup so we can insert fixture payload by fixture_id
-                fixture_row_by_id = {row['fixture_id']: row for row in fixture_rows}
 
-                buffer = []
-                BATCH_SIZE = 1000
-       
-                for fixture_i in range(start_fixture, len(fixture_ids)):
-                    fixture_id = fixture_ids[fixture_i]
+def remaining_work(league_ids: List[int] = LEAGUE_IDS, seasons: List[int] = SEASONS) -> List[Tuple[int, int]]:
+    """
+    (league, season) pairs the backfill still has to do
+    """
+    return get_checkpoint_store().remaining(JOB, league_ids, seasons, "season")
 
-                    row = fixture_row_by_id.get(fixture_id)
-                    if not row:
-                        continue
 
-                    # build ONE row (values aligned with columns)
-                    buffer.append([
-                        now_ingested(),                 # ingested_at
-                        lg,                             # league_id
-                        ss,                             # season
-                        fixture_id,                     # fixture_id
-                        row["home_team_id"],            # home_team_id
-                        row["away_team_id"],            # away_team_id
-                        json.dumps(row["payload"]),     # payload (string for PARSE_JSON)
-                    ])
-
-                    # flush batch
-                    if len(buffer) >= BATCH_SIZE:
-                        insert_raw_many(
-                            conn,
-                            "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_INFO",
-                            ["ingested_at", "league_id", "season", "fixture_id", "home_team_id", "away_team_id", "payload"],
-                            buffer
-                        )
-                        conn.commit()
-                        buffer.clear()
-
-                        # ✅ save NEXT fixture index only after commit succeeds
-                        save_cursor(lg_i, ss_i, fixture_i + 1)
-
-                    # flush remaining rows at end
-                    if buffer:
-                        insert_raw_many(
-                            conn,
-                            "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_INFO",
-                            ["ingested_at", "league_id", "season", "fixture_id", "home_team_id", "away_team_id", "payload"],
-                            buffer
-                        )
-                        conn.commit()
-                        buffer.clear()
-
-                        save_cursor(lg_i, ss_i, len(fixture_ids))  # fully done for this league+season
-
-                
-                    # ========================
-                    # 2) fixture event
-                    # ========================
-                    stage = "fixture_event"  
-                    print(f'beginning fetch data for fixture event {fixture_id}')                  
-                    buffer = []
-                    BATCH_SIZE = 1000
-                    print(f'beginning fetch events for fixture {lg}{ss}')
-                    event_rows, errors = extract_fixture_events(fixture_id=fixture_id)
-
-                    for r in event_rows:
-
-                        buffer.append([
-                            now_ingested(), 
-                            lg, 
-                            ss, 
-                            fixture_id, 
-                            json.dumps(row["payload"])
-                        ])
-
-                        if len(buffer) >= BATCH_SIZE:
-                            insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_EVENT",
-                                ["ingested_at", "league_id", "season", "fixture_id", "payload"],
-                                buffer
-                            )
-                            conn.commit()
-                            buffer.clear()
-                    
-                        # ✅ save NEXT fixture index (resume point)
-                        save_cursor(lg_i, ss_i, fixture_i+1)
-
-                    if buffer:
-                        insert_raw_many(
-                            conn,
-                            "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_EVENT",
-                            ["ingested_at", "league_id", "season", "fixture_id", "payload"],
-                            buffer
-                        )
-                        conn.commit()
-                        buffer.clear()                    
-
-                    # optional: after finishing fixture_info fully for this season, reset fixture cursor
-                    save_cursor(lg_i, ss_i, len(fixture_ids))
-
-                    # ========================
-                    # 3) fixture line up
-                    # ========================
-                    stage = "fixture_line_up"
-                    print(f'beginning fetch data for fixture lineup for match {fixture_id}{lg}{ss}')
-
-                    buffer = []
-                    BATCH_SIZE = 1000
-
-                    lineup_rows, errors = extract_fixture_lineups(fixture_id=fixture_id)
-
-                    for row in lineup_rows:
-
-
-                        buffer.append([
-                                now_ingested(), 
-                                lg, 
-                                ss, 
-                                fixture_id, 
-                                row['team_id'],
-                                json.dumps(row["payload"])
-
-                        ])
-
-                        if len(buffer) >= BATCH_SIZE:
-
-                            insert_raw_many(
-                                    conn,
-                                    "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_LINE_UP",
-                                    ["ingested_at", "league_id", "season", "fixture_id","team_id", "payload"],
-                                    buffer
-                                )
-                            conn.commit()
-                            buffer.clear()   
-
-                    if buffer:
-                        insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_LINE_UP",
-                                ["ingested_at", "league_id", "season", "fixture_id","team_id", "payload"],
-                                buffer
-                            )
-                        conn.commit()
-                        buffer.clear()
-
-                    # ✅ save NEXT fixture index (resume point)
-                    save_cursor(lg_i, ss_i, fixture_i + 1)
- 
-                
-                    # ========================
-                    # 4) fixture match prediction
-                    # ========================
-
-                    stage = "fixture_team_prediction"
-                    print(f'beginning fetch data for fixture match prediction {fixture_id}{lg}{ss}')                        
-
-                    fixture_rows, errors = extract_fixture_predictions(fixture_id=fixture_id)
-
-                    if errors:
-                        # decide your behavior: skip and move on OR stop
-                        # skip this fixture (move cursor forward so pipeline doesn't get stuck)
-                        save_cursor(lg_i, ss_i, fixture_i + 1)
-                        # optionally log errors[:3]
-                        # print("fixture_predictions errors:", errors[:3])
-                        continue
+def main(hydrate: bool = True, pipelined: bool = PIPELINED):
+    load_env()
+    conn = snowflake_conn()
 
+    with conn.cursor() as cur:
+        cur.execute("select current_account(), current_user(), current_role(), current_database(), current_schema()")
+        print("SESSION =", cur.fetchone())
 
-                    buffer = []
-                    BATCH_SIZE = 1000                
-
-                    for row in fixture_rows:
-                        buffer.append([
-                                now_ingested(), 
-                                lg, 
-                                ss, 
-                                fixture_id, 
-                                json.dumps(row["payload"])
-
-                        ])                    
-                    
-                        if len(buffer) >= BATCH_SIZE:     
-
-                            insert_raw_many(
-                                    conn,
-                                    "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PREDICTIONS",
-                                    ["ingested_at", "league_id", "season", "fixture_id", "payload"],buffer
-                                            )
-                        
-                            conn.commit()
-                            buffer.clear()
-
-                    if buffer:
-                        insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PREDICTIONS",
-                                ["ingested_at", "league_id", "season", "fixture_id", "payload"],
-                                buffer
-                            )
-                        conn.commit()
-                        buffer.clear()                
-
-                    # ✅ save NEXT fixture index (resume point)
-                    save_cursor(lg_i, ss_i, fixture_i + 1)
-
-                    # ========================
-                    # 5) fixture odds
-                    # ========================
-
-                    stage = "fixture_team_prediction"
-                    print(f'beginning fetch data for fixture odds')     
-
-                    fixture_rows, errors = extract_fixture_odds(fixture_id=fixture_id)
-
-                    if errors:
-                        save_cursor(lg_i, ss_i, fixture_i + 1)
-                        # optionally log errors[:3]
-                        # print("fixture_predictions errors:", errors[:3])
-                        continue 
-
-                    buffer = []
-                    BATCH_SIZE = 1000    
-
-                    for row in fixture_rows:
-                        buffer.append([
-                            now_ingested(), 
-                            lg, 
-                            ss, 
-                            fixture_id, 
-                            json.dumps(row["payload"])
-                        ])
-
-                        if len(buffer) >= BATCH_SIZE:     
-                            insert_raw_many(
-                            conn,
-                            "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_ODDS",
-                            ["ingested_at", "league_id", "season", "fixture_id","team_id", "payload"],
-                            buffer
-                            )
-
-                            conn.commit()
-                            buffer.clear()
-                                        
-                    if buffer:
-                        insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PREDICTIONS",
-                                ["ingested_at", "league_id", "season", "fixture_id","team_id", "payload"],
-                                buffer
-                            )
-                        conn.commit()
-                        buffer.clear() 
-
-                    # ✅ save NEXT fixture index (resume point)
-                    save_cursor(lg_i, ss_i, fixture_i + 1)
-
-
-                    # ========================
-                    # 6) fixture team statistics & player statistics
-                    # ========================
-
-                    stage = "fixture_player_statistics"
-                    print(f'beginning fetch fixture team statistics & player statistics')                     
-
-                    fixture_row = fixture_row_by_id.get(fixture_id)
-                    if not fixture_row:
-                        raise ValueError(f"fixture_id {fixture_id} not found in fixture_row_by_id")
-
-
-                    team_ids = [
-                        fixture_row.get("home_team_id"),
-                        fixture_row.get("away_team_id"),
-                    ]
+    try:
+        # pipelined: API extraction runs ahead of the Snowflake writes (bounded queue)
+        runner = run_pipeline if pipelined else run_sequential
+        write_rows, flush = unit_writer(LOAD_MODE, STAGE_FILE_FORMAT, max_rows=BATCH_SIZE)
+        stats = runner([iter_history_units(hydrate=hydrate)], conn, write_rows, store=get_checkpoint_store(), dedupe=PayloadDedupe(), flush=flush)
+        print("fixture history load:", stats)
+    finally:
+        conn.close()
 
-                    BATCH_SIZE = 1000
-                    for idx, team_id in enumerate (team_ids):
-                        if not team_id:
-                            continue
-
-                        side = 'home' if idx == 0 else "away"
-
-                        #  fixture team statistics
-                        fixture_rows, errors = extract_fixture_statistic(fixture_id=fixture_id, team_id= team_id)
-
-                        buffer = []
-
-                        for row in fixture_rows:
-
-                            buffer.append([
-                                    now_ingested(), 
-                                    lg, 
-                                    ss, 
-                                    fixture_id, 
-                                    team_id,
-                                    side,
-                                    json.dumps(row["payload"])
-                                
-                                ])
-
-                            if len(buffer) >= BATCH_SIZE:     
-                        
-                                insert_raw_many(
-                                            conn,
-                                            "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_STATISTICS",
-                                            ["ingested_at", "league_id", "season", "fixture_id","team_id",'side', "payload"],buffer
-                                        )
-                                    
-                                conn.commit()
-                                buffer.clear()   
-                        if buffer:
-                            insert_raw_many(
-                                    conn,
-                                    "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_STATISTICS",
-                                    ["ingested_at", "league_id", "season", "fixture_id","team_id", "side","payload"],buffer
-                                    )
-                                    
-                            conn.commit()
-                            buffer.clear()                          
-
-
-                        #  fixture player statistics
-
-                        player_rows, player_errors = extract_fixture_players_statistic(fixture_id=fixture_id,team_id=team_id,side = side)
-
-                        buffer = []
-                        BATCH_SIZE = 1000
-
-                            
-                        for player_row in player_rows:
-                            buffer.append([
-                                    now_ingested(), 
-                                    lg, 
-                                    ss, 
-                                    fixture_id, 
-                                    team_id,
-                                    json.dumps(player_row["payload"])
-                                
-                                ])
-
-                            if len(buffer) >= BATCH_SIZE:    
-
-                                insert_raw_many(
-                                    conn,
-                                    "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PLAYERS_STATISTIC",
-                                    ["ingested_at", "league_id", "season", "fixture_id","team_id", "payload"],buffer
-                                    )
-                                conn.commit()
-                                buffer.clear()
-                        if buffer:
-                            insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_PLAYERS_STATISTIC",
-                                ["ingested_at", "league_id", "season", "fixture_id","team_id", "payload"],buffer
-                                )
-                            conn.commit()
-                            buffer.clear()                                                
-
-                        # ✅ save NEXT fixture index (resume point)
-                        save_cursor(lg_i, ss_i, fixture_i + 1)
-
-                # optional: after finishing fixture_info fully for this season, reset fixture cursor
-                save_cursor(lg_i, ss_i+1, 0)   
- 
-
-            # optional: after finishing fixture_info fully for this season, reset fixture cursor
-            save_cursor(lg_i+1, 0, 0)            
-                
+# ========================
+# sharded backfill
+# ========================
+def backfill_shard(league_id: int, season: int, hydrate: bool = True, pipelined: bool = PIPELINED) -> Dict[str, Any]:
+    """
+    worker entry point: load one (league, season) with its own Snowflake
+    connection; its checkpoints are the (league, season) records in the shared store
+    """
+    load_env()
+    conn = snowflake_conn()
+    try:
+        runner = run_pipeline if pipelined else run_sequential
+        store = get_checkpoint_store()
+        units = iter_history_units(hydrate=hydrate, league_ids=[league_id], seasons=[season], store=store)
+        write_rows, flush = unit_writer(LOAD_MODE, STAGE_FILE_FORMAT, max_rows=BATCH_SIZE)
+        stats = runner([units], conn, write_rows, store=store, dedupe=PayloadDedupe(), flush=flush)
+        print(f"fixture history shard {league_id}/{season}:", stats)
+        return stats
     finally:
         conn.close()
 
+
+def main_sharded(
+    workers: int = BACKFILL_WORKERS,
+    league_ids: List[int] = LEAGUE_IDS,
+    seasons: List[int] = SEASONS,
+    hydrate: bool = True,
+) -> Dict[Tuple[int, int], Any]:
+    """
+    backfill every (league, season) as its own shard on a process pool.
+    API usage is capped across all workers by the shared SQLite limiters
+    (API_SPORTS_DAILY_LIMITER / API_SPORTS_MINUTE_LIMITER), so more workers
+    only help until the quota is the bottleneck. Finished shards are skipped,
+    a failed shard is reported and can be rerun (finished fixtures are skipped).
+    """
+    shards = remaining_work(league_ids, seasons)
+    print(f"fixture history backfill: {len(shards)} shards left, {workers} workers")
+
+    results: Dict[Tuple[int, int], Any] = {}
+    # spawn: workers must not inherit the parent's sockets / sqlite handles
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(backfill_shard, lg, ss, hydrate): (lg, ss) for lg, ss in shards}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                results[shard] = future.result()
+            except Exception as e:
+                print(f"shard {shard} failed:", e)
+                results[shard] = {"error": str(e)}
+    return results
+
+
 if __name__ == "__main__":
-    main()                
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Backfill fixture history into RAW")
+    parser.add_argument("--workers", type=int, default=0, help="run every (league, season) shard on a process pool")
+    parser.add_argument("--shard", action="append", default=[], help="LEAGUE:SEASON, run only this shard (repeatable)")
+    args = parser.parse_args()
+
+    if args.shard:
+        for shard in args.shard:
+            lg, ss = (int(x) for x in shard.split(":"))
+            backfill_shard(lg, ss)
+    elif args.workers:
+        main_sharded(workers=args.workers)
+    else:
+        main()
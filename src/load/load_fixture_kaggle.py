@@ -7,8 +7,22 @@ import time
 from typing import List, Dict, Any, Optional, Sequence
 import requests
 import snowflake.connector
-from src.extract.football_extract.extract_fm import fetch_fm_data
+from src.extract.football_extract.extract_fm import fetch_fm_data, extract_and_export
 from dotenv import load_dotenv
+from src.load.stage_copy import write_raw_rows, copy_file
+
+# "copy" (stage files + COPY INTO) or "insert" (multi-row INSERT)
+LOAD_MODE = os.getenv("FM_LOAD_MODE", "copy")
+STAGE_FILE_FORMAT = os.getenv("FM_STAGE_FORMAT", "ndjson")
+# "1": export the dataset to columnar files (extract_fm) and COPY those directly
+LOAD_FROM_EXPORT = os.getenv("FM_LOAD_FROM_EXPORT", "0") == "1"
+
+# exported rows are flat columns; payload is the row without the two added columns
+EXPORT_SELECT = [
+    "TO_TIMESTAMP_NTZ($1:extracted_at::string)",
+    "$1:source_file",
+    "OBJECT_DELETE($1, 'source_file', 'extracted_at')",
+]
 
 def load_env():
     load_dotenv(Path(__file__).resolve().parent / ".env")
@@ -54,40 +68,65 @@ def insert_raw(conn, table: str, cols: List[str], values: List[Any]):
     with conn.cursor() as cur:
         cur.execute(sql, values)
 
+def load_exported(conn, table: str, output_format: str = "parquet") -> int:
+    """
+    export every dataset file with extract_fm and COPY each one straight into table
+    """
+    loaded = 0
+    for out_file in extract_and_export(output_format=output_format):
+        print(f"Loading {out_file.name}")
+        loaded += copy_file(
+            conn,
+            table,
+            ["ingested_at", "source_file", "payload"],
+            out_file,
+            file_format=output_format,
+            select=EXPORT_SELECT,
+        )
+        conn.commit()
+    return loaded
+
+
 def main():
     load_env()
     conn = snowflake_conn()
 
     table = "FOOTBALL_CAPSTONE.RAW.FOOTBALL_MANAGER_RAW"
 
+    if LOAD_FROM_EXPORT:
+        try:
+            print(f"Done. Loaded {load_exported(conn, table, output_format=STAGE_FILE_FORMAT)} rows.")
+        finally:
+            conn.close()
+        return
+
     fm_folder = fetch_fm_data()          # returns WindowsPath
     fm_folder = Path(fm_folder)
 
     if not fm_folder.exists():
         raise FileNotFoundError(f"FM folder not found: {fm_folder}")
 
-    inserted = 0
-    try:
+    def fm_rows():
         # your extractor produced CSV, so scan CSV
         for file in fm_folder.glob("**/*.csv"):
             print(f"Processing {file.name}")
 
-            extracted_at = datetime.utcnow().isoformat() + "+00:00"  # for TIMESTAMP_TZ
-
             with open(file, "r", encoding="utf-8", newline="") as f:
                 reader = csv.DictReader(f)
+                ingested_at = now_ingested_ntz_str()
                 for row in reader:
-                    payload_obj = row
-                    ingested_at = now_ingested_ntz_str()
-
-                    insert_raw(
-                        conn,
-                        table,
-                        ["ingested_at", "source_file", "payload"],
-                        [ingested_at, file.name, json.dumps(payload_obj)]
-                    )
-                    inserted += 1
+                    yield [ingested_at, file.name, json.dumps(row)]
 
+    try:
+        inserted = write_raw_rows(
+            conn,
+            table,
+            ["ingested_at", "source_file", "payload"],
+            fm_rows(),
+            mode=LOAD_MODE,
+            file_format=STAGE_FILE_FORMAT,
+            commit=False,
+        )
         conn.commit()
         print(f"Done. Inserted {inserted} rows.")
     except Exception:
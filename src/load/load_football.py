@@ -3,12 +3,29 @@ import json
 from datetime import datetime, timezone
 from pathlib import Path
 import time
-from typing import List, Dict, Any, Optional, Sequence
+from typing import List, Dict, Any, Optional, Sequence, Iterator
 import requests
 import snowflake.connector
 from dotenv import load_dotenv
-from src.extract.football_extract.extract_football import extract_team_ids, extract_team_statistics, extract_league_data, extract_team_transfer,extract_team_squad_player_ids, extract_players_statistics_byseason, extract_player_trophies_batched
-from src.load.base import save_cursor,load_cursor
+from src.extract.football_extract.extract_football import extract_team_ids, extract_team_statistics_batch, extract_league_data, extract_team_transfer,extract_team_squad_player_ids, iter_players_statistics_byseason, extract_player_trophies_batched
+from src.load.checkpoints import CheckpointStore, get_checkpoint_store, mark
+from src.load.dedupe import PayloadDedupe
+from src.load.stage_copy import unit_writer
+from src.load.pipeline import LoadUnit, run_pipeline, run_sequential
+
+# "insert" (multi-row INSERT) or "copy" (stage files + COPY INTO, for big backfills)
+LOAD_MODE = os.getenv("LOAD_FOOTBALL_MODE", "insert")
+STAGE_FILE_FORMAT = os.getenv("LOAD_FOOTBALL_STAGE_FORMAT", "ndjson")
+# "0": extract and load strictly one after the other (old behaviour)
+PIPELINED = os.getenv("LOAD_FOOTBALL_PIPELINED", "1") == "1"
+
+# checkpoint-store job name and the per-team stages it tracks
+JOB = "football"
+TEAM_STAGES = ("team_stats", "player_stats", "team_transfers", "team_squads", "player_trophies")
+
+# League_ID 39 = Premier League, 140 = La Liga, 135 = Serie A, 78 = Bundesliga, 61 = Ligue 1
+LEAGUE_IDS = [39, 140, 135, 78, 61]
+SEASONS = [2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
 
 
 def load_env():
@@ -27,34 +44,10 @@ def snowflake_conn():
         database=os.getenv("SNOWFLAKE_DATABASE"),
         schema=os.getenv("SNOWFLAKE_SCHEMA"),
         role=os.getenv("SNOWFLAKE_ROLE"),
+        # the pipeline runner commits each batch of units (and its checkpoints) as one transaction
+        autocommit=False,
     )
 
-def insert_raw_many(conn, table, cols, rows, batch_size=200):
-    if not rows:
-        return
-
-    select_parts = []
-    for c in cols:
-        if c == "ingested_at":
-            select_parts.append("TO_TIMESTAMP_NTZ(%s)")
-        elif c == "payload":
-            select_parts.append("PARSE_JSON(%s)")
-        else:
-            select_parts.append("%s")
-
-    sql = f"""
-        INSERT INTO {table} ({", ".join(cols)})
-        SELECT {", ".join(select_parts)}
-    """
-
-    with conn.cursor() as cur:
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
-
-            # run each row individually (NO rewrite possible)
-            for r in batch:
-                cur.execute(sql, r)
-
 def insert_raw(conn, table: str, cols: List[str], values: List[Any]):
     """
     values: python list aligned with cols
@@ -78,330 +71,293 @@ def insert_raw(conn, table: str, cols: List[str], values: List[Any]):
         cur.execute(sql, values)
 
 
-def main():
-    load_env()
-    conn = snowflake_conn()
-
-    with conn.cursor() as cur:
-        cur.execute("select current_account(), current_user(), current_role(), current_database(), current_schema()")
-        print("SESSION =", cur.fetchone())
+def iter_football_units(
+    store: Optional[CheckpointStore] = None,
+    league_ids: List[int] = LEAGUE_IDS,
+    seasons: List[int] = SEASONS,
+) -> Iterator[LoadUnit]:
+    """
+    extract stage of the football load: every RAW write is yielded as a LoadUnit
+    whose marks record (league, season, stage, team) as done once the runner commits.
+    A restart skips every finished season / team stage without calling the API.
+    """
+    store = store or get_checkpoint_store()
 
-    # League_ID 39 = Premier League, 140 = La Liga, 135 = Serie A, 78 = Bundesliga, 61 = Ligue 1
-    league_ids = [39,140,135,78,61]  # Premier League, La Liga   
-    seasons = [2018,2019,2020,2021,2022,2023,2024,2025]
-    seen = set() 
-    cursor = load_cursor()
-    start_lg_i = cursor.get("league_i", 0)
-    start_ss_i = cursor.get("season_i", 0)
-    start_team_i = cursor.get("team_i", 0)
-    start_page_i = cursor.get("page",1)
-    stage = cursor.get("stage", "league_info")  # if missing, start at league_info
-    print("CURSOR:", start_lg_i, start_ss_i, start_team_i)
     # ========================
     # 1) extract football information
     # ========================
-    try:
-        for lg_i in range(start_lg_i, len(league_ids)):
-            lg = league_ids[lg_i]
-
-            for ss_i in range(start_ss_i if lg_i == start_lg_i else 0, len(seasons)):
-                ss = seasons[ss_i]
-
-                # ========================
-                # 1) league information
-                # ========================
-                # stage = "league_info"
-
-                # if ss == 2025:
-                #     league_rows = extract_league_data(league_id=lg, season=ss)  # list[dict]
-                #     for r in league_rows:
-                #         insert_raw(
-                #             conn,
-                #             "FOOTBALL_CAPSTONE.RAW.RAW_LEAGUE",
-                #             ["ingested_at", "league_id", "season", "payload"],
-                #             [now_ingested(), r["league_id"], r["season"], json.dumps(r["payload"])]
-                #         )
-                #     conn.commit()
-
-                save_cursor(lg_i, ss_i, 0)  # done league_info (team index reset)
-                print(f'beginning fetch data for league {lg}{ss}')
-
+    for lg in league_ids:
+        for ss in seasons:
+            if store.is_done(JOB, lg, ss, "season"):
+                print(f'skip league {lg}{ss} (done)')
+                continue
+
+            # ========================
+            # 1) league information
+            # ========================
+            # stage = "league_info"
+
+            # if ss == 2025:
+            #     league_rows = extract_league_data(league_id=lg, season=ss)  # list[dict]
+            #     for r in league_rows:
+            #         insert_raw(
+            #             conn,
+            #             "FOOTBALL_CAPSTONE.RAW.RAW_LEAGUE",
+            #             ["ingested_at", "league_id", "season", "payload"],
+            #             [now_ingested(), r["league_id"], r["season"], json.dumps(r["payload"])]
+            #         )
+            #     conn.commit()
+
+            print(f'beginning fetch data for league {lg}{ss}')
+
+            # ========================
+            # 2) team information
+            # ========================
+            team_ids, team_rows, errors = extract_team_ids(league_id=lg, season=ss)
+
+            if errors:
+                print(f'cannot print out team info lg{lg}ss{ss}')
+                continue 
+
+            # what is already loaded for this league-season, per stage
+            done = {stage: store.done_entities(JOB, lg, ss, stage) for stage in TEAM_STAGES}
+            todo = lambda stage: [t for t in team_ids if str(t) not in done[stage]]
+            # a team skipped on an API error keeps the season open for the next run
+            complete = True
+
+            # ========================
+            # 3) team statistics
+            # ========================
+            # whole league-season in one pass (one call per team left)
+            stats_team_ids = todo("team_stats")
+            print(f"beginning fetch team statistics: league={lg} season={ss} teams={len(stats_team_ids)}")
+            all_stats_rows, stats_errors = extract_team_statistics_batch(
+                league_id=lg,
+                season=ss,
+                team_ids=stats_team_ids
+            )
+            if stats_errors:
+                print("team_stats errors (first 3):", stats_errors[:3])
+            stats_by_team = {r["team_id"]: r for r in all_stats_rows}
+
+            for team_id in stats_team_ids:
+                stats_row = stats_by_team.get(team_id)
+                print("team_id:", team_id, "has stats:", stats_row is not None)
+
+                if not stats_row:
+                    complete = False
+                    continue
+
+                payload_obj = stats_row.get("payload")
+
+                row = [[now_ingested(), lg, ss, json.dumps(payload_obj)]]
+
+                yield LoadUnit(
+                    writes=[(
+                        "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_STATISTICS",
+                        ["ingested_at", "league_id", "season",  "payload"],
+                        row
+                    )],
+                    marks=[mark(JOB, lg, ss, "team_stats", team_id)]
+                )
+
+            # ========================
+            # 4) players statisitics
+            # ========================
+            for team_id in todo("player_stats"):
+                print(f'beginning fetch player statistics for league {team_id}{lg}{ss}')
+
+                # one team-season of pages (a few hundred rows) per unit
+                player_errors: List[Any] = []
+                player_rows = [
+                    [now_ingested(), lg, ss, team_id, json.dumps(r.get("payload"))]
+                    for r in iter_players_statistics_byseason(league_id=lg, season=ss, team_id=team_id, errors=player_errors)
+                ]
+
+                if player_errors:
+                    # a missing page would leave the team partial for good: retry it next run
+                    print("players_stats errors (first 3):", player_errors[:3])
+                    complete = False
+                    continue
+
+                print("players_stats rows:", len(player_rows))
+                yield LoadUnit(
+                    writes=[(
+                        "FOOTBALL_CAPSTONE.RAW.RAW_PLAYERS_STATISTICS",
+                        ["ingested_at", "league_id", "season", "team_id", "payload"],
+                        player_rows
+                    )],
+                    marks=[mark(JOB, lg, ss, "player_stats", team_id)]
+                )
+
+            # Only look for transfers, squads and trophies if season is in 2025
+            if ss == 2025:
                 # ========================
-                # 2) team information (resumable)
+                # 5) team transfers
                 # ========================
-                
-
-                stage = "team_info"
-
-                team_ids, team_rows, errors = extract_team_ids(league_id=lg, season=ss)
-
-                if errors:
-                    print(f'cannot print out team info lg{lg}ss{ss}')
-                    continue 
-
-                # figure out where to start (resume only for the starting league+season)
-                start_team = start_team_i if (lg_i == start_lg_i and ss_i == start_ss_i) else 0
-
-                # Make a lookup so we can insert team payload by team_id
-                team_row_by_id = {row.get("team_id"): row for row in team_rows if row.get("payload") and row["payload"].get("team") and row["payload"]["team"].get("id") is not None
-}
-                buffer = []
-                BATCH_SIZE = 1000
-
-                next_team_i = start_team 
-                                
-                for team_i in range(start_team, len(team_ids)):
-                    team_id = team_ids[team_i]
-
-
+                for team_id in todo("team_transfers"):
+                    print(f"beginning fetch transfers for team {team_id} in league={lg} season={ss}")
 
-                    # row = team_row_by_id.get(team_id)
-                    # if not row:
-                    #     print(f"SKIP team_id={team_id} (not found in team_rows)")
-                    #     # if API returned ids but not rows (rare), skip safely
-                    #     next_team_i = team_i +1
-                    #     continue
+                    # extract returns list/dict; we store the whole thing as one payload
+                    transfer_rows, errors = extract_team_transfer(team_id=team_id)
 
-                    # buffer.append([
-                    #     now_ingested(), 
-                    #     lg, 
-                    #     ss, 
-                    #     team_id, 
-                    #     json.dumps(row["payload"])
-                    # ])
-
-                    # next_team_i = team_i + 1
-
-                #     if len(buffer) >= BATCH_SIZE:
+                    if errors:
+                        print("team_transfers errors (first 3):", errors[:3])
+                        complete = False
+                        continue
 
-                #         insert_raw_many(
-                #             conn,
-                #             "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_INFO",
-                #             ["ingested_at", "league_id", "season", "team_id", "payload"],buffer
-                #             )
-                #         conn.commit()
-                #         buffer.clear()
-                        
-                #         # ✅ persist cursor only after commit
-                #         save_cursor(lg_i, ss_i, next_team_i)
+                    payload_obj = {
+                        "team_id": team_id,
+                        "league_id": lg,
+                        "season": ss,
+                        "response": [r.get("payload") if isinstance(r, dict) else r for r in transfer_rows]
+                    }
+
+                    row = [[
+                        now_ingested(),
+                        lg,
+                        ss,
+                        team_id,
+                        json.dumps(payload_obj, ensure_ascii=False)
+                    ]]
+
+                    yield LoadUnit(
+                        writes=[(
+                            "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_TRANSFER",
+                            ["ingested_at", "league_id", "season", "team_id", "payload"],
+                            row
+                        )],
+                        marks=[mark(JOB, lg, ss, "team_transfers", team_id)]
+                    )
 
+                # ========================
+                # 6) team squad ids 
+                # ========================
+                for team_id in todo("team_squads"):
+                    print(f"beginning fetch team squad: league={lg} season={ss} team_id={team_id}")
 
-                # if buffer:
-                #     insert_raw_many(
-                #         conn,
-                #         "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_INFO",
-                #         ["ingested_at", "league_id", "season", "team_id", "payload"],buffer
-                #         )
-                #     conn.commit()
-                #     buffer.clear()
-                # # ✅ final cursor save (even if no rows/buffer)
+                    player_ids, squad_rows, errors = extract_team_squad_player_ids(team_id=team_id)
 
-                    # ========================
-                    # 3) team statistics
-                    # ========================
+                    if errors:
+                        print("team_squads errors (first 3):", errors[:3])
+                        complete = False
+                        continue
 
-                    stage = "team_stats"
+                    ing = now_ingested()
 
-                    print(f"beginning fetch team statistics: league={lg} season={ss} team_id ={team_id}")
+                    payload_obj = {
+                        "team_id": team_id,
+                        "league_id": lg,
+                        "season": ss,
+                        "player_ids": sorted(set(player_ids or [])),
+                        "response": [
+                            r.get("payload") if isinstance(r, dict) else r
+                            for r in (squad_rows or [])
+                        ]
+                    }
 
-            #         # unpack correctly
+                    row = [[ing, lg, ss, team_id, json.dumps(payload_obj, ensure_ascii=False)]]
 
-                    key = (lg, ss, team_id)
-                    if key in seen:
-                        continue
-                    seen.add(key)
+                    yield LoadUnit(
+                        writes=[(
+                            "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_SQUADS",
+                            ["ingested_at", "league_id", "season", "team_id", "payload"],
+                            row
+                        )],
+                        marks=[mark(JOB, lg, ss, "team_squads", team_id)]
+                    )
 
-                    stats_rows, errors = extract_team_statistics(league_id=lg, season=ss, team_id=team_id)
-                    print("team_id:", team_id, "rows:", len(stats_rows), "errors:", len(errors))
+                # ========================
+                # 7) squad trophies batch 
+                # ========================
+                for team_id in todo("player_trophies"):
+                    print(f"[trophy] fetch squad for team {team_id} league={lg} season={ss}")
 
-                    if not stats_rows:
+                    player_ids, squad_rows, errors = extract_team_squad_player_ids(team_id)
+                    if errors:
+                        print("[trophy] squad errors (first 3):", errors[:3])
+                        complete = False
                         continue
 
-                    # pick ONE payload (usually the first is fine, since it’s “team season stats”)
-                    first = stats_rows[0]
-                    payload_obj = first.get("payload") if isinstance(first, dict) else first
-
-                    row = [[now_ingested(), lg, ss, json.dumps(payload_obj)]]
+                    unique_player_ids = sorted(set(player_ids or []))
+                    print(f"[trophy] team {team_id} unique players: {len(unique_player_ids)}")
 
-                    insert_raw_many(
-                        conn,
-                        "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_STATISTICS",
-                        ["ingested_at", "league_id", "season",  "payload"],
-                        row
+                    trophy_rows, trophy_errors = extract_player_trophies_batched(
+                        player_ids=unique_player_ids,
+                        team_id=team_id,
+                        batch_size=20
+                    )
+                    trophy_rows = trophy_rows or []
+                    trophy_errors = trophy_errors or []
+
+                    payload_obj = {
+                        "team_id": team_id,
+                        "league_id": lg,
+                        "season": ss,
+                        "player_ids": unique_player_ids,
+                        "response": [
+                            r.get("payload") if isinstance(r, dict) else r
+                            for r in trophy_rows
+                        ],
+                        "errors": trophy_errors[:20]  # keep it small
+                    }
+
+                    row = [[
+                        now_ingested(),
+                        lg,
+                        ss,
+                        team_id,
+                        json.dumps(payload_obj, ensure_ascii=False)
+                    ]]
+
+                    yield LoadUnit(
+                        writes=[(
+                            "FOOTBALL_CAPSTONE.RAW.RAW_PLAYER_TROPHIES",
+                            ["ingested_at", "league_id", "season", "team_id", "payload"],
+                            row
+                        )],
+                        marks=[mark(JOB, lg, ss, "player_trophies", team_id)]
                     )
-                    conn.commit()
-                    save_cursor(lg_i, ss_i, team_id)
-
-                    # ========================
-                    # 4) players statisitics
-                    # ========================
-                    stage = "player_stats"
 
-                    print(f'beginning fetch player statistics for league {team_id}{lg}{ss}')
+            # after finishing every stage for this league-season -> skip it next time
+            if complete:
+                yield LoadUnit(marks=[mark(JOB, lg, ss, "season")])
 
-                    stats_rows = extract_players_statistics_byseason(league_id=lg, season=ss, team_id=team_id)
-                    
-                    print("players_stats rows:", len(stats_rows), "errors:", len(errors))
 
-                    buffer = [
-                        [now_ingested(), lg, ss, team_id, json.dumps(r.get("payload"))]
-                        for r in stats_rows
-                    ]
+def main(pipelined: bool = PIPELINED):
+    load_env()
+    conn = snowflake_conn()
 
-                    if buffer:
-                        insert_raw_many(
-                            conn,
-                            "FOOTBALL_CAPSTONE.RAW.RAW_PLAYERS_STATISTICS",
-                            ["ingested_at", "league_id", "season", "team_id", "payload"],
-                            buffer
-                        )
-                    conn.commit()
-                    save_cursor(lg_i, ss_i, team_id)
-
-                    # ========================
-                    # 4) team transfers (resumable)
-                    # ========================
-                    if ss == 2025:
-                        stage = "team_transfers"
-                        start_team = start_team_i if (lg_i == start_lg_i and ss_i == start_ss_i) else 0
-
-                        for team_i in range(start_team, len(team_ids)):
-                            team_id = team_ids[team_i]
-                            print(f"beginning fetch transfers for team {team_id} in league={lg} season={ss}")
-
-                            # extract returns list/dict; we store the whole thing as one payload
-                            transfer_rows = extract_team_transfer(team_id=team_id) or []
-
-                            payload_obj = {
-                                "team_id": team_id,
-                                "league_id": lg,
-                                "season": ss,
-                                "response": [r.get("payload") if isinstance(r, dict) else r for r in transfer_rows]
-                            }
-
-                            row = [[
-                                now_ingested(),
-                                lg,
-                                ss,
-                                team_id,
-                                json.dumps(payload_obj, ensure_ascii=False)
-                            ]]
-
-                            insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_TRANSFER",
-                                ["ingested_at", "league_id", "season", "team_id", "payload"],
-                                row
-                            )
-                            conn.commit()
-                            save_cursor(lg_i, ss_i, team_id)                        
-                        
-    
-                            # ✅ save NEXT team inde
-                    
-                    # ========================
-                    # 5) team squad ids 
-                    # ========================
-                    # Only look for team squad ids if season is in  2025
-
-                    if ss == 2025:
-                        stage = "team_squads"
-                        print(f"beginning fetch team squad: league={lg} season={ss} team_id={team_id}")
-
-                        player_ids, squad_rows, errors = extract_team_squad_player_ids(team_id=team_id)
-
-                        if errors:
-                            print("team_squads errors (first 3):", errors[:3])
-                            continue
-
-                        ing = now_ingested()
-
-                        payload_obj = {
-                            "team_id": team_id,
-                            "league_id": lg,
-                            "season": ss,
-                            "player_ids": sorted(set(player_ids or [])),
-                            "response": [
-                                r.get("payload") if isinstance(r, dict) else r
-                                for r in (squad_rows or [])
-                            ]
-                        }
-
-                        row = [[ing, lg, ss, team_id, json.dumps(payload_obj, ensure_ascii=False)]]
-
-                        insert_raw_many(
-                            conn,
-                            "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_SQUADS",
-                            ["ingested_at", "league_id", "season", "team_id", "payload"],
-                            row
-                        )
-                        conn.commit()
+    with conn.cursor() as cur:
+        cur.execute("select current_account(), current_user(), current_role(), current_database(), current_schema()")
+        print("SESSION =", cur.fetchone())
 
-                # ========================
-                # 6) squad trophies batch 
-                # ========================
-                    if ss == 2025:
-                        stage = "player_trophies"
-
-                        start_team = start_team_i if (lg_i == start_lg_i and ss_i == start_ss_i) else 0
-
-                        for team_i in range(start_team, len(team_ids)):
-                            team_id = team_ids[team_i]
-                            print(f"[trophy] fetch squad for team {team_id} league={lg} season={ss}")
-
-                            player_ids, squad_rows, errors = extract_team_squad_player_ids(team_id)
-                            if errors:
-                                print("[trophy] squad errors (first 3):", errors[:3])
-                                continue
-
-                            unique_player_ids = sorted(set(player_ids or []))
-                            print(f"[trophy] team {team_id} unique players: {len(unique_player_ids)}")
-
-                            trophy_rows, trophy_errors = extract_player_trophies_batched(
-                                player_ids=unique_player_ids,
-                                batch_size=20
-                            )
-                            trophy_rows = trophy_rows or []
-                            trophy_errors = trophy_errors or []
-
-                            payload_obj = {
-                                "team_id": team_id,
-                                "league_id": lg,
-                                "season": ss,
-                                "player_ids": unique_player_ids,
-                                "response": [
-                                    r.get("payload") if isinstance(r, dict) else r
-                                    for r in trophy_rows
-                                ],
-                                "errors": trophy_errors[:20]  # keep it small
-                            }
-
-                            row = [[
-                                now_ingested(),
-                                lg,
-                                ss,
-                                team_id,
-                                json.dumps(payload_obj, ensure_ascii=False)
-                            ]]
-
-                            insert_raw_many(
-                                conn,
-                                "FOOTBALL_CAPSTONE.RAW.RAW_PLAYER_TROPHIES",
-                                ["ingested_at", "league_id", "season", "team_id", "payload"],
-                                row
-                            )
-                            conn.commit()
-
-                            save_cursor(lg_i, ss_i, team_i + 1, stage=stage)
-
-                # after finishing seasons for this league -> reset season cursor
-            save_cursor(lg_i, ss_i + 1, 0)
-
-
-            # # all done -> reset cursor
-        save_cursor(lg_i + 1, 0, 0)
+    try:
+        # pipelined: API extraction runs ahead of the Snowflake writes (bounded queue)
+        runner = run_pipeline if pipelined else run_sequential
+        store = get_checkpoint_store()
+        write_rows, flush = unit_writer(LOAD_MODE, STAGE_FILE_FORMAT)
+        stats = runner([iter_football_units(store=store)], conn, write_rows, store=store, dedupe=PayloadDedupe(), flush=flush)
+        print("football load:", stats)
+    finally:
+        conn.close()
 
 
+def load_football_shard(league_id: int, season: int, pipelined: bool = PIPELINED) -> Dict[str, Any]:
+    """
+    load one (league, season) with its own Snowflake connection
+    (used by the partitioned Dagster assets); resumes from the shared checkpoint store
+    """
+    load_env()
+    conn = snowflake_conn()
+    try:
+        runner = run_pipeline if pipelined else run_sequential
+        store = get_checkpoint_store()
+        units = iter_football_units(store=store, league_ids=[league_id], seasons=[season])
+        write_rows, flush = unit_writer(LOAD_MODE, STAGE_FILE_FORMAT)
+        stats = runner([units], conn, write_rows, store=store, dedupe=PayloadDedupe(), flush=flush)
+        print(f"football shard {league_id}/{season}:", stats)
+        return stats
     finally:
         conn.close()
 
@@ -0,0 +1,189 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence, Tuple
+
+# units waiting between the extract and load stages (backpressure bound)
+MAX_PENDING_UNITS = 4
+# units the loader writes under one commit when several are already queued
+MAX_UNITS_PER_COMMIT = 8
+
+_DONE = object()
+
+
+@dataclass
+class LoadUnit:
+    """
+    One piece of extracted work, ready to write.
+      writes: [(table, cols, rows)] with rows already materialized
+      marks: checkpoint-store records this unit completes (see src.load.checkpoints)
+      checkpoint: called only after the writes are committed (e.g. save_cursor)
+    """
+    writes: List[Tuple[str, List[str], List[List[Any]]]] = field(default_factory=list)
+    marks: List[Tuple[Any, ...]] = field(default_factory=list)
+    checkpoint: Optional[Callable[[], None]] = None
+    label: str = ""
+
+
+def _put(q: "queue.Queue", item: Any, stop: threading.Event) -> bool:
+    # blocks while the queue is full (backpressure) but gives up once the loader is gone
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _extract(source: Iterable[LoadUnit], q: "queue.Queue", stop: threading.Event, errors: List[BaseException]):
+    try:
+        for unit in source:
+            if not _put(q, unit, stop):
+                return
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        _put(q, _DONE, stop)
+
+
+def _write_units(
+    conn,
+    units: List[LoadUnit],
+    write_rows: Callable[..., int],
+    dedupe,
+    stats: Dict[str, Any],
+    flush: Optional[Callable[[Any], int]] = None,
+):
+    """
+    write every unit, flush buffered writers, commit once;
+    dedupe hashes follow the warehouse commit
+    """
+    try:
+        for unit in units:
+            for table, cols, rows in unit.writes:
+                if dedupe is not None:
+                    kept = dedupe.filter(table, cols, rows)
+                    stats["skipped"] += len(rows) - len(kept)
+                    rows = kept
+                if rows:
+                    stats["rows"] += write_rows(conn, table, cols, rows)
+        if flush is not None:
+            flush(conn)
+        conn.commit()
+    except BaseException:
+        if dedupe is not None:
+            dedupe.rollback()
+        raise
+    if dedupe is not None:
+        dedupe.commit()
+    stats["commits"] += 1
+
+
+def run_pipeline(
+    sources: Sequence[Iterable[LoadUnit]],
+    conn,
+    write_rows: Callable[..., int],
+    max_pending: int = MAX_PENDING_UNITS,
+    max_units_per_commit: int = MAX_UNITS_PER_COMMIT,
+    store=None,
+    dedupe=None,
+    flush: Optional[Callable[[Any], int]] = None,
+) -> Dict[str, Any]:
+    """
+    Overlap API extraction with warehouse writes.
+
+    Every source (an iterable of LoadUnit, e.g. a generator that calls the
+    API) runs in its own thread and feeds a bounded queue; when the loader
+    falls behind, the extractors block on the full queue. The calling thread
+    is the loader: it takes whatever units are queued (up to
+    max_units_per_commit), writes them with write_rows(conn, table, cols, rows),
+    commits once, and only then records their marks in the checkpoint store
+    (one SQLite transaction per warehouse commit) and runs their checkpoints.
+    dedupe (PayloadDedupe): unchanged payloads are dropped before writing and
+    the new hashes are kept only once the warehouse commit went through.
+    flush(conn): runs right before each commit, for writers that buffer rows
+    (src.load.stage_copy.unit_writer); write_rows and flush must not commit.
+
+    An extractor error stops that source; units it already queued are still
+    loaded and the error is raised at the end. A loader error stops the
+    extractors at their next put and is raised right away.
+    Returns stats: units, rows, skipped, commits, loader_wait_s, elapsed_s.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    threads = [
+        threading.Thread(target=_extract, args=(source, q, stop, errors), name=f"extract-{i}", daemon=True)
+        for i, source in enumerate(sources)
+    ]
+    stats = {"units": 0, "rows": 0, "skipped": 0, "commits": 0, "loader_wait_s": 0.0, "elapsed_s": 0.0}
+    started = time.monotonic()
+
+    for t in threads:
+        t.start()
+
+    running = len(threads)
+    try:
+        while running:
+            waited = time.monotonic()
+            batch = [q.get()]
+            stats["loader_wait_s"] += time.monotonic() - waited
+            while len(batch) < max_units_per_commit:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            units = []
+            for item in batch:
+                if item is _DONE:
+                    running -= 1
+                else:
+                    units.append(item)
+            if not units:
+                continue
+
+            _write_units(conn, units, write_rows, dedupe, stats, flush)
+
+            # ✅ cursor moves only after the commit
+            if store is not None:
+                store.mark_done([m for unit in units for m in unit.marks])
+            for unit in units:
+                if unit.checkpoint is not None:
+                    unit.checkpoint()
+                stats["units"] += 1
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(timeout=5)
+        stats["elapsed_s"] = round(time.monotonic() - started, 3)
+        stats["loader_wait_s"] = round(stats["loader_wait_s"], 3)
+
+    if errors:
+        raise errors[0]
+    return stats
+
+
+def run_sequential(
+    sources: Sequence[Iterable[LoadUnit]],
+    conn,
+    write_rows: Callable[..., int],
+    store=None,
+    dedupe=None,
+    flush: Optional[Callable[[Any], int]] = None,
+) -> Dict[str, Any]:
+    """
+    Same contract as run_pipeline without the threads (write, commit, checkpoint per unit).
+    """
+    stats = {"units": 0, "rows": 0, "skipped": 0, "commits": 0}
+    for source in sources:
+        for unit in source:
+            _write_units(conn, [unit], write_rows, dedupe, stats, flush)
+            if store is not None:
+                store.mark_done(unit.marks)
+            if unit.checkpoint is not None:
+                unit.checkpoint()
+            stats["units"] += 1
+    return stats
@@ -0,0 +1,253 @@
+import gzip
+import json
+import os
+import uuid
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from src.load.bulk_insert import bulk_insert
+
+# rows per staged file (one PUT + one COPY INTO per file)
+STAGE_BATCH_ROWS = int(os.getenv("SNOWFLAKE_STAGE_BATCH_ROWS", "100000"))
+STAGE_TMP_DIR = os.getenv("SNOWFLAKE_STAGE_TMP_DIR", "state/stage")
+
+FILE_FORMATS = ("ndjson", "parquet")
+
+# columns that hold a json string (already json.dumps'ed by the loaders)
+JSON_COLUMNS = {"payload", "message_value"}
+TIMESTAMP_COLUMNS = {"ingested_at", "kafka_timestamp"}
+
+
+def table_stage(table: str) -> str:
+    # DB.SCHEMA.TABLE -> @DB.SCHEMA.%TABLE
+    *namespace, name = table.split(".")
+    return "@" + ".".join(namespace + [f"%{name}"])
+
+
+def _ndjson_line(cols: Sequence[str], row: Sequence[Any]) -> str:
+    # json columns are spliced in as-is, so payloads are never parsed again
+    parts = []
+    for c, v in zip(cols, row):
+        if c in JSON_COLUMNS and isinstance(v, str):
+            value = v
+        else:
+            value = json.dumps(v, ensure_ascii=False, default=str)
+        parts.append(f"{json.dumps(c)}:{value}")
+    return "{" + ",".join(parts) + "}\n"
+
+
+def write_ndjson_gz(path: Path, cols: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        for row in rows:
+            f.write(_ndjson_line(cols, row))
+            count += 1
+    return count
+
+
+def write_parquet(path: Path, cols: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    # pyarrow is only needed for this format
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = list(rows)
+    table = pa.table({c: [r[i] for r in rows] for i, c in enumerate(cols)})
+    pq.write_table(table, path, compression="zstd")
+    return len(rows)
+
+
+def write_stage_file(path: Path, cols: Sequence[str], rows: Iterable[Sequence[Any]], file_format: str = "ndjson") -> int:
+    if file_format == "ndjson":
+        return write_ndjson_gz(path, cols, rows)
+    if file_format == "parquet":
+        return write_parquet(path, cols, rows)
+    raise ValueError(f"file_format must be one of {FILE_FORMATS}, got {file_format!r}")
+
+
+def build_copy_sql(
+    table: str,
+    cols: Sequence[str],
+    file_name: str,
+    file_format: str = "ndjson",
+    select: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    COPY INTO table (cols) FROM (SELECT <cast $1:col> ... FROM @%table) FILES = (file_name)
+    with the same casts as the INSERT path (TO_TIMESTAMP_NTZ / PARSE_JSON).
+    select: explicit SELECT expressions for files not written by copy_rows
+    """
+    select_parts = list(select or [])
+    for c in cols if select is None else []:
+        field = f"$1:{c}"
+        if c in TIMESTAMP_COLUMNS:
+            select_parts.append(f"TO_TIMESTAMP_NTZ({field}::string)")
+        elif c in JSON_COLUMNS and file_format == "parquet":
+            select_parts.append(f"PARSE_JSON({field}::string)")
+        else:
+            select_parts.append(field)
+
+    fmt = "TYPE = PARQUET" if file_format == "parquet" else "TYPE = JSON"
+    return f"""
+        COPY INTO {table} ({", ".join(cols)})
+        FROM (SELECT {", ".join(select_parts)} FROM {table_stage(table)})
+        FILES = ('{file_name}')
+        FILE_FORMAT = ({fmt})
+        ON_ERROR = ABORT_STATEMENT
+        PURGE = TRUE
+    """
+
+
+def copy_file(
+    conn,
+    table: str,
+    cols: Sequence[str],
+    path: Path,
+    file_format: str = "ndjson",
+    select: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    PUT one local file to the table stage and COPY it into table.
+    returns rows loaded as reported by COPY
+    """
+    path = Path(path).resolve()
+    with conn.cursor() as cur:
+        # files are compressed already, keep the name as-is on the stage
+        cur.execute(f"PUT 'file://{path.as_posix()}' {table_stage(table)} AUTO_COMPRESS = FALSE OVERWRITE = TRUE")
+        cur.execute(build_copy_sql(table, cols, path.name, file_format, select))
+        results = cur.fetchall() or []
+    # COPY returns one row per file: (file, status, rows_parsed, rows_loaded, ...)
+    return sum(int(r[3] or 0) for r in results if len(r) > 3)
+
+
+def copy_rows(
+    conn,
+    table: str,
+    cols: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    file_format: str = "ndjson",
+    batch_rows: int = STAGE_BATCH_ROWS,
+    tmp_dir: Optional[str] = None,
+    commit: bool = True,
+) -> int:
+    """
+    Stage-and-COPY loader: every batch_rows rows are written to a compressed
+    local file, PUT to the table stage and loaded with one COPY INTO.
+    commit=True commits after every file; commit=False leaves the COPYs in
+    the caller's transaction.
+    rows can be any iterable; only one file is on disk at a time.
+    returns the number of rows written
+    """
+    suffix = ".json.gz" if file_format == "ndjson" else ".parquet"
+    tmp_dir = Path(tmp_dir or STAGE_TMP_DIR)
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    short_name = table.split(".")[-1].lower()
+
+    rows = iter(rows)
+    written = 0
+    while True:
+        batch = islice(rows, batch_rows)
+        path = tmp_dir / f"{short_name}_{uuid.uuid4().hex}{suffix}"
+        try:
+            count = write_stage_file(path, cols, batch, file_format)
+            if count == 0:
+                return written
+            copy_file(conn, table, cols, path, file_format)
+            if commit:
+                conn.commit()
+            written += count
+        finally:
+            path.unlink(missing_ok=True)
+
+
+LOAD_MODES = ("insert", "copy")
+
+
+def write_raw_rows(
+    conn,
+    table: str,
+    cols: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    mode: str = "insert",
+    file_format: str = "ndjson",
+    max_rows: Optional[int] = None,
+    commit: bool = True,
+) -> int:
+    """
+    one entry point for the loaders:
+      insert -> multi-row INSERT statements (bulk_insert), at most max_rows per statement
+      copy   -> compressed file + PUT + COPY INTO (copy_rows), STAGE_BATCH_ROWS per file
+    commit=True commits after every statement / file, commit=False leaves it to the caller
+    """
+    if mode == "insert":
+        return bulk_insert(conn, table, cols, rows, commit=commit, max_rows=max_rows)
+    if mode == "copy":
+        return copy_rows(conn, table, cols, rows, file_format=file_format, commit=commit)
+    raise ValueError(f"load mode must be one of {LOAD_MODES}, got {mode!r}")
+
+
+class StageBuffer:
+    """
+    copy-mode writer for the pipeline runner (src.load.pipeline).
+    add() only buffers rows per table; flush() stages every table as one file
+    (PUT + COPY INTO) right before the runner's commit, so a commit batch of
+    units costs one COPY per table instead of one per unit and per table.
+    A table whose buffer reaches batch_rows is staged early. Nothing here
+    commits: the COPYs stay in the runner's transaction with the unit writes.
+    """
+
+    def __init__(self, file_format: str = "ndjson", batch_rows: int = STAGE_BATCH_ROWS, tmp_dir: Optional[str] = None):
+        self.file_format = file_format
+        self.batch_rows = batch_rows
+        self.tmp_dir = tmp_dir
+        self._rows: Dict[Tuple[str, Tuple[str, ...]], List[Sequence[Any]]] = {}
+
+    def _copy(self, conn, key) -> int:
+        table, cols = key
+        rows = self._rows.pop(key, [])
+        if not rows:
+            return 0
+        return copy_rows(
+            conn, table, cols, rows,
+            file_format=self.file_format, batch_rows=self.batch_rows, tmp_dir=self.tmp_dir, commit=False,
+        )
+
+    def add(self, conn, table: str, cols: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """
+        same signature as write_raw_rows' (conn, table, cols, rows); returns rows accepted
+        """
+        key = (table, tuple(cols))
+        buffered = self._rows.setdefault(key, [])
+        before = len(buffered)
+        buffered.extend(rows)
+        added = len(buffered) - before
+        if len(buffered) >= self.batch_rows:
+            self._copy(conn, key)
+        return added
+
+    def flush(self, conn) -> int:
+        """
+        stage every buffered table; the buffer is empty afterwards even on error
+        """
+        try:
+            return sum(self._copy(conn, key) for key in list(self._rows))
+        finally:
+            self._rows.clear()
+
+
+def unit_writer(
+    mode: str = "insert",
+    file_format: str = "ndjson",
+    max_rows: Optional[int] = None,
+) -> Tuple[Callable[..., int], Optional[Callable[[Any], int]]]:
+    """
+    (write_rows, flush) for run_pipeline / run_sequential in the given load mode.
+    Neither commits; the runner does, once per batch of units.
+    """
+    if mode == "copy":
+        buffer = StageBuffer(file_format=file_format)
+        return buffer.add, buffer.flush
+    if mode == "insert":
+        def write_rows(conn, table, cols, rows):
+            return bulk_insert(conn, table, cols, rows, commit=False, max_rows=max_rows)
+        return write_rows, None
+    raise ValueError(f"load mode must be one of {LOAD_MODES}, got {mode!r}")
@@ -0,0 +1,42 @@
+from src.load.bulk_insert import STATEMENT_OVERHEAD_BYTES, build_insert_sql, iter_chunks
+
+
+def _sizes(chunks):
+    return [len(c) for c in chunks]
+
+
+def test_chunks_respect_bind_param_limit():
+    rows = [[i, i, i] for i in range(10)]
+    assert _sizes(iter_chunks(rows, n_cols=3, max_params=9)) == [3, 3, 3, 1]
+
+
+def test_chunks_respect_max_rows():
+    rows = [[i] for i in range(5)]
+    assert _sizes(iter_chunks(rows, n_cols=1, max_rows=2)) == [2, 2, 1]
+
+
+def test_chunks_respect_statement_bytes():
+    payload = "x" * 1000
+    rows = [[payload] for _ in range(6)]
+    # room for two rows per statement after the fixed overhead
+    max_bytes = STATEMENT_OVERHEAD_BYTES + 2 * 1010
+    assert _sizes(iter_chunks(rows, n_cols=1, max_bytes=max_bytes)) == [2, 2, 2]
+
+
+def test_oversized_row_goes_out_alone():
+    rows = [["small"], ["x" * 5000], ["small"]]
+    chunks = list(iter_chunks(rows, n_cols=1, max_bytes=STATEMENT_OVERHEAD_BYTES + 100))
+    assert _sizes(chunks) == [1, 1, 1]
+    assert chunks[1] == [["x" * 5000]]
+
+
+def test_chunks_keep_every_row_in_order():
+    rows = [[i, str(i)] for i in range(1000)]
+    chunks = list(iter_chunks(rows, n_cols=2, max_params=64))
+    assert [r for c in chunks for r in c] == rows
+
+
+def test_insert_sql_casts_raw_columns():
+    sql = build_insert_sql("DB.RAW.T", ["ingested_at", "league_id", "payload"], 2)
+    assert "SELECT TO_TIMESTAMP_NTZ(column1), column2, PARSE_JSON(column3) FROM VALUES" in sql
+    assert sql.endswith("(%s,%s,%s),(%s,%s,%s)")
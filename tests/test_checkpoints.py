@@ -0,0 +1,50 @@
+import pytest
+
+from src.load.checkpoints import ALL, CheckpointStore, mark
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(db_path=str(tmp_path / "checkpoints.sqlite"))
+
+
+def test_mark_normalizes_ids():
+    assert mark("job", "39", "2024", "team_stats", 42) == ("job", 39, 2024, "team_stats", "42")
+    assert mark("job", 39, 2024, "season") == ("job", 39, 2024, "season", ALL)
+
+
+def test_marks_are_recorded_per_entity(store):
+    store.mark_done([mark("football", 39, 2024, "team_stats", 1), mark("football", 39, 2024, "team_stats", 2)])
+
+    assert store.is_done("football", 39, 2024, "team_stats", 1)
+    assert not store.is_done("football", 39, 2024, "team_stats", 3)
+    assert not store.is_done("football", 39, 2024, "team_stats")
+    assert store.done_entities("football", 39, 2024, "team_stats") == {"1", "2"}
+    assert store.done_entities("football", 39, 2024, "player_stats") == set()
+
+
+def test_marking_twice_is_idempotent(store):
+    m = mark("football", 39, 2024, "season")
+    store.mark_done([m])
+    store.mark_done([m])
+    [row] = store.summary("football")
+    assert (row["league_id"], row["season"], row["stage"], row["done"]) == (39, 2024, "season", 1)
+
+
+def test_remaining_keeps_input_order(store):
+    store.mark_done([mark("history", 39, 2023, "season"), mark("other", 140, 2024, "season")])
+    assert store.remaining("history", [39, 140], [2023, 2024], "season") == [(39, 2024), (140, 2023), (140, 2024)]
+
+
+def test_reset_one_season(store):
+    store.mark_done([mark("history", 39, 2023, "season"), mark("history", 39, 2024, "season")])
+    store.reset("history", league_id=39, season=2023)
+    assert not store.is_done("history", 39, 2023, "season")
+    assert store.is_done("history", 39, 2024, "season")
+
+
+def test_cursor_round_trip(store):
+    assert store.get_cursor("default") is None
+    store.set_cursor("default", {"league_i": 1, "page": 3})
+    store.set_cursor("default", {"league_i": 2, "page": 1})
+    assert store.get_cursor("default") == {"league_i": 2, "page": 1}
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+# needs confluent_kafka / snowflake-connector importable
+consume_live_events = pytest.importorskip("src.kafka.consume_live_events")
+
+
+class FakeMessage:
+    def __init__(self, value, key=b"1208021"):
+        self._value = value
+        self._key = key
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+    def topic(self):
+        return "fixture.live.events"
+
+    def partition(self):
+        return 3
+
+    def offset(self):
+        return 42
+
+    def timestamp(self):
+        return (1, 1700000000000)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (b'{"type": "Goal", "time": {"elapsed": 23}}', True),
+    (b"[1, 2, 3]", True),
+    (b'{"type": "Goal"', False),
+    (b"not json", False),
+    (b"", False),
+])
+def test_is_json(value, expected):
+    assert consume_live_events.is_json(value) is expected
+
+
+def test_is_json_without_orjson(monkeypatch):
+    monkeypatch.setattr(consume_live_events, "orjson", None)
+    assert consume_live_events.is_json(b'{"a": 1}')
+    assert not consume_live_events.is_json(b"{")
+
+
+def test_valid_value_passes_through_as_the_same_bytes(monkeypatch):
+    monkeypatch.setattr(consume_live_events, "TRUSTED_PRODUCER", False)
+    value = b'{"type":"Goal"}'
+    row, nbytes = consume_live_events.message_to_row(FakeMessage(value))
+    assert row[:5] == ("fixture.live.events", 3, 42, "1208021", value)
+    assert nbytes == len(value)
+
+
+def test_invalid_value_is_wrapped(monkeypatch):
+    monkeypatch.setattr(consume_live_events, "TRUSTED_PRODUCER", False)
+    row, _ = consume_live_events.message_to_row(FakeMessage(b"oops"))
+    assert json.loads(row[4]) == {"_raw": "oops"}
+
+
+def test_trusted_producer_skips_the_parse(monkeypatch):
+    monkeypatch.setattr(consume_live_events, "TRUSTED_PRODUCER", True)
+
+    def fail(value):
+        raise AssertionError("trusted values must not be parsed")
+
+    monkeypatch.setattr(consume_live_events, "is_json", fail)
+    row, _ = consume_live_events.message_to_row(FakeMessage(b"oops"))
+    assert row[4] == b"oops"
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("confluent_kafka")
+
+from src.kafka.consumer_engine import AdaptiveBatchSize
+
+
+def test_grows_when_full_batches_flush_fast():
+    sizer = AdaptiveBatchSize(initial=100, minimum=100, maximum=1000, target_seconds=1.0)
+    sizer.observe(rows=100, seconds=0.1)
+    assert sizer.size == 151
+
+
+def test_does_not_grow_on_partial_batches():
+    # latency-bound flush: the batch never filled up, a bigger size would not help
+    sizer = AdaptiveBatchSize(initial=100, minimum=100, maximum=1000, target_seconds=1.0)
+    sizer.observe(rows=40, seconds=0.1)
+    assert sizer.size == 100
+
+
+def test_holds_between_half_and_full_target():
+    sizer = AdaptiveBatchSize(initial=400, minimum=100, maximum=1000, target_seconds=1.0)
+    sizer.observe(rows=400, seconds=0.7)
+    assert sizer.size == 400
+
+
+def test_halves_when_a_flush_is_too_slow():
+    sizer = AdaptiveBatchSize(initial=800, minimum=100, maximum=1000, target_seconds=1.0)
+    sizer.observe(rows=800, seconds=1.5)
+    assert sizer.size == 400
+
+
+def test_stays_within_bounds():
+    sizer = AdaptiveBatchSize(initial=5000, minimum=100, maximum=1000, target_seconds=1.0)
+    assert sizer.size == 1000
+    for _ in range(10):
+        sizer.observe(rows=sizer.size, seconds=0.01)
+    assert sizer.size == 1000
+    for _ in range(10):
+        sizer.observe(rows=sizer.size, seconds=5.0)
+    assert sizer.size == 100
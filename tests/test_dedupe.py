@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from src.load.dedupe import PayloadDedupe, payload_hash
+
+EVENT_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_FIXTURE_EVENT"
+EVENT_COLS = ["ingested_at", "league_id", "season", "fixture_id", "payload"]
+TEAM_STATS_TABLE = "FOOTBALL_CAPSTONE.RAW.RAW_TEAMS_STATISTICS"
+TEAM_STATS_COLS = ["ingested_at", "league_id", "season", "payload"]
+
+
+def _event(fixture_id, minute, ingested_at="2024-01-01T00:00:00"):
+    return [ingested_at, 39, 2024, fixture_id, json.dumps({"time": {"elapsed": minute}, "type": "Goal"})]
+
+
+@pytest.fixture
+def dedupe(tmp_path):
+    return PayloadDedupe(db_path=str(tmp_path / "checkpoints.sqlite"), enabled=True)
+
+
+def test_payload_hash_ignores_key_order():
+    assert payload_hash({"a": 1, "b": [1, 2]}) == payload_hash({"b": [1, 2], "a": 1})
+    assert payload_hash({"a": 1}) != payload_hash({"a": 2})
+
+
+def test_unchanged_group_is_skipped_after_commit(dedupe):
+    rows = [_event(1, 10), _event(1, 55)]
+    assert dedupe.filter(EVENT_TABLE, EVENT_COLS, rows) == rows
+    dedupe.commit()
+
+    # a new ingested_at alone does not make the rows new
+    again = [_event(1, 55, "2024-01-02T00:00:00"), _event(1, 10, "2024-01-02T00:00:00")]
+    assert dedupe.filter(EVENT_TABLE, EVENT_COLS, again) == []
+    assert dedupe.skipped == 2
+
+
+def test_any_change_in_a_group_rewrites_the_whole_group(dedupe):
+    dedupe.filter(EVENT_TABLE, EVENT_COLS, [_event(1, 10)])
+    dedupe.commit()
+
+    rows = [_event(1, 10), _event(1, 80)]
+    assert dedupe.filter(EVENT_TABLE, EVENT_COLS, rows) == rows
+
+
+def test_groups_are_keyed_per_natural_key(dedupe):
+    dedupe.filter(EVENT_TABLE, EVENT_COLS, [_event(1, 10)])
+    dedupe.commit()
+    assert dedupe.filter(EVENT_TABLE, EVENT_COLS, [_event(2, 10)]) == [_event(2, 10)]
+
+
+def test_payload_path_keys(dedupe):
+    def team_stats(team_id, wins):
+        return ["2024-01-01T00:00:00", 39, 2024, json.dumps({"team": {"id": team_id}, "wins": wins})]
+
+    dedupe.filter(TEAM_STATS_TABLE, TEAM_STATS_COLS, [team_stats(50, 3), team_stats(42, 1)])
+    dedupe.commit()
+    assert dedupe.filter(TEAM_STATS_TABLE, TEAM_STATS_COLS, [team_stats(50, 3), team_stats(42, 2)]) == [team_stats(42, 2)]
+
+
+def test_rollback_forgets_pending_hashes(dedupe):
+    rows = [_event(1, 10)]
+    dedupe.filter(EVENT_TABLE, EVENT_COLS, rows)
+    dedupe.rollback()
+    dedupe.commit()
+    assert dedupe.filter(EVENT_TABLE, EVENT_COLS, rows) == rows
+
+
+def test_tables_without_natural_key_pass_through(dedupe):
+    rows = [["2024-01-01T00:00:00", "file.csv", "{}"]] * 2
+    assert dedupe.filter("FOOTBALL_CAPSTONE.RAW.RAW_FM", ["ingested_at", "source_file", "payload"], rows) == rows
+
+
+def test_disabled_dedupe_keeps_everything(tmp_path):
+    dedupe = PayloadDedupe(db_path=str(tmp_path / "checkpoints.sqlite"), enabled=False)
+    rows = [_event(1, 10)]
+    dedupe.filter(EVENT_TABLE, EVENT_COLS, rows)
+    dedupe.commit()
+    assert dedupe.filter(EVENT_TABLE, EVENT_COLS, rows) == rows
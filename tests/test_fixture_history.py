@@ -0,0 +1,78 @@
+import pytest
+
+# needs the API / Snowflake client stack importable
+load_fixture_history = pytest.importorskip("src.load.load_fixture_history")
+
+from src.load.checkpoints import CheckpointStore
+from src.load.fixture_index import FixtureIndex
+
+
+def _fixture_row(fixture_id):
+    return {
+        "fixture_id": fixture_id,
+        "home_team_id": 10,
+        "away_team_id": 20,
+        "payload": {"fixture": {"id": fixture_id, "status": {"short": "FT"}}},
+    }
+
+
+def _bundle(events_errors=()):
+    ok = ([{"payload": {"ok": True}, "team_id": 10}], [])
+    return {
+        "teams": {"home": 10, "away": 20},
+        "events": ([], list(events_errors)) if events_errors else ok,
+        "lineups": ok,
+        "predictions": ok,
+        "statistics": {"home": ok, "away": ok},
+        "players": {"home": ok, "away": ok},
+    }
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    rows = [_fixture_row(1), _fixture_row(2)]
+    fetched = []
+    failing = {2}
+
+    def fake_bundles(window_rows, hydrate=True):
+        fetched.append([r["fixture_id"] for r in window_rows])
+        return {
+            r["fixture_id"]: _bundle(events_errors=["rate limited"] if r["fixture_id"] in failing else ())
+            for r in window_rows
+        }
+
+    monkeypatch.setattr(load_fixture_history, "extract_league_fixture", lambda league_id, season: ([1, 2], rows, []))
+    monkeypatch.setattr(load_fixture_history, "fetch_window_bundles", fake_bundles)
+
+    db = str(tmp_path / "checkpoints.sqlite")
+    store, index = CheckpointStore(db), FixtureIndex(db)
+
+    def run():
+        # what the pipeline runner does after each commit
+        for unit in load_fixture_history.iter_history_units(league_ids=[39], seasons=[2024], store=store, index=index):
+            store.mark_done(unit.marks)
+            if unit.checkpoint is not None:
+                unit.checkpoint()
+
+    return run, fetched, failing, store, index
+
+
+def test_failed_fixture_is_refetched_next_run(history):
+    run, fetched, failing, store, index = history
+
+    run()
+    assert fetched == [[1, 2]]
+    assert set(index.known(39, 2024)) == {1}
+    assert not store.is_done("fixture_history", 39, 2024, "season")
+
+    failing.clear()
+    run()
+    assert fetched[-1] == [2]
+    assert set(index.known(39, 2024)) == {1, 2}
+    assert store.is_done("fixture_history", 39, 2024, "season")
+
+
+def test_failed_sub_resource_is_not_written():
+    writes, errors = load_fixture_history.fixture_bundle_writes(39, 2024, 2, _bundle(events_errors=["boom"]))
+    assert [e["resource"] for e in errors] == ["events"]
+    assert load_fixture_history.FIXTURE_EVENT_TABLE not in [table for table, _, _ in writes]
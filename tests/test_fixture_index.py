@@ -0,0 +1,57 @@
+import pytest
+
+from src.load.fixture_index import FixtureIndex, fixture_status, payload_hash
+
+
+def _row(fixture_id, status, goals=0):
+    return {
+        "fixture_id": fixture_id,
+        "payload": {"fixture": {"id": fixture_id, "status": {"short": status}}, "goals": {"home": goals}},
+    }
+
+
+def _sync(index, rows):
+    index.record(39, 2024, [(r["fixture_id"], fixture_status(r["payload"]), payload_hash(r["payload"])) for r in rows])
+
+
+@pytest.fixture
+def index(tmp_path):
+    return FixtureIndex(db_path=str(tmp_path / "checkpoints.sqlite"))
+
+
+def _changed_ids(index, rows):
+    return [row["fixture_id"] for row, _, _ in index.changed(39, 2024, rows)]
+
+
+def test_new_fixtures_need_a_sync(index):
+    assert _changed_ids(index, [_row(1, "FT"), _row(2, "NS")]) == [1, 2]
+
+
+def test_final_unchanged_fixture_is_skipped(index):
+    rows = [_row(1, "FT")]
+    _sync(index, rows)
+    assert _changed_ids(index, rows) == []
+
+
+def test_changed_payload_needs_a_sync(index):
+    _sync(index, [_row(1, "FT", goals=1)])
+    assert _changed_ids(index, [_row(1, "FT", goals=2)]) == [1]
+
+
+def test_open_fixture_is_refreshed_even_if_unchanged(index):
+    rows = [_row(1, "NS"), _row(2, "AET"), _row(3, "PST")]
+    _sync(index, rows)
+    assert _changed_ids(index, rows) == [1, 3]
+
+
+def test_refresh_open_can_be_turned_off(tmp_path):
+    index = FixtureIndex(db_path=str(tmp_path / "checkpoints.sqlite"), refresh_open=False)
+    rows = [_row(1, "NS")]
+    _sync(index, rows)
+    assert _changed_ids(index, rows) == []
+
+
+def test_index_is_per_league_season(index):
+    rows = [_row(1, "FT")]
+    _sync(index, rows)
+    assert [r["fixture_id"] for r, _, _ in index.changed(140, 2024, rows)] == [1]
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("confluent_kafka")
+pytest.importorskip("snowflake.connector")
+pytest.importorskip("dotenv")
+
+from src.kafka.produce_live_events import event_fingerprint
+
+
+def _event(**overrides):
+    event = {
+        "time": {"elapsed": 23, "extra": None},
+        "team": {"id": 50, "name": "Manchester City"},
+        "player": {"id": 1100, "name": "E. Haaland"},
+        "type": "Goal",
+        "detail": "Normal Goal",
+        "comments": None,
+    }
+    event.update(overrides)
+    return event
+
+
+def test_fingerprint_is_stable_and_short():
+    assert event_fingerprint(_event()) == event_fingerprint(_event())
+    assert len(event_fingerprint(_event())) == 16
+
+
+def test_fingerprint_ignores_display_fields():
+    renamed = _event(team={"id": 50, "name": "Man City"}, comments="VAR checked")
+    assert event_fingerprint(renamed) == event_fingerprint(_event())
+
+
+@pytest.mark.parametrize("change", [
+    {"time": {"elapsed": 24, "extra": None}},
+    {"time": {"elapsed": 23, "extra": 2}},
+    {"player": {"id": 1101}},
+    {"team": {"id": 33}},
+    {"detail": "Penalty"},
+    {"type": "Card"},
+])
+def test_fingerprint_changes_with_identity_fields(change):
+    assert event_fingerprint(_event(**change)) != event_fingerprint(_event())
+
+
+def test_fingerprint_handles_missing_sections():
+    assert event_fingerprint({"type": "subst"}) == event_fingerprint({"type": "subst", "time": None, "player": None})
@@ -0,0 +1,59 @@
+import pytest
+
+# needs the API / Snowflake client stack importable
+load_football = pytest.importorskip("src.load.load_football")
+
+from src.load.checkpoints import CheckpointStore
+
+SEASON = 2025
+
+
+@pytest.fixture
+def football(tmp_path, monkeypatch):
+    failing = set()
+
+    def players(league_id, season, team_id, errors=None):
+        if "player_stats" in failing and errors is not None:
+            errors.append({"page": 2, "request": "no response"})
+        yield {"payload": {"player": {"id": 1}}}
+
+    def transfers(team_id):
+        if "team_transfers" in failing:
+            return [], [{"request": "no response"}]
+        return [{"payload": {"player": {"id": 1}}}], []
+
+    monkeypatch.setattr(load_football, "extract_team_ids", lambda league_id, season: ([50], [], []))
+    monkeypatch.setattr(load_football, "extract_team_statistics_batch",
+                        lambda league_id, season, team_ids: ([{"team_id": t, "payload": {}} for t in team_ids], []))
+    monkeypatch.setattr(load_football, "iter_players_statistics_byseason", players)
+    monkeypatch.setattr(load_football, "extract_team_transfer", transfers)
+    monkeypatch.setattr(load_football, "extract_team_squad_player_ids", lambda team_id: ([1], [{"payload": {}}], []))
+    monkeypatch.setattr(load_football, "extract_player_trophies_batched",
+                        lambda player_ids, team_id, batch_size: ([{"payload": {}}], []))
+
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+
+    def run():
+        units = list(load_football.iter_football_units(store=store, league_ids=[39], seasons=[SEASON]))
+        for unit in units:
+            store.mark_done(unit.marks)
+        return units
+
+    return run, failing, store
+
+
+@pytest.mark.parametrize("stage", ["player_stats", "team_transfers"])
+def test_api_error_keeps_team_and_season_open(football, stage):
+    run, failing, store = football
+    failing.add(stage)
+
+    units = run()
+    assert not store.is_done("football", 39, SEASON, stage, 50)
+    assert not store.is_done("football", 39, SEASON, "season")
+    # nothing partial is written for the failed stage
+    assert all(m[3] != stage for unit in units for m in unit.marks)
+
+    failing.clear()
+    run()
+    assert store.is_done("football", 39, SEASON, stage, 50)
+    assert store.is_done("football", 39, SEASON, "season")
@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.extract.base import rate_limiter
+from src.extract.base.rate_limiter import LOW_WATER, RateLimiter, SharedRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def _drain(clock, start_remaining, calls=450, limit=7500, reset_in=43200):
+    """
+    Make `calls` requests, feeding the limiter the headers the server would send.
+    Returns the total time spent sleeping.
+    """
+    clock.slept = 0.0
+    limiter = RateLimiter(5000, 86400)
+    remaining = start_remaining
+    for _ in range(calls):
+        limiter.wait()
+        remaining -= 1
+        limiter.observe(remaining, limit=limit, period_seconds=86400, reset_in=reset_in)
+    return clock.slept
+
+
+def test_observe_never_refills_the_bucket(clock):
+    limiter = RateLimiter(10, 60)
+    for _ in range(10):
+        limiter.wait()
+    limiter.observe(9000, limit=10000, period_seconds=60)
+    assert limiter._tokens <= 0
+
+
+def test_observe_keeps_debt_of_queued_callers(clock):
+    limiter = RateLimiter(2, 60)
+    for _ in range(5):
+        limiter._reserve()
+    debt = limiter._tokens
+    assert debt < 0
+    limiter.observe(50, limit=100, period_seconds=60)
+    assert limiter._tokens == debt
+
+
+def test_sleep_grows_as_remaining_falls_below_low_water(clock):
+    limit = 7500
+    plenty = _drain(clock, int(limit * LOW_WATER) + 1000)
+    low = _drain(clock, 800)
+    lower = _drain(clock, 500)
+
+    assert plenty == 0
+    assert 0 < low < lower
+
+
+# ========================
+# shared (SQLite) bucket
+# ========================
+# 10 calls over a very long period: no meaningful refill while the test runs
+SHARED_CALLS = 10
+SHARED_PERIOD = 10 ** 6
+
+
+def _shared(db_path):
+    return SharedRateLimiter("api_sports_daily", SHARED_CALLS, SHARED_PERIOD, db_path=db_path)
+
+
+def _draw(db_path, n):
+    # runs in a child process: reserve n tokens, return how many had to wait
+    limiter = _shared(db_path)
+    return sum(1 for _ in range(n) if limiter._reserve() > 0)
+
+
+def test_shared_limiter_instances_draw_from_one_bucket(tmp_path):
+    db_path = str(tmp_path / "rate_limits.sqlite")
+    first, second = _shared(db_path), _shared(db_path)
+
+    assert all(first._reserve() == 0 for _ in range(6))
+    assert all(second._reserve() == 0 for _ in range(4))
+    assert first._reserve() > 0
+    assert second._reserve() > 0
+
+
+def test_shared_limiter_state_survives_a_new_instance(tmp_path):
+    db_path = str(tmp_path / "rate_limits.sqlite")
+    limiter = _shared(db_path)
+    for _ in range(SHARED_CALLS):
+        limiter._reserve()
+    del limiter
+
+    assert _shared(db_path)._reserve() > 0
+    # another bucket name in the same file is independent
+    assert SharedRateLimiter("other", SHARED_CALLS, SHARED_PERIOD, db_path=db_path)._reserve() == 0
+
+
+def test_shared_limiter_is_shared_across_processes(tmp_path):
+    db_path = str(tmp_path / "rate_limits.sqlite")
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        waited = list(pool.map(_draw, [db_path, db_path], [5, 5]))
+
+    assert waited == [0, 0]
+    assert _shared(db_path)._reserve() > 0
+
+
+def test_wait_async_sleeps_on_the_event_loop(tmp_path, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    def no_blocking_sleep(seconds):
+        raise AssertionError("wait_async must not block the event loop")
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(rate_limiter.time, "sleep", no_blocking_sleep)
+
+    async def drain(limiter):
+        for _ in range(SHARED_CALLS + 1):
+            await limiter.wait_async()
+
+    asyncio.run(drain(_shared(str(tmp_path / "rate_limits.sqlite"))))
+    asyncio.run(drain(RateLimiter(SHARED_CALLS, SHARED_PERIOD)))
+    assert len(slept) == 2 and all(s > 0 for s in slept)
@@ -0,0 +1,36 @@
+import pytest
+
+from src.extract.base.response_cache import FOREVER, UNFINISHED_FIXTURE_TTL, ResponseCache
+
+
+def _fixtures(*items):
+    return {"errors": [], "response": [{"fixture": {"id": fid, "status": {"short": status}}} for fid, status in items]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(db_path=str(tmp_path / "api_cache.sqlite"))
+
+
+def test_in_play_fixture_lookup_is_never_cached(cache):
+    params = {"id": 1}
+    cache.put("/fixtures", params, _fixtures((1, "2H")))
+    assert cache.ttl_for("/fixtures", params) == 0
+    assert cache.get("/fixtures", params) is None
+
+
+def test_entry_from_before_kick_off_is_not_served_in_play(cache):
+    params = {"ids": "1-2"}
+    cache.put("/fixtures", params, _fixtures((1, "NS"), (2, "NS")))
+    assert cache.get("/fixtures", params) is not None
+
+    cache.record_fixture_statuses(_fixtures((1, "1H")))
+    assert cache.get("/fixtures", params) is None
+
+
+def test_fixture_lookup_ttls(cache):
+    cache.record_fixture_statuses(_fixtures((1, "FT"), (2, "NS"), (3, "HT")))
+    assert cache.ttl_for("/fixtures", {"ids": "1"}) is FOREVER
+    assert cache.ttl_for("/fixtures", {"ids": "1-2"}) == UNFINISHED_FIXTURE_TTL
+    assert cache.ttl_for("/fixtures", {"ids": "1-2-3"}) == 0
+    assert cache.ttl_for("/fixtures/events", {"fixture": 3}) == 0
@@ -0,0 +1,101 @@
+from collections import namedtuple
+
+import pytest
+
+pytest.importorskip("confluent_kafka")
+
+from src.kafka import run_budget
+from src.kafka.run_budget import OFFSET_INVALID, RunBudget, caught_up
+
+TP = namedtuple("TP", "topic partition offset")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(run_budget.time, "monotonic", clock)
+    return clock
+
+
+def test_empty_budget_never_expires(clock):
+    budget = RunBudget(started=clock())
+    clock.now += 10 ** 6
+    assert not budget.exhausted(10 ** 9)
+    assert budget.remaining() is None
+
+
+def test_budget_expires_on_wall_time(clock):
+    budget = RunBudget(max_seconds=30, started=clock())
+    clock.now += 29
+    assert not budget.exhausted(0)
+    assert budget.remaining() == pytest.approx(1)
+    clock.now += 1
+    assert budget.exhausted(0)
+    assert budget.remaining() == 0
+
+
+def test_budget_expires_on_message_count(clock):
+    budget = RunBudget(max_messages=100, started=clock())
+    assert not budget.exhausted(99)
+    assert budget.exhausted(100)
+
+
+def test_throughput(clock):
+    budget = RunBudget(started=clock())
+    clock.now += 4
+    stats = budget.throughput({"messages": 10})
+    assert stats == {"messages": 10, "elapsed_s": 4.0, "messages_per_s": 2.5}
+    assert budget.throughput({"produced": 8})["messages_per_s"] == 2.0
+
+
+class FakeConsumer:
+    def __init__(self, positions, committed, watermarks):
+        self._positions = positions
+        self._committed = committed
+        self._watermarks = watermarks
+
+    def assignment(self):
+        return [TP("t", p, OFFSET_INVALID) for p in self._positions]
+
+    def position(self, assignment):
+        return [TP("t", p, self._positions[p]) for p in self._positions]
+
+    def committed(self, assignment, timeout=None):
+        return [TP("t", p, self._committed.get(p, OFFSET_INVALID)) for p in self._positions]
+
+    def get_watermark_offsets(self, tp, timeout=None):
+        return self._watermarks[tp.partition]
+
+
+@pytest.fixture
+def plain_partitions(monkeypatch):
+    # the real TopicPartition needs librdkafka; the check only reads topic / partition
+    monkeypatch.setattr(run_budget, "TopicPartition", lambda topic, partition: TP(topic, partition, None))
+
+
+def test_caught_up_at_high_watermark(plain_partitions):
+    consumer = FakeConsumer({0: 10, 1: 5}, {}, {0: (0, 10), 1: (0, 5)})
+    assert caught_up(consumer)
+
+
+def test_not_caught_up_with_messages_left(plain_partitions):
+    consumer = FakeConsumer({0: 10, 1: 3}, {}, {0: (0, 10), 1: (0, 5)})
+    assert not caught_up(consumer)
+
+
+def test_unread_partition_falls_back_to_committed_then_low(plain_partitions):
+    assert caught_up(FakeConsumer({0: OFFSET_INVALID}, {0: 7}, {0: (0, 7)}))
+    assert not caught_up(FakeConsumer({0: OFFSET_INVALID}, {}, {0: (2, 7)}))
+    assert caught_up(FakeConsumer({0: OFFSET_INVALID}, {}, {0: (7, 7)}))
+
+
+def test_no_assignment_is_not_caught_up(plain_partitions):
+    assert not caught_up(FakeConsumer({}, {}, {}))
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("confluent_kafka")
+
+from src.kafka.spool import claim_writer_dir
+
+
+def test_each_consumer_gets_its_own_writer_dir(tmp_path):
+    first, first_lock = claim_writer_dir(tmp_path)
+    second, second_lock = claim_writer_dir(tmp_path)
+    assert first != second
+
+    # a released slot is reused by the next consumer
+    first_lock.close()
+    third, third_lock = claim_writer_dir(tmp_path)
+    assert third == first
+
+    second_lock.close()
+    third_lock.close()
@@ -0,0 +1,65 @@
+from src.load import stage_copy
+from src.load.pipeline import LoadUnit, run_sequential
+from src.load.stage_copy import StageBuffer, unit_writer
+
+
+class FakeConn:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+def _record_copies(monkeypatch):
+    copies = []
+
+    def fake_copy_rows(conn, table, cols, rows, commit=True, **kwargs):
+        assert commit is False
+        copies.append((table, list(rows)))
+        return len(copies[-1][1])
+
+    monkeypatch.setattr(stage_copy, "copy_rows", fake_copy_rows)
+    return copies
+
+
+def test_buffer_stages_one_file_per_table_on_flush(monkeypatch):
+    copies = _record_copies(monkeypatch)
+    conn = FakeConn()
+    buffer = StageBuffer(batch_rows=100)
+
+    buffer.add(conn, "T1", ["a"], [[1], [2]])
+    buffer.add(conn, "T2", ["a"], [[3]])
+    buffer.add(conn, "T1", ["a"], [[4]])
+    assert copies == []
+
+    assert buffer.flush(conn) == 4
+    assert sorted(copies) == [("T1", [[1], [2], [4]]), ("T2", [[3]])]
+    assert conn.commits == 0
+    assert buffer.flush(conn) == 0
+
+
+def test_buffer_stages_early_at_batch_rows(monkeypatch):
+    copies = _record_copies(monkeypatch)
+    buffer = StageBuffer(batch_rows=3)
+
+    buffer.add(FakeConn(), "T1", ["a"], [[1], [2]])
+    assert copies == []
+    buffer.add(FakeConn(), "T1", ["a"], [[3], [4]])
+    assert copies == [("T1", [[1], [2], [3], [4]])]
+
+
+def test_copy_writer_flushes_before_the_runner_commits(monkeypatch):
+    copies = _record_copies(monkeypatch)
+    conn = FakeConn()
+    seen = []
+
+    def checkpoint():
+        seen.append((len(copies), conn.commits))
+
+    write_rows, flush = unit_writer("copy")
+    units = [LoadUnit(writes=[("T1", ["a"], [[1], [2]])], checkpoint=checkpoint)]
+    stats = run_sequential([units], conn, write_rows, flush=flush)
+
+    assert stats["rows"] == 2
+    assert seen == [(1, 1)]